@@ -0,0 +1,212 @@
+"""
+Asyncio front-end for the protocol servers (MySQL, Postgres).
+
+Connections are accepted and watched by one event loop, so an idle connection doesn't hold a thread. When a client
+sends a command, the command is handled by the protocol handler in a thread of the worker pool. The pool is bounded
+and serves tenants in round-robin order: a tenant with many running queries doesn't block the others.
+
+Handlers write answers to the socket from the worker thread with blocking calls: the worker (and the stream of data
+behind the answer) waits until the client reads the data, so slow clients don't make the server buffer results.
+Every blocking read/write of the socket is limited by timeout, so a client which stops in the middle of a packet
+can't hold a worker forever. Handshakes of new (not authenticated yet) connections are performed by a separate
+pool, they can't take workers from the queries of authenticated clients.
+"""
+
+import asyncio
+import contextvars
+import socket
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+from mindsdb.utilities import log
+from mindsdb.utilities.context import context as ctx
+
+logger = log.getLogger(__name__)
+
+
+class FairWorkerPool:
+    """Pool of threads, tasks are grouped by tenant and tenants are served in round-robin order
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = 'sql_worker'):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+
+        self._queues: Dict[Any, deque] = {}
+        # tenants having queued tasks, in order of serving
+        self._tenants = deque()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._idle_workers = 0
+        self._shutdown = False
+
+    def submit(self, tenant: Any, fn: Callable, *args) -> Future:
+        """Queue the task
+
+        Args:
+            tenant (Any): key of the tenant (company_id)
+            fn (Callable): function to call in the worker
+
+        Returns:
+            Future: result of the function
+        """
+        future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('Worker pool is shut down')
+            queue = self._queues.get(tenant)
+            if queue is None:
+                queue = self._queues[tenant] = deque()
+                self._tenants.append(tenant)
+            queue.append((future, fn, args))
+
+            if self._idle_workers == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._worker, daemon=True,
+                    name=f'{self.thread_name_prefix}_{len(self._threads)}'
+                )
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._condition.notify()
+        return future
+
+    def _get_task(self):
+        # must be called with acquired lock
+        tenant = self._tenants.popleft()
+        queue = self._queues[tenant]
+        task = queue.popleft()
+        if len(queue) > 0:
+            # to the end of the line
+            self._tenants.append(tenant)
+        else:
+            del self._queues[tenant]
+        return task
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                self._idle_workers += 1
+                while len(self._tenants) == 0 and not self._shutdown:
+                    self._condition.wait()
+                self._idle_workers -= 1
+                if self._shutdown:
+                    return
+                future, fn, args = self._get_task()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+
+
+class AsyncTCPServer:
+    """TCP server on asyncio event loop, commands of connections are executed by handlers in FairWorkerPool
+
+    Handler class is created as handler_class(request, client_address, server) and performs handshake in constructor,
+    'is_opened' attribute of the handler shows if it was successful. Then handler has to implement:
+        - handle_command(): read and process one command from client, returns False if connection has to be closed
+        - has_pending_data(): True if data from client is already read into a buffer of the handler
+        - close_connection(): release resources of the connection
+    """
+
+    # handlers check it to not process commands in constructor
+    is_async = True
+
+    def __init__(self, server_address: tuple, handler_class, max_workers: int = 32,
+                 handshake_workers: int = 8, timeout: float = 60):
+        """
+        Args:
+            server_address (tuple): (host, port)
+            handler_class: class of protocol handler
+            max_workers (int): max count of threads executing commands
+            handshake_workers (int): max count of threads performing handshakes of new connections
+            timeout (float): timeout in seconds of blocking read/write of the socket
+        """
+        self.server_address = server_address
+        self.handler_class = handler_class
+        self.timeout = timeout
+        self.pool = FairWorkerPool(max_workers)
+        self.handshake_pool = FairWorkerPool(handshake_workers, thread_name_prefix='sql_handshake')
+        self._socket = None
+
+    def serve_forever(self):
+        asyncio.run(self._serve())
+
+    def server_close(self):
+        self.pool.shutdown()
+        self.handshake_pool.shutdown()
+        if self._socket is not None:
+            self._socket.close()
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        self._socket = socket.create_server(self.server_address, reuse_port=False, backlog=1024)
+        self._socket.setblocking(False)
+        connections = set()
+        while True:
+            conn, address = await loop.sock_accept(self._socket)
+            task = loop.create_task(self._handle_connection(conn, address))
+            # keep reference until it is done
+            connections.add(task)
+            task.add_done_callback(connections.discard)
+
+    def _run(self, context: contextvars.Context, tenant: Any, fn: Callable, *args,
+             pool: FairWorkerPool = None) -> asyncio.Future:
+        # execute in the pool within context of the connection
+        pool = pool or self.pool
+        return asyncio.wrap_future(pool.submit(tenant, context.run, fn, *args))
+
+    @staticmethod
+    async def _wait_readable(conn: socket.socket):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def on_readable():
+            if not future.done():
+                future.set_result(None)
+
+        loop.add_reader(conn.fileno(), on_readable)
+        try:
+            await future
+        finally:
+            loop.remove_reader(conn.fileno())
+
+    async def _handle_connection(self, conn: socket.socket, address):
+        # blocking socket with timeout: idle connections are awaited by event loop, not in blocking calls
+        conn.settimeout(self.timeout)
+        # every connection has its own context, it is entered only by one worker at time
+        context = contextvars.Context()
+        handler = None
+        tenant = None
+        try:
+            # tenant is not known before authentication, handshakes are balanced by client host
+            handler = await self._run(
+                context, address[0], self.handler_class, conn, address, self, pool=self.handshake_pool
+            )
+            while handler.is_opened:
+                if not handler.has_pending_data():
+                    await self._wait_readable(conn)
+                tenant = context.run(lambda: ctx.company_id)
+                if await self._run(context, tenant, handler.handle_command) is False:
+                    break
+        except Exception:
+            logger.exception('Error in connection handling:')
+        finally:
+            if handler is not None:
+                try:
+                    await self._run(context, tenant, handler.close_connection)
+                except Exception:
+                    logger.exception('Error on closing connection:')
+            conn.close()
@@ -93,6 +93,7 @@ from mindsdb.integrations.libs.const import (
 )
 from mindsdb.integrations.libs.response import HandlerStatusResponse
 from mindsdb.interfaces.chatbot.chatbot_controller import ChatBotController
+from mindsdb.interfaces.database import catalog
 from mindsdb.interfaces.database.projects import ProjectController
 from mindsdb.interfaces.jobs.jobs_controller import JobsController
 from mindsdb.interfaces.model.functions import (
@@ -166,14 +167,18 @@ class ExecuteCommands:
         self.datahub = session.datahub
 
     @profiler.profile()
+    @catalog.query_scope()
     def execute_command(self, statement: ASTNode, database_name: str = None) -> ExecuteAnswer:
-        sql: str = statement.to_string()
-        sql_lower: str = sql.lower()
-
         if database_name is None:
             database_name = self.session.database
 
         statement_type = type(statement)
+        if statement_type in (Select, Union, Insert, Update, Delete):
+            # text of the statement is used only to handle some service queries, don't render it for others
+            sql = sql_lower = None
+        else:
+            sql: str = statement.to_string()
+            sql_lower: str = sql.lower()
         if statement_type is CreateDatabase:
             return self.answer_create_database(statement)
         elif statement_type is CreateMLEngine:
@@ -600,15 +605,16 @@ class ExecuteCommands:
             )
         elif (
             statement_type is Alter
-            and ("disable keys" in sql_lower)
-            or ("enable keys" in sql_lower)
+            and ("disable keys" in sql_lower or "enable keys" in sql_lower)
         ):
             return ExecuteAnswer()
         elif statement_type is Select:
             ret = self.exec_service_function(statement, database_name)
             if ret is not None:
                 return ret
-            query = SQLQuery(statement, session=self.session, database=database_name)
+            query = SQLQuery(
+                statement, session=self.session, database=database_name, stream=self.context.get('stream', False)
+            )
             return self.answer_select(query)
         elif statement_type is Union:
             query = SQLQuery(statement, session=self.session, database=database_name)
@@ -1967,7 +1973,7 @@ class ExecuteCommands:
 
     def answer_select(self, query):
         data = query.fetched_data
-        return ExecuteAnswer(data=data)
+        return ExecuteAnswer(data=data, data_stream=query.fetched_data_stream)
 
     def answer_update_model_version(self, model_version, database_name):
         if not isinstance(model_version, Identifier):
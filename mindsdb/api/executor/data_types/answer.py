@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Iterator
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet
 
@@ -7,7 +7,74 @@ from mindsdb.api.executor.sql_query.result_set import ResultSet
 @dataclass(kw_only=True, slots=True)
 class ExecuteAnswer:
     data: Optional[ResultSet] = None
+    # the rest of the result if it is streamed: 'data' contains the first chunk, next chunks are fetched lazily
+    data_stream: Optional[Iterator[ResultSet]] = None
     state_track: Optional[List[List]] = None
     error_code: Optional[int] = None
     error_message: Optional[str] = None
     affected_rows: Optional[int] = None
+
+    def iter_data(self) -> Iterator[ResultSet]:
+        """Iterate over all chunks of the result. Stream can be consumed only once
+        """
+        if self.data is not None:
+            yield self.data
+        if self.data_stream is not None:
+            yield from self.data_stream
+
+
+class ResultCursor:
+    """Reads rows of the answer by portions, chunks of the stream are fetched only when they are needed
+    """
+
+    def __init__(self, answer: ExecuteAnswer):
+        self._chunks = answer.iter_data()
+        self._rows = []
+        self._position = 0
+        self.is_finished = False
+        self.fetched = 0
+        self._load_chunk()
+
+    def _load_chunk(self):
+        for chunk in self._chunks:
+            if len(chunk) > 0:
+                self._rows = chunk.to_lists()
+                self._position = 0
+                return
+        self._rows = []
+        self._position = 0
+        self.is_finished = True
+
+    def fetch(self, limit: int) -> List[list]:
+        """Get next rows
+
+        Args:
+            limit (int): max count of rows to return
+
+        Returns:
+            List[list]: rows, if there are no more rows, is_finished is set to True
+        """
+        rows = []
+        while not self.is_finished and len(rows) < limit:
+            end = self._position + limit - len(rows)
+            rows.extend(self._rows[self._position:end])
+            self._position = min(end, len(self._rows))
+            if self._position >= len(self._rows):
+                # read the next chunk to know if it was the last row
+                self._load_chunk()
+        self.fetched += len(rows)
+        return rows
+
+    def fetch_chunk(self) -> List[list]:
+        """Get the rest of rows of the current chunk"""
+        if self.is_finished:
+            return []
+        rows = self._rows[self._position:]
+        self.fetched += len(rows)
+        self._load_chunk()
+        return rows
+
+    def close(self):
+        # release the stream and connection to the database behind it
+        self._chunks.close()
+        self.is_finished = True
@@ -10,6 +10,7 @@ from mindsdb.api.executor import exceptions as exc
 from mindsdb.api.executor.utilities.sql import query_df
 from mindsdb.api.executor.utilities.sql import get_query_tables
 from mindsdb.interfaces.database.projects import ProjectController
+from mindsdb.interfaces.database.catalog import get_catalog
 from mindsdb.api.executor.datahub.classes.response import DataHubResponse
 from mindsdb.integrations.libs.response import INF_SCHEMA_COLUMNS_NAMES
 from mindsdb.utilities import log
@@ -50,8 +51,7 @@ class InformationSchemaDataNode(DataNode):
             'log': self.database_controller.logs_db_controller
         }
 
-        databases = self.database_controller.get_dict()
-        if "files" in databases:
+        if get_catalog().get_integration("files") is not None:
             self.persis_datanodes["files"] = IntegrationDataNode(
                 "files",
                 ds_type="file",
@@ -75,43 +75,22 @@ class InformationSchemaDataNode(DataNode):
         if name_lower in self.persis_datanodes:
             return self.persis_datanodes[name_lower]
 
-        existing_databases_meta = (
-            self.database_controller.get_dict()
-        )  # filter_type='project'
-        database_name = None
-        for key in existing_databases_meta:
-            if key.lower() == name_lower:
-                database_name = key
-                break
-
-        if database_name is None:
-            return None
-
-        database_meta = existing_databases_meta[database_name]
-        if database_meta["type"] == "integration":
-            integration = self.integration_controller.get(name=database_name)
-            return IntegrationDataNode(
-                database_name,
-                ds_type=integration["engine"],
-                integration_controller=self.session.integration_controller,
-            )
-        if database_meta["type"] == "project":
-            project = self.database_controller.get_project(name=database_name)
+        catalog = get_catalog()
+        project = catalog.get_project(name_lower)
+        if project is not None:
             return ProjectDataNode(
                 project=project,
                 integration_controller=self.session.integration_controller,
                 information_schema=self,
             )
 
-        integration_names = self.integration_controller.get_all().keys()
-        for integration_name in integration_names:
-            if integration_name.lower() == name_lower:
-                datasource = self.integration_controller.get(name=integration_name)
-                return IntegrationDataNode(
-                    integration_name,
-                    ds_type=datasource["engine"],
-                    integration_controller=self.session.integration_controller,
-                )
+        integration = catalog.get_integration(name_lower)
+        if integration is not None:
+            return IntegrationDataNode(
+                integration["name"],
+                ds_type=integration["engine"],
+                integration_controller=self.session.integration_controller,
+            )
 
         return None
 
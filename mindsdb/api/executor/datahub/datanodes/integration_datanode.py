@@ -233,7 +233,26 @@ class IntegrationDataNode(DataNode):
     @profiler.profile()
     def query_stream(self, query: ASTNode, fetch_size: int = None) -> Iterable:
         # returns generator of results from handler (split by chunks)
-        return self.integration_handler.query_stream(query, fetch_size=fetch_size)
+        integration = get_class_name(self.integration_handler)
+        rows_metric = metrics.INTEGRATION_HANDLER_STREAM_ROWS.labels(integration)
+        bytes_metric = metrics.INTEGRATION_HANDLER_STREAM_BYTES.labels(integration)
+        time_metric = metrics.INTEGRATION_HANDLER_STREAM_TIME.labels(integration)
+        try:
+            time_before_fetch = time.perf_counter()
+            for df in self.integration_handler.query_stream(query, fetch_size=fetch_size):
+                # time between batches without time of their processing by consumer
+                time_metric.inc(time.perf_counter() - time_before_fetch)
+                rows_metric.inc(len(df))
+                bytes_metric.inc(int(df.memory_usage(index=False, deep=True).sum()))
+                yield df
+                time_before_fetch = time.perf_counter()
+            time_metric.inc(time.perf_counter() - time_before_fetch)
+        except Exception as e:
+            msg = str(e).strip()
+            if msg == '':
+                msg = e.__class__.__name__
+            msg = f'[{self.ds_type}/{self.integration_name}]: {msg}'
+            raise DBHandlerException(msg) from e
 
     @profiler.profile()
     def query(self, query: ASTNode | None = None, native_query: str | None = None, session=None) -> DataHubResponse:
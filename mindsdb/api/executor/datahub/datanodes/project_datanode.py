@@ -17,6 +17,7 @@ from mindsdb.api.executor.datahub.datanodes.datanode import DataNode
 from mindsdb.api.executor.datahub.classes.tables_row import TablesRow
 from mindsdb.api.executor.datahub.classes.response import DataHubResponse
 from mindsdb.utilities.partitioning import process_dataframe_in_partitions
+from mindsdb.interfaces.database.catalog import get_catalog
 from mindsdb.integrations.libs.response import INF_SCHEMA_COLUMNS_NAMES
 
 
@@ -144,9 +145,9 @@ class ProjectDataNode(DataNode):
             # endregion
 
             # other table from project
+            object_type = get_catalog().get_project_objects(self.project.id).get(query_table)
 
-            if self.project.get_view(query_table):
-                # this is the view
+            if object_type == 'view':
                 df = self.project.query_view(query, session)
 
                 columns_info = [{
@@ -159,7 +160,9 @@ class ProjectDataNode(DataNode):
                     columns=columns_info
                 )
 
-            kb_table = session.kb_controller.get_table(query_table, self.project.id)
+            kb_table = None
+            if object_type == 'knowledge_base':
+                kb_table = session.kb_controller.get_table(query_table, self.project.id)
             if kb_table:
                 # this is the knowledge db
                 df = kb_table.select_query(query)
@@ -5,6 +5,12 @@ import numpy as np
 import pandas as pd
 
 from mindsdb.api.executor.exceptions import WrongArgumentError
+from mindsdb.api.executor.utilities.sql import df_to_typed_arrow
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
 
 class Column:
@@ -49,24 +55,83 @@ def rename_df_columns(df: pd.DataFrame, names: Optional[List] = None) -> None:
         df.columns = list(range(len(df.columns)))
 
 
+def arrow_to_df(table) -> pd.DataFrame:
+    """Convert arrow table to dataframe with enumerated columns.
+    Columns which contain nulls are converted to object dtype with None as null value,
+    others are kept as is (zero-copy where arrow allows it)
+
+    Args:
+        table (pa.Table): arrow table
+
+    Returns:
+        pd.DataFrame
+    """
+    table = table.rename_columns([str(i) for i in range(table.num_columns)])
+    df = table.to_pandas(split_blocks=True, self_destruct=False)
+    for i, column in enumerate(table.columns):
+        if column.null_count > 0:
+            if pa.types.is_integer(column.type):
+                # keep integers, pandas converts them to float if there are nulls
+                series = pd.Series(column.to_pylist(), dtype=object, index=df.index)
+            else:
+                series = df.iloc[:, i].astype(object)
+                series[series.isna()] = None
+            df[df.columns[i]] = series
+    rename_df_columns(df)
+    return df
+
+
+def arrow_type_to_dtype(arrow_type) -> Optional[np.dtype]:
+    """Get numpy dtype which corresponds to arrow type, it is used as type of the Column
+
+    Args:
+        arrow_type (pa.DataType): type of arrow field
+
+    Returns:
+        Optional[np.dtype]: numpy dtype or None if type can't be converted
+    """
+    try:
+        return np.dtype(arrow_type.to_pandas_dtype())
+    except (NotImplementedError, TypeError):
+        return None
+
+
+def column_to_list(series: pd.Series) -> list:
+    """Convert column of dataframe to list of python values, replace NaN/NaT/NA by None
+
+    Args:
+        series (pd.Series): column
+
+    Returns:
+        list
+    """
+    values = series.to_numpy(dtype=object)
+    mask = pd.isna(values)
+    if mask.any():
+        values[mask] = None
+    return values.tolist()
+
+
 class ResultSet:
-    def __init__(self, columns=None, values: List[List] = None, df: pd.DataFrame = None, affected_rows: int = None):
+    def __init__(self, columns=None, values: List[List] = None, df: pd.DataFrame = None, affected_rows: int = None,
+                 table=None):
         """
         Args:
             columns: list of Columns
             values (List[List]): data of resultSet, have to be list of lists with length equal to column
             df (pd.DataFrame): injected dataframe, have to have enumerated columns and length equal to columns
             affected_rows (int): number of affected rows
+            table (pa.Table): injected arrow table, length of its columns have to be equal to columns.
+                Dataframe is created from it only on demand
         """
         if columns is None:
             columns = []
         self._columns = columns
 
-        if values is None:
-            df = None
-        elif df is None:
+        if df is None and values is not None:
             df = pd.DataFrame(values)
         self._df = df
+        self._table = table if df is None else None
 
         self.affected_rows = affected_rows
 
@@ -78,15 +143,26 @@ class ResultSet:
         return f'{self.__class__.__name__}({self.length()} rows, cols: {col_names})'
 
     def __len__(self) -> int:
+        if self._table is not None:
+            return self._table.num_rows
         if self._df is None:
             return 0
         return len(self._df)
 
     def __getitem__(self, slice_val):
         # return resultSet with sliced dataframe
-        df = self._df[slice_val]
+        if self._table is not None and isinstance(slice_val, slice) and slice_val.step is None:
+            start, stop, _ = slice_val.indices(self._table.num_rows)
+            table = self._table.slice(start, max(stop - start, 0))
+            return ResultSet(columns=self.columns, table=table)
+        df = self.get_raw_df()[slice_val]
         return ResultSet(columns=self.columns, df=df)
 
+    @property
+    def is_arrow(self) -> bool:
+        """Data is stored as arrow table and pandas view of it is not created yet"""
+        return self._table is not None
+
     # --- converters ---
 
     def from_df(self, df, database=None, table_name=None, table_alias=None):
@@ -103,17 +179,34 @@ class ResultSet:
 
         rename_df_columns(df)
         self._df = df
+        self._table = None
 
         return self
 
-    def from_df_cols(self, df, col_names, strict=True):
+    def from_arrow(self, table, database=None, table_name=None, table_alias=None):
+        self._columns = [
+            Column(
+                name=field.name,
+                table_name=table_name,
+                table_alias=table_alias,
+                database=database,
+                type=arrow_type_to_dtype(field.type)
+            ) for field in table.schema
+        ]
+
+        self._df = None
+        self._table = table
+
+        return self
+
+    def _columns_from_names(self, names, col_names, strict):
         # find column by alias
         alias_idx = {}
         for col in col_names.values():
             if col.alias is not None:
                 alias_idx[col.alias] = col
 
-        for col in df.columns:
+        for col in names:
             if col in col_names or strict:
                 column = col_names[col]
             elif col in alias_idx:
@@ -122,8 +215,21 @@ class ResultSet:
                 column = Column(col)
             self._columns.append(column)
 
+    def from_df_cols(self, df, col_names, strict=True):
+        self._columns_from_names(df.columns, col_names, strict)
+
         rename_df_columns(df)
         self._df = df
+        self._table = None
+
+        return self
+
+    def from_arrow_cols(self, table, col_names, strict=True):
+        # the same as from_df_cols, but keeps arrow table without conversion to pandas
+        self._columns_from_names(table.column_names, col_names, strict)
+
+        self._df = None
+        self._table = table
 
         return self
 
@@ -133,21 +239,52 @@ class ResultSet:
         rename_df_columns(df, columns_names)
         return df
 
-    def to_df_cols(self, prefix=''):
-        # returns dataframe and dict of columns
-        #   can be restored to ResultSet by from_df_cols method
-
+    def _get_hash_names(self, prefix):
         columns = []
         col_names = {}
         for col in self._columns:
             name = col.get_hash_name(prefix)
             columns.append(name)
             col_names[name] = col
+        return columns, col_names
+
+    def to_df_cols(self, prefix=''):
+        # returns dataframe and dict of columns
+        #   can be restored to ResultSet by from_df_cols method
+
+        columns, col_names = self._get_hash_names(prefix)
 
         df = self.get_raw_df()
         rename_df_columns(df, columns)
         return df, col_names
 
+    def to_arrow(self):
+        """Get data as arrow table with column names. If data stored as arrow table - it is not copied
+
+        Returns:
+            pa.Table
+        """
+        return self.get_raw_table().rename_columns(self.get_column_names())
+
+    def to_table_cols(self, prefix=''):
+        """The same as to_df_cols, but returns the data as arrow table: stored one (without conversion to pandas) or
+        dataframe converted with declared types of columns (see df_to_typed_arrow). If types of the dataframe can't be
+        declared, the dataframe is returned. Both can be registered in duckdb.
+        Can be restored to ResultSet by from_arrow_cols/from_df_cols method
+
+        Returns:
+            pa.Table | pd.DataFrame, dict
+        """
+        if self._table is None:
+            df, col_names = self.to_df_cols(prefix)
+            table = df_to_typed_arrow(df, [column.type for column in self._columns])
+            if table is None:
+                return df, col_names
+            return table, col_names
+
+        columns, col_names = self._get_hash_names(prefix)
+        return self._table.rename_columns(columns), col_names
+
     # --- tables ---
 
     def get_tables(self):
@@ -180,6 +317,7 @@ class ResultSet:
         return col_idx
 
     def add_column(self, col, values=None):
+        self._materialize_df()
         self._columns.append(col)
 
         col_idx = len(self._columns) - 1
@@ -191,6 +329,10 @@ class ResultSet:
         idx = self.get_col_index(col)
         self._columns.pop(idx)
 
+        if self._table is not None:
+            self._table = self._table.remove_column(idx)
+            return
+
         self._df.drop(idx, axis=1, inplace=True)
         rename_df_columns(self._df)
 
@@ -228,22 +370,43 @@ class ResultSet:
         return col2
 
     def set_col_type(self, col_idx, type_name):
+        self._materialize_df()
         self.columns[col_idx].type = type_name
         if self._df is not None:
             self._df[col_idx] = self._df[col_idx].astype(type_name)
 
     # --- records ---
 
+    def _materialize_df(self):
+        # create pandas view of arrow table. After that dataframe becomes the storage of the data
+        if self._table is not None:
+            self._df = arrow_to_df(self._table)
+            self._table = None
+
     def get_raw_df(self):
+        self._materialize_df()
         if self._df is None:
             names = range(len(self._columns))
             return pd.DataFrame([], columns=names)
         return self._df
 
+    def get_raw_table(self):
+        """Get data as arrow table with enumerated columns
+
+        Returns:
+            pa.Table
+        """
+        if self._table is not None:
+            return self._table
+        df = self.get_raw_df()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        return table.rename_columns([str(i) for i in range(table.num_columns)])
+
     def add_raw_df(self, df):
         if len(df.columns) != len(self._columns):
             raise WrongArgumentError(f'Record length mismatch columns length: {len(df.columns)} != {len(self.columns)}')
 
+        self._materialize_df()
         rename_df_columns(df)
 
         if self._df is None:
@@ -269,20 +432,29 @@ class ResultSet:
         :return: list of lists
         """
 
-        if len(self.get_raw_df()) == 0:
+        if len(self) == 0:
             return []
-        # output for APIs. simplify types
-        if json_types:
-            df = self.get_raw_df().copy()
-            for name, dtype in df.dtypes.to_dict().items():
-                if pd.api.types.is_datetime64_any_dtype(dtype):
-                    df[name] = df[name].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
-            df = df.replace({np.nan: None})
-            return df.to_records(index=False).tolist()
-
-        # slower but keep timestamp type
-        df = self._df.replace({np.nan: None})
-        return df.to_dict('split')['data']
+
+        # data is converted column by column, without copy of the whole dataframe
+        if self._table is not None and not json_types:
+            # arrow nulls are converted to None
+            columns = [column.to_pylist() for column in self._table.columns]
+        else:
+            df = self.get_raw_df()
+            columns = []
+            for name, dtype in df.dtypes.items():
+                series = df[name]
+                # output for APIs. simplify types
+                if json_types:
+                    if pd.api.types.is_datetime64_any_dtype(dtype):
+                        series = series.dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+                    elif isinstance(dtype, np.dtype) and dtype.kind in 'iufb':
+                        # keep python types from numpy scalars
+                        columns.append(series.tolist() if not series.hasnans else column_to_list(series))
+                        continue
+                columns.append(column_to_list(series))
+
+        return [list(row) for row in zip(*columns)]
 
     def get_column_values(self, col_idx):
         # get by column index
@@ -297,6 +469,7 @@ class ResultSet:
         else:
             col_idx = self.get_col_index(cols[0])
 
+        self._materialize_df()
         if self._df is not None:
             self._df[col_idx] = values
 
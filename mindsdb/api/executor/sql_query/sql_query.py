@@ -8,17 +8,21 @@
  * permission of MindsDB Inc
  *******************************************************
 """
+import copy
 import inspect
+import time
 from textwrap import dedent
-from typing import Union, Dict
+from typing import Union, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
-from mindsdb_sql_parser import parse_sql, ASTNode
+from mindsdb_sql_parser import ASTNode
+from mindsdb_sql_parser.ast import Select, Union as UnionStatement
 
 from mindsdb.api.executor.planner.steps import (
     ApplyTimeseriesPredictorStep,
     ApplyPredictorRowStep,
     ApplyPredictorStep,
+    FetchDataframeStep,
 )
 
 from mindsdb.api.executor.planner.exceptions import PlanningException
@@ -27,6 +31,8 @@ from mindsdb.api.executor.planner import query_planner
 
 from mindsdb.api.executor.utilities.sql import get_query_models
 from mindsdb.interfaces.model.functions import get_model_record
+from mindsdb.interfaces.database.catalog import get_catalog, get_catalog_version
+from mindsdb.metrics import metrics
 from mindsdb.api.executor.exceptions import (
     BadTableError,
     UnknownError,
@@ -41,15 +47,18 @@ from mindsdb.utilities.context import context as ctx
 
 from . import steps
 from .result_set import ResultSet, Column
+from .statement_cache import parse_sql, plans_cache, is_cacheable
 from . steps.base import BaseStepCall
 
 
 class SQLQuery:
 
     step_handlers = {}
+    # count of rows in chunk of streamed result
+    stream_fetch_size = 10000
 
     def __init__(self, sql: Union[ASTNode, str], session, execute: bool = True,
-                 database: str = None, query_id: int = None, stop_event=None):
+                 database: str = None, query_id: int = None, stop_event=None, stream: bool = False):
         self.session = session
 
         self.query_id = query_id
@@ -75,23 +84,40 @@ class SQLQuery:
         self.planner: query_planner.QueryPlanner = None
         self.parameters = []
         self.fetched_data: ResultSet = None
+        # if stream is enabled: the rest of the result after the first chunk in fetched_data
+        self.stream = stream
+        self.fetched_data_stream: Iterator[ResultSet] = None
 
         self.outer_query = None
         self.run_query = None
         self.stop_event = stop_event
 
+        self.planning_time = 0
+        time_start = time.perf_counter()
+
         if isinstance(sql, str):
             self.query = parse_sql(sql)
             self.context['query_str'] = sql
         else:
             self.query = sql
-            renderer = SqlalchemyRender('mysql')
-            try:
-                self.context['query_str'] = renderer.get_string(self.query, with_failback=True)
-            except Exception:
-                self.context['query_str'] = str(self.query)
+
+        self.plan_cache_key = self.get_plan_cache_key()
+        self.cached_plan = None
+        if self.plan_cache_key is not None:
+            self.cached_plan = plans_cache.get(self.plan_cache_key)
+
+        if 'query_str' not in self.context:
+            if self.cached_plan is not None:
+                self.context['query_str'] = self.cached_plan['query_str']
+            else:
+                renderer = SqlalchemyRender('mysql')
+                try:
+                    self.context['query_str'] = renderer.get_string(self.query, with_failback=True)
+                except Exception:
+                    self.context['query_str'] = str(self.query)
 
         self.create_planner()
+        self.planning_time += time.perf_counter() - time_start
 
         if execute:
             self.execute_query()
@@ -106,9 +132,47 @@ class SQLQuery:
                     step_name = cl.bind.__name__
                     cls.step_handlers[step_name] = cl
 
+    def get_plan_cache_key(self) -> Optional[tuple]:
+        """Key of the query in cache of plans. Only selects are cached
+
+        Returns:
+            Optional[tuple]: key, None if plan of the query can't be cached
+        """
+        if self.query_id is not None or not isinstance(self.query, (Select, UnionStatement)):
+            return None
+        statement_str = self.query.to_string()
+        if not is_cacheable(statement_str):
+            return None
+        return ctx.company_id, self.database, statement_str, get_catalog_version()
+
     @profiler.profile()
     def create_planner(self):
-        databases = self.session.database_controller.get_list()
+        if self.cached_plan is not None:
+            databases = self.cached_plan['databases']
+            predictor_metadata = self.cached_plan['predictor_metadata']
+        else:
+            databases, predictor_metadata = self.get_planner_metadata()
+            # planner can modify them
+            self.planner_metadata = copy.deepcopy((databases, predictor_metadata))
+
+        database = None if self.database == '' else self.database.lower()
+
+        self.context['predictor_metadata'] = predictor_metadata
+        self.planner = query_planner.QueryPlanner(
+            self.query,
+            integrations=databases,
+            predictor_metadata=predictor_metadata,
+            default_namespace=database,
+        )
+
+    def get_planner_metadata(self) -> Tuple[List[dict], List[dict]]:
+        """Get from catalog the information required by planner
+
+        Returns:
+            List[dict]: list of databases
+            List[dict]: metadata of models used in the query
+        """
+        databases = get_catalog().get_databases()
 
         predictor_metadata = []
 
@@ -184,15 +248,7 @@ class SQLQuery:
 
             predictor_metadata.append(predictor)
 
-        database = None if self.database == '' else self.database.lower()
-
-        self.context['predictor_metadata'] = predictor_metadata
-        self.planner = query_planner.QueryPlanner(
-            self.query,
-            integrations=databases,
-            predictor_metadata=predictor_metadata,
-            default_namespace=database,
-        )
+        return databases, predictor_metadata
 
     def prepare_query(self):
         """it is prepared statement call
@@ -234,10 +290,31 @@ class SQLQuery:
             # no need to execute
             return
 
-        try:
-            steps = list(self.planner.execute_steps())
-        except PlanningException as e:
-            raise LogicError(e)
+        time_start = time.perf_counter()
+        if self.cached_plan is not None:
+            # the statement was planned before
+            self.query = self.planner.query = self.cached_plan['query']
+            self.planner.plan = self.cached_plan['plan']
+            steps = list(self.planner.plan.steps)
+        else:
+            try:
+                steps = list(self.planner.execute_steps())
+            except PlanningException as e:
+                raise LogicError(e)
+
+            if self.plan_cache_key is not None:
+                databases, predictor_metadata = self.planner_metadata
+                plans_cache.set(self.plan_cache_key, {
+                    'query_str': self.context['query_str'],
+                    'databases': databases,
+                    'predictor_metadata': predictor_metadata,
+                    'query': self.planner.query,
+                    'plan': self.planner.plan,
+                })
+        self.planning_time += time.perf_counter() - time_start
+        metrics.SQL_PLANNING_TIME.labels(
+            'hit' if self.cached_plan is not None else 'miss'
+        ).observe(self.planning_time)
 
         if self.planner.plan.is_resumable:
             # create query
@@ -259,6 +336,11 @@ class SQLQuery:
 
             ctx.run_query_id = self.run_query.record.id
 
+        elif self.stream and len(steps) == 1 and isinstance(steps[0], FetchDataframeStep):
+            # the whole query is executed in the database: send result to client while it is fetched
+            self.execute_stream(steps[0])
+            return
+
         step_result = None
         process_mark = None
         try:
@@ -307,6 +389,29 @@ class SQLQuery:
         except Exception as e:
             raise UnknownError("error in column list step") from e
 
+    def execute_stream(self, step: FetchDataframeStep):
+        """Get the first chunk of data (to know columns of the result and raise errors early),
+           the next chunks are fetched when the client reads them
+        """
+        with profiler.Context(f'step: {step.__class__.__name__}'):
+            chunks = steps.FetchDataframeStepCall(self).call_stream(step, fetch_size=self.stream_fetch_size)
+            self.fetched_data = next(chunks)
+        self.steps_data[step.step_num] = self.fetched_data
+        self.query = self.planner.query
+
+        if self.columns_list is None:
+            self.columns_list = self.fetched_data.columns
+
+        def clear_chunks():
+            for chunk in chunks:
+                for col in chunk.find_columns('__mindsdb_row_id'):
+                    chunk.del_column(col)
+                yield chunk
+
+        for col in self.fetched_data.find_columns('__mindsdb_row_id'):
+            self.fetched_data.del_column(col)
+        self.fetched_data_stream = clear_chunks()
+
     def execute_step(self, step, steps_data=None):
         cls_name = step.__class__.__name__
         handler = self.step_handlers.get(cls_name)
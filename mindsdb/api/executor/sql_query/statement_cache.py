@@ -0,0 +1,87 @@
+"""
+In-process caches of parsed statements and query plans.
+
+Dashboards send the same queries again and again, cached results of parsing and planning are reused for them:
+ - parsed statement is cached by text of the query
+ - query plan is cached by text of the statement, current database and version of the catalog (projects,
+   integrations, models), any change of the catalog makes previous plans unreachable
+
+Statements and plans are modified during execution, so the caches store and return copies of them.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from mindsdb_sql_parser import parse_sql as _parse_sql
+from mindsdb_sql_parser.ast.base import ASTNode
+
+from mindsdb.metrics import metrics
+from mindsdb.utilities.config import config
+
+
+class StatementCache:
+    """Thread-safe LRU storage of objects, limited by count of objects"""
+
+    def __init__(self, category: str, max_size: int):
+        self.category = category
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.values = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get copy of the stored object"""
+        with self.lock:
+            value = self.values.get(key)
+            if value is not None:
+                self.values.move_to_end(key)
+        metrics.CACHE_REQUESTS.labels(self.category, 'memory', 'miss' if value is None else 'hit').inc()
+        if value is None:
+            return None
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any):
+        """Store copy of the object"""
+        value = copy.deepcopy(value)
+        evicted = 0
+        with self.lock:
+            self.values[key] = value
+            self.values.move_to_end(key)
+            while len(self.values) > self.max_size:
+                self.values.popitem(last=False)
+                evicted += 1
+        if evicted > 0:
+            metrics.CACHE_EVICTIONS.labels(self.category, 'memory').inc(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+statements_cache = StatementCache('sql_statements', config['sql_cache']['statements_size'])
+plans_cache = StatementCache('sql_plans', config['sql_cache']['plans_size'])
+
+
+def is_cacheable(sql: str) -> bool:
+    return len(sql) <= config['sql_cache']['max_query_length']
+
+
+def parse_sql(sql: str) -> ASTNode:
+    """Parse query, using the cache of parsed statements
+
+    Args:
+        sql (str): query
+
+    Returns:
+        ASTNode: parsed statement, it can be modified by caller
+    """
+    key = sql.strip().rstrip(';').strip()
+    if not is_cacheable(key):
+        return _parse_sql(sql)
+
+    statement = statements_cache.get(key)
+    if statement is None:
+        statement = _parse_sql(sql)
+        statements_cache.set(key, statement)
+    return statement
@@ -1,6 +1,7 @@
 import datetime as dt
 import re
 
+import numpy as np
 import pandas as pd
 
 from mindsdb_sql_parser.ast import (
@@ -20,10 +21,13 @@ from mindsdb.api.executor.planner.steps import (
 )
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet, Column
-from mindsdb.utilities.cache import get_cache, dataframe_checksum
+from mindsdb.utilities.cache import get_cache, dataframe_checksum, json_checksum, RowCache
+from mindsdb.utilities import log
 
 from .base import BaseStepCall
 
+logger = log.getLogger(__name__)
+
 
 def get_preditor_alias(step, mindsdb_database):
     predictor_name = '.'.join(step.predictor.parts)
@@ -111,6 +115,9 @@ class ApplyPredictorStepCall(ApplyPredictorBaseCall):
 
     bind = ApplyPredictorStep
 
+    # flag of cached row: the model returned all columns of input together with predictions
+    _ECHO_INPUT_COLUMN = '__mindsdb_echo_input'
+
     def call(self, step):
         # set row_id
         data = self.steps_data[step.dataframe.step_num]
@@ -188,7 +195,7 @@ class ApplyPredictorStepCall(ApplyPredictorBaseCall):
                 key = f'{predictor_name}_{predictor_id}_{dataframe_checksum(table_df)}'
 
                 predictor_cache = get_cache('predict')
-                predictions = predictor_cache.get(key)
+                predictions = predictor_cache.get_df(key)
             else:
                 predictions = None
 
@@ -217,11 +224,18 @@ class ApplyPredictorStepCall(ApplyPredictorBaseCall):
                 version = None
                 if len(step.predictor.parts) > 1 and step.predictor.parts[-1].isdigit():
                     version = int(step.predictor.parts[-1])
-                predictions = self.apply_predictor(project_name, predictor_name, table_df, version, params)
+
+                if self.session.predictor_cache is not False and not is_timeseries:
+                    predictions = self.apply_predictor_with_row_cache(
+                        project_name, predictor_name, predictor_id, table_df, version, params,
+                        feature_columns=self.get_feature_columns(predictor_metadata)
+                    )
+                else:
+                    predictions = self.apply_predictor(project_name, predictor_name, table_df, version, params)
 
                 if self.session.predictor_cache is not False:
                     if predictions is not None and isinstance(predictions, pd.DataFrame):
-                        predictor_cache.set(key, predictions)
+                        predictor_cache.set_df(key, predictions)
 
             # apply filter
             if is_timeseries:
@@ -239,6 +253,99 @@ class ApplyPredictorStepCall(ApplyPredictorBaseCall):
 
         return result
 
+    @staticmethod
+    def get_feature_columns(predictor_metadata: dict) -> list:
+        """Columns of input which are used by the model: columns of training data except the target.
+        Empty list if they are not known
+        """
+        to_predict = predictor_metadata.get('to_predict') or []
+        if not isinstance(to_predict, list):
+            to_predict = [to_predict]
+        model_types = predictor_metadata.get('model_types') or {}
+        return [column for column in model_types if column not in to_predict]
+
+    def apply_predictor_with_row_cache(
+        self, project_name, predictor_name, predictor_id, df, version, params, feature_columns=None
+    ):
+        """Use cached predictions for rows which were already predicted by the model with the same params.
+        Only the rest of rows are sent to the model, result is restored in order of __mindsdb_row_id
+
+        Rows are identified by values of feature columns of the model (all columns if they are not known).
+        Other columns of input (joined from other tables) don't change predictions: they are not stored in the
+        cache, if the model returns them, they are taken from the current input.
+
+        Returns:
+            pd.DataFrame: predictions
+        """
+        agent = self.session.agents_controller.get_agent(predictor_name, project_name)
+        if agent is not None or '__mindsdb_row_id' not in df.columns:
+            # result of agent depends on the whole input
+            return self.apply_predictor(project_name, predictor_name, df, version, params)
+
+        row_ids = df['__mindsdb_row_id'].reset_index(drop=True)
+        input_df = df.drop(columns=['__mindsdb_row_id']).reset_index(drop=True)
+        key_columns = [column for column in input_df.columns if column in (feature_columns or [])]
+        if len(key_columns) == 0:
+            key_columns = list(input_df.columns)
+        other_columns = [column for column in input_df.columns if column not in key_columns]
+
+        row_cache = RowCache('predict_rows', f'{predictor_name}_{predictor_id}_{json_checksum(params)}')
+        try:
+            hashes = row_cache.hash_rows(input_df[key_columns])
+            cached = row_cache.get_rows(hashes.unique())
+        except TypeError:
+            # unhashable values in input
+            return self.apply_predictor(project_name, predictor_name, df, version, params)
+
+        def restore_rows(mask) -> pd.DataFrame:
+            rows = cached.loc[hashes[mask]].reset_index(drop=True)
+            echo_input = rows.pop(self._ECHO_INPUT_COLUMN).to_numpy(dtype=bool)
+            if echo_input.any() and other_columns:
+                # model returns columns of input: they are taken from the current input
+                rows = pd.concat([rows, input_df.loc[mask, other_columns].reset_index(drop=True)], axis=1)
+                rows.loc[~echo_input, other_columns] = None
+                input_order = [column for column in input_df.columns if column in rows.columns]
+                rows = rows[input_order + [column for column in rows.columns if column not in input_order]]
+            rows['__mindsdb_row_id'] = row_ids[mask].to_numpy()
+            return rows
+
+        hit_mask = np.asarray(hashes.isin(cached.index))
+        if hit_mask.all():
+            return restore_rows(hit_mask)
+
+        miss_df = df[~hit_mask]
+        predictions = self.apply_predictor(project_name, predictor_name, miss_df, version, params)
+        if (
+            not isinstance(predictions, pd.DataFrame)
+            or len(predictions) != len(miss_df)
+            or '__mindsdb_row_id' not in predictions.columns
+        ):
+            # model doesn't return one prediction per row, it can't be cached by rows
+            if hit_mask.any():
+                return self.apply_predictor(project_name, predictor_name, df, version, params)
+            return predictions
+
+        hash_by_row_id = pd.Series(hashes, index=row_ids)
+        echo_input = set(input_df.columns).issubset(predictions.columns)
+        predicted_rows = predictions.drop(
+            columns=['__mindsdb_row_id'] + [column for column in other_columns if column in predictions.columns]
+        )
+        predicted_rows[self._ECHO_INPUT_COLUMN] = echo_input
+        try:
+            row_cache.set_rows(pd.Index(hash_by_row_id[predictions['__mindsdb_row_id']]), predicted_rows)
+        except Exception as e:
+            logger.warning(f'Unable to cache predictions by rows: {e}')
+
+        if not hit_mask.any():
+            return predictions
+
+        hit_rows = restore_rows(hit_mask)
+        predictions = pd.concat([predictions, hit_rows], ignore_index=True).reindex(columns=predictions.columns)
+
+        order = pd.Series(range(len(row_ids)), index=row_ids)
+        predictions = predictions.iloc[order[predictions['__mindsdb_row_id']].argsort()]
+        return predictions.reset_index(drop=True)
+
     def apply_ts_filter(self, predictor_data, table_data, step, predictor_metadata):
 
         if step.output_time_filter is None:
@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from mindsdb_sql_parser.ast import (
     Identifier,
     Constant,
@@ -99,21 +101,70 @@ class FetchDataframeStepCall(BaseStepCall):
 
             # TODO for information_schema we have 'database' = 'mindsdb'
 
-            # fill params
-            fill_params = get_fill_param_fnc(self.steps_data)
-            query_traversal(query, fill_params)
+            query, context_callback = self._prepare_query(query, dn)
 
-            query, context_callback = query_context_controller.handle_db_context_vars(query, dn, self.session)
+            df = self._query(dn, query, context_callback)
 
-            response = dn.query(
-                query=query,
-                session=self.session
-            )
-            df = response.data_frame
+        return self._to_result_set(df, table_alias)
+
+    def call_stream(self, step, fetch_size: int) -> Iterator[ResultSet]:
+        """
+        Executes step and returns result by chunks, if it is supported by datanode.
+        Otherwise, the whole result is returned as one chunk.
+        At least one chunk is always returned: it is used to get columns of the result
+
+        :param step: step to execute
+        :param fetch_size: size of chunks
+        :return: generator of ResultSet
+        """
+        dn = self.session.datahub.get(step.integration)
+        query = step.query
+
+        if dn is None:
+            raise UnknownError(f'Unknown integration name: {step.integration}')
+
+        if query is None or not dn.has_support_stream():
+            yield self.call(step)
+            return
+
+        table_alias = get_table_alias(step.query.from_table, self.context.get('database'))
+
+        query, context_callback = self._prepare_query(query, dn)
+
+        if context_callback:
+            # context variables are updated using the whole result
+            yield self._to_result_set(self._query(dn, query, context_callback), table_alias)
+            return
+
+        is_empty = True
+        for df in dn.query_stream(query, fetch_size=fetch_size):
+            is_empty = False
+            yield self._to_result_set(df, table_alias)
+
+        if is_empty:
+            # columns can't be got from empty stream
+            yield self._to_result_set(self._query(dn, query), table_alias)
+
+    def _prepare_query(self, query, dn):
+        # fill params
+        fill_params = get_fill_param_fnc(self.steps_data)
+        query_traversal(query, fill_params)
+
+        return query_context_controller.handle_db_context_vars(query, dn, self.session)
+
+    def _query(self, dn, query, context_callback=None):
+        response = dn.query(
+            query=query,
+            session=self.session
+        )
+        df = response.data_frame
 
-            if context_callback:
-                context_callback(df, response.columns)
+        if context_callback:
+            context_callback(df, response.columns)
+        return df
 
+    @staticmethod
+    def _to_result_set(df, table_alias) -> ResultSet:
         result = ResultSet()
 
         result.from_df(
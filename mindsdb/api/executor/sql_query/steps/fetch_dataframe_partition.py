@@ -1,6 +1,8 @@
-import pandas as pd
+from collections import deque
 from typing import List
 
+import pandas as pd
+
 from mindsdb_sql_parser import ASTNode
 from mindsdb.api.executor.planner.steps import FetchDataframeStepPartition
 from mindsdb.integrations.utilities.query_traversal import query_traversal
@@ -45,6 +47,8 @@ class FetchDataframePartitionCall(BaseStepCall):
           - query will be sorted by this column and select will be limited by batch_size
         - error (default raise)
           - when `error='skip'`, errors in partition will be skipped and execution will be continued
+        - prefetch - count of batches fetched from database ahead while previous batches are processed,
+          optional default 1, 0 disables fetching ahead
         """
 
         self.dn = self.session.datahub.get(step.integration)
@@ -84,19 +88,23 @@ class FetchDataframePartitionCall(BaseStepCall):
                 use_threads = False
 
         on_error = step.params.get('error', 'raise')
+        prefetch = int(step.params.get('prefetch', 1))
         if use_threads:
-            return self.fetch_threads(run_query, query, thread_count=thread_count, on_error=on_error)
+            return self.fetch_threads(run_query, query, thread_count=thread_count, on_error=on_error,
+                                      prefetch=prefetch)
         else:
-            return self.fetch_iterate(run_query, query, on_error=on_error)
+            return self.fetch_iterate(run_query, query, on_error=on_error, prefetch=prefetch)
 
-    def fetch_iterate(self, run_query: RunningQuery, query: ASTNode, on_error: str = None) -> ResultSet:
+    def fetch_iterate(self, run_query: RunningQuery, query: ASTNode, on_error: str = None,
+                      prefetch: int = 0) -> ResultSet:
         """
          Process batches one by one in circle
+         The next batches are fetched in background while the current one is processed
         """
 
         results = []
 
-        for df in run_query.get_partitions(self.dn, self, query):
+        for df, max_track_value in run_query.iterate_partitions(self.dn, self, query, prefetch=prefetch):
             try:
                 sub_data = self.exec_sub_steps(df)
                 results.append(sub_data)
@@ -105,6 +113,7 @@ class FetchDataframePartitionCall(BaseStepCall):
                     logger.error(e)
                 else:
                     raise e
+            run_query.set_progress(df, max_track_value)
 
         return self.concat_results(results)
 
@@ -153,12 +162,14 @@ class FetchDataframePartitionCall(BaseStepCall):
         return sub_data
 
     def fetch_threads(self, run_query: RunningQuery, query: ASTNode,
-                      thread_count: int = None, on_error: str = None) -> ResultSet:
+                      thread_count: int = None, on_error: str = None, prefetch: int = 0) -> ResultSet:
         """
         Process batches in threads
         - spawn required count of threads
         - create in/out queue to communicate with threads
         - send task to threads and receive results
+        - up to `prefetch` batches are processed ahead while the oldest batch is not finished,
+          progress of the query is stored in order of batches
         """
 
         # create communication queues
@@ -173,27 +184,44 @@ class FetchDataframePartitionCall(BaseStepCall):
             partition_size = 10
 
         results = []
+        # batches in processing: (df, max_track_value, futures)
+        pending = deque()
+
+        def complete_batch():
+            df, max_track_value, futures = pending.popleft()
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    if on_error == 'skip':
+                        logger.error(e)
+                    else:
+                        for _, _, batch_futures in pending:
+                            for batch_future in batch_futures:
+                                batch_future.cancel()
+                        raise e
+            run_query.set_progress(df, max_track_value)
 
         with ContextThreadPoolExecutor(max_workers=thread_count) as executor:
 
-            for df in run_query.get_partitions(self.dn, self, query):
+            for df, max_track_value in run_query.iterate_partitions(self.dn, self, query, prefetch=prefetch):
 
                 # split into chunks and send to workers
                 futures = []
                 for df2 in split_data_frame(df, partition_size):
                     futures.append(executor.submit(self.exec_sub_steps, df2))
+                pending.append((df, max_track_value, futures))
+
+                while len(pending) > prefetch:
+                    complete_batch()
 
-                for future in futures:
-                    try:
-                        results.append(future.result())
-                    except Exception as e:
-                        if on_error == 'skip':
-                            logger.error(e)
-                        else:
-                            executor.shutdown()
-                            raise e
                 if self.sql_query.stop_event is not None and self.sql_query.stop_event.is_set():
-                    executor.shutdown()
+                    for _, _, batch_futures in pending:
+                        for future in batch_futures:
+                            future.cancel()
                     raise RuntimeError('Query is interrupted')
 
+            while len(pending) > 0:
+                complete_batch()
+
         return self.concat_results(results)
@@ -1,6 +1,8 @@
 import copy
+from typing import Optional
 
 import numpy as np
+import pandas as pd
 
 from mindsdb_sql_parser.ast import (
     Identifier, BinaryOperation, Constant
@@ -9,9 +11,10 @@ from mindsdb.api.executor.planner.steps import (
     JoinStep,
 )
 from mindsdb.integrations.utilities.query_traversal import query_traversal
+from mindsdb.utilities.config import config
 from mindsdb.utilities.render.sqlalchemy_render import SqlalchemyRender
 
-from mindsdb.api.executor.sql_query.result_set import ResultSet
+from mindsdb.api.executor.sql_query.result_set import ResultSet, pa
 from mindsdb.api.executor.utilities.sql import query_df_with_type_infer_fallback
 from mindsdb.api.executor.exceptions import NotSupportedYet
 
@@ -45,6 +48,10 @@ class JoinStepCall(BaseStepCall):
                 right_data.set_column_values('__mindsdb_row_id', left_data.get_column_values(idx))
                 r_row_ids = right_data.find_columns('__mindsdb_row_id')
 
+            data = self._join_aligned(left_data, right_data, l_row_ids[0], r_row_ids[0])
+            if data is not None:
+                return data
+
             a_row_id = l_row_ids[0].get_hash_name(prefix='A')
             b_row_id = r_row_ids[0].get_hash_name(prefix='B')
 
@@ -75,7 +82,8 @@ class JoinStepCall(BaseStepCall):
 
             if step.query.condition is None:
                 # prevent memory overflow
-                if len(left_data) * len(right_data) < 10 ** 7:
+                max_rows = config['duckdb'].get('cross_join_max_rows', 10 ** 7)
+                if len(left_data) * len(right_data) < max_rows:
                     step.query.condition = BinaryOperation(op='=', args=[Constant(0), Constant(0)])
                 else:
                     raise NotSupportedYet('Unable to join table without condition')
@@ -86,22 +94,58 @@ class JoinStepCall(BaseStepCall):
             join_condition = SqlalchemyRender('postgres').get_string(condition)
             join_type = step.query.join_type
 
-        table_a, names_a = left_data.to_df_cols(prefix='A')
-        table_b, names_b = right_data.to_df_cols(prefix='B')
+        # data of steps is passed to duckdb as is (arrow table or dataframe), without conversion.
+        # duckdb performs vectorized hash join, and uses the memory budget from 'duckdb' config section:
+        # partitions of hash table are spilled to disk when it is exceeded
+        table_a, names_a = left_data.to_table_cols(prefix='A')
+        table_b, names_b = right_data.to_table_cols(prefix='B')
 
         query = f"""
             SELECT * FROM table_a {join_type} table_b
             ON {join_condition}
         """
-        resp_df, _description = query_df_with_type_infer_fallback(query, {
+        use_arrow = pa is not None
+        resp, _description = query_df_with_type_infer_fallback(query, {
             'table_a': table_a,
             'table_b': table_b
-        })
-
-        resp_df.replace({np.nan: None}, inplace=True)
+        }, return_arrow=use_arrow)
 
         names_a.update(names_b)
-        data = ResultSet().from_df_cols(resp_df, col_names=names_a)
+        if use_arrow:
+            data = ResultSet().from_arrow_cols(resp, col_names=names_a)
+        else:
+            resp.replace({np.nan: None}, inplace=True)
+            data = ResultSet().from_df_cols(resp, col_names=names_a)
+
+        for col in data.find_columns('__mindsdb_row_id'):
+            data.del_column(col)
+
+        return data
+
+    @staticmethod
+    def _join_aligned(left_data: ResultSet, right_data: ResultSet, l_row_id, r_row_id) -> Optional[ResultSet]:
+        """Fast path of join by row id: if both sides have the same unique row ids in the same order
+        (it is usual case for data and predictions made on it), result of any join type is the concatenation of
+        columns and hash join is not required
+
+        Returns:
+            Optional[ResultSet]: result of join or None if data is not aligned
+        """
+        if len(left_data) != len(right_data):
+            return None
+
+        left_df = left_data.get_raw_df()
+        right_df = right_data.get_raw_df()
+        l_ids = left_df[left_data.get_col_index(l_row_id)]
+        r_ids = right_df[right_data.get_col_index(r_row_id)]
+        if not l_ids.is_unique or not np.array_equal(l_ids.to_numpy(), r_ids.to_numpy()):
+            return None
+
+        df = pd.concat(
+            [left_df.reset_index(drop=True), right_df.reset_index(drop=True)],
+            axis=1, ignore_index=True
+        )
+        data = ResultSet(columns=left_data.columns + right_data.columns, df=df)
 
         for col in data.find_columns('__mindsdb_row_id'):
             data.del_column(col)
@@ -1,6 +1,6 @@
 from mindsdb.api.executor.planner.steps import UnionStep
 
-from mindsdb.api.executor.sql_query.result_set import ResultSet
+from mindsdb.api.executor.sql_query.result_set import ResultSet, pa
 from mindsdb.api.executor.exceptions import WrongArgumentError
 from mindsdb.api.executor.utilities.sql import query_df_with_type_infer_fallback
 import numpy as np
@@ -30,8 +30,8 @@ class UnionStepCall(BaseStepCall):
         #         if type1 != type2:
         #             raise ErSqlWrongArguments(f'UNION types mismatch: {type1} != {type2}')
 
-        table_a, names = left_result.to_df_cols()
-        table_b, _ = right_result.to_df_cols()
+        table_a, names = left_result.to_table_cols()
+        table_b, _ = right_result.to_table_cols()
 
         op = 'UNION ALL'
         if step.unique:
@@ -42,12 +42,16 @@ class UnionStepCall(BaseStepCall):
             SELECT * FROM table_b
         """
 
-        resp_df, _description = query_df_with_type_infer_fallback(query, {
+        use_arrow = pa is not None
+        resp, _description = query_df_with_type_infer_fallback(query, {
             'table_a': table_a,
             'table_b': table_b
-        })
-        resp_df.replace({np.nan: None}, inplace=True)
+        }, return_arrow=use_arrow)
 
-        data = ResultSet().from_df_cols(resp_df, col_names=names)
+        if use_arrow:
+            data = ResultSet().from_arrow_cols(resp, col_names=names)
+        else:
+            resp.replace({np.nan: None}, inplace=True)
+            data = ResultSet().from_df_cols(resp, col_names=names)
 
         return data
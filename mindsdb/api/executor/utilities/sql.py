@@ -1,9 +1,14 @@
+import re
 import copy
-from typing import List
+import weakref
+import threading
+from pathlib import Path
+from typing import List, Optional
 
 import duckdb
-from duckdb import InvalidInputException
 import numpy as np
+import pandas as pd
+import psutil
 
 from mindsdb_sql_parser import parse_sql
 from mindsdb.utilities.render.sqlalchemy_render import SqlalchemyRender
@@ -15,8 +20,14 @@ from mindsdb_sql_parser.ast import (
 from mindsdb.utilities.functions import resolve_table_identifier, resolve_model_identifier
 
 from mindsdb.utilities import log
+from mindsdb.utilities.config import config
 from mindsdb.utilities.json_encoder import CustomJSONEncoder
 
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 logger = log.getLogger(__name__)
 
 
@@ -52,40 +63,277 @@ def get_query_models(query: ASTNode, default_database: str = None) -> List[tuple
     return _get_query_tables(query, resolve_model_identifier, default_database)
 
 
-def query_df_with_type_infer_fallback(query_str: str, dataframes: dict, user_functions=None):
+MEMORY_SIZE_UNITS = {
+    'b': 1, 'bytes': 1,
+    'kb': 10 ** 3, 'mb': 10 ** 6, 'gb': 10 ** 9, 'tb': 10 ** 12,
+    'kib': 2 ** 10, 'mib': 2 ** 20, 'gib': 2 ** 30, 'tib': 2 ** 40,
+}
+
+
+def parse_memory_size(value) -> int:
+    """Convert size of memory in format of duckdb settings ('4GB', '512MiB') to bytes
+
+    Args:
+        value (int | str): size, int is count of bytes
+
+    Returns:
+        int: count of bytes
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*', str(value))
+    if match is None or (match.group(2) != '' and match.group(2).lower() not in MEMORY_SIZE_UNITS):
+        raise ValueError(f'Wrong size of memory: {value}')
+    number, unit = match.groups()
+    return int(float(number) * MEMORY_SIZE_UNITS.get(unit.lower(), 1))
+
+
+class DuckDBMemoryBudget:
+    """Memory budget of all in-memory duckdb connections of the process. Each thread has own duckdb database, so the
+    budget is divided among live connections: every connection gets memory_limit / count of connections.
+    """
+
+    # limit of connection is not set lower than that
+    MIN_CONNECTION_LIMIT = 64 * 2 ** 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = 0
+
+    @property
+    def total(self) -> int:
+        memory_limit = config.get('duckdb', {}).get('memory_limit')
+        if memory_limit:
+            return parse_memory_size(memory_limit)
+        return psutil.virtual_memory().total // 2
+
+    def add(self, connection: duckdb.DuckDBPyConnection):
+        """Count connection until it is closed or garbage collected (it happens at exit of its thread)"""
+        with self._lock:
+            self._connections += 1
+        weakref.finalize(connection, self._release)
+
+    def _release(self):
+        with self._lock:
+            self._connections -= 1
+
+    def connection_limit(self) -> int:
+        """Memory limit of one connection, in bytes"""
+        with self._lock:
+            connections = max(self._connections, 1)
+        return max(self.total // connections, self.MIN_CONNECTION_LIMIT)
+
+
+duckdb_memory_budget = DuckDBMemoryBudget()
+
+
+class DuckDBContext(threading.local):
+    """Reusable in-memory duckdb connection. One connection is kept per thread, because connection can't be used by
+    several threads simultaneously. Dataframes are registered in it as views (without copying) only for the time of
+    the query, user functions stay registered between queries.
+    Connections of the threads are separate databases, so they share the memory budget, see DuckDBMemoryBudget.
+    """
+
+    def __init__(self):
+        self.connection = None
+        # registered user functions: name -> original callback of the function
+        self.functions = {}
+        # memory_limit which is set in connection, bytes
+        self.memory_limit = None
+
+    def get_connection(self) -> duckdb.DuckDBPyConnection:
+        if self.connection is None:
+            self.connection = duckdb.connect(database=':memory:')
+            self.functions = {}
+            self.memory_limit = None
+            duckdb_memory_budget.add(self.connection)
+            self._apply_config(self.connection)
+
+        # share of the budget changes when connections of other threads are opened or closed, it is applied
+        # before the next query of the thread
+        memory_limit = duckdb_memory_budget.connection_limit()
+        if memory_limit != self.memory_limit:
+            self.connection.execute(f"SET memory_limit='{memory_limit}B'")
+            self.memory_limit = memory_limit
+        return self.connection
+
+    @staticmethod
+    def _apply_config(connection: duckdb.DuckDBPyConnection):
+        """Set spilling of connection: if memory limit is reached duckdb spills hash tables of joins and sort
+        buffers to temp dir instead of failing with out-of-memory
+        """
+        duckdb_config = config.get('duckdb', {})
+
+        if duckdb_config.get('spill_to_disk', True):
+            spill_dir = Path(config['paths']['tmp']) / 'duckdb_spill'
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            connection.execute(f"SET temp_directory='{spill_dir}'")
+        else:
+            connection.execute("SET temp_directory=''")
+
+    def reset(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+        self.connection = None
+        self.functions = {}
+        self.memory_limit = None
+
+    def register_functions(self, user_functions=None):
+        """Make functions of connection match functions of the current query: register only functions which are
+        new or changed since previous call and remove the rest, because the thread serves queries of other sessions
+        """
+        connection = self.get_connection()
+        functions = user_functions.functions if user_functions else {}
+        for name in list(self.functions.keys()):
+            if name not in functions:
+                connection.remove_function(name)
+                del self.functions[name]
+
+        for name, info in functions.items():
+            source = info['source']
+            if self.functions.get(name) is source:
+                continue
+            if name in self.functions:
+                connection.remove_function(name)
+            connection.create_function(
+                name,
+                info['callback'],
+                info['input'],
+                info['output'],
+                null_handling="special"
+            )
+            self.functions[name] = source
+
+
+duckdb_context = DuckDBContext()
+
+
+# kind of values of object column (pandas.api.types.infer_dtype) -> alias of arrow type,
+# None: arrow type is defined by values (dates, decimals)
+OBJECT_COLUMN_TYPES = {
+    'string': 'string',
+    'integer': 'int64',
+    'floating': 'float64',
+    'mixed-integer-float': 'float64',
+    'boolean': 'bool',
+    'empty': 'null',
+    'bytes': 'binary',
+    'date': None,
+    'datetime': None,
+    'time': None,
+    'decimal': None,
+}
+
+
+def df_to_typed_arrow(df: pd.DataFrame, column_types: Optional[List] = None):
+    """Convert dataframe to arrow table with explicit types of columns. Types of 'object' columns are taken from
+    column_types, if they are known there, or defined by one vectorized pass over the values. So duckdb doesn't need
+    to infer them by sample of rows.
+
+    Args:
+        df (pd.DataFrame): dataframe
+        column_types (Optional[List]): types of columns (Column.type), by index of column
+
+    Returns:
+        Optional[pa.Table]: table or None if types of columns can't be declared (mixed types, nested values, etc),
+            in that case dataframe has to be used as is
+    """
+    if pa is None or not all(isinstance(name, str) for name in df.columns) or not df.columns.is_unique:
+        return None
+    arrays = []
+    try:
+        for i, dtype in enumerate(df.dtypes):
+            series = df.iloc[:, i]
+            arrow_type = None
+            if dtype == object:
+                declared = column_types[i] if column_types is not None else None
+                if isinstance(declared, np.dtype) and declared.kind in 'iufb':
+                    arrow_type = pa.from_numpy_dtype(declared)
+                else:
+                    kind = pd.api.types.infer_dtype(series, skipna=True)
+                    if kind not in OBJECT_COLUMN_TYPES:
+                        return None
+                    if OBJECT_COLUMN_TYPES[kind] is not None:
+                        arrow_type = pa.type_for_alias(OBJECT_COLUMN_TYPES[kind])
+            arrays.append(pa.array(series, type=arrow_type, from_pandas=True))
+    except (pa.ArrowException, ValueError, TypeError, OverflowError):
+        return None
+    return pa.Table.from_arrays(arrays, names=list(df.columns))
+
+
+def get_type_infer_sample_size(dataframes: dict) -> int:
+    """Duckdb infers types of 'object' columns of dataframes by sample of rows.
+    Use size of the biggest dataframe with such columns, to infer types by all rows in one pass.
+    Only dataframes which types can't be declared explicitly (see df_to_typed_arrow) are inferred that way.
+
+    Args:
+        dataframes (dict): dataframes or arrow tables
+
+    Returns:
+        int: sample size
+    """
+    sample_size = 1000
+    for df in dataframes.values():
+        if not isinstance(df, pd.DataFrame):
+            # arrow tables have explicit types
+            continue
+        if any(dtype == object for dtype in df.dtypes):
+            sample_size = max(sample_size, len(df))
+    return sample_size
+
+
+def query_df_with_type_infer_fallback(query_str: str, dataframes: dict, user_functions=None, return_arrow=False):
     ''' Duckdb need to infer column types if column.dtype == object. By default it take 1000 rows,
-        but that may be not sufficient for some cases. This func try to run query multiple times
-        increasing butch size for type infer
+        but that may be not sufficient for some cases. Types of object columns are declared by converting dataframes
+        to arrow tables, if it is possible. For the rest this func sets size of the sample to length of dataframes
+        with 'object' columns, so the query is executed once.
+        Query is executed in reusable connection of current thread.
 
         Args:
             query_str (str): query to execute
-            dataframes (dict): dataframes
+            dataframes (dict): dataframes or arrow tables
             user_functions: functions controller which register new functions in connection
+            return_arrow (bool): return result as arrow table instead of dataframe
 
         Returns:
-            pandas.DataFrame
+            pandas.DataFrame | pyarrow.Table
             pandas.columns
     '''
 
+    con = duckdb_context.get_connection()
+    duckdb_context.register_functions(user_functions)
+
+    dataframes = dict(dataframes)
     for name, value in dataframes.items():
-        locals()[name] = value
-
-    con = duckdb.connect(database=':memory:')
-    if user_functions:
-        user_functions.register(con)
-
-    for sample_size in [1000, 10000, 1000000]:
-        try:
-            con.execute(f'set global pandas_analyze_sample={sample_size};')
-            result_df = con.execute(query_str).fetchdf()
-        except InvalidInputException:
-            pass
+        if isinstance(value, pd.DataFrame) and any(dtype == object for dtype in value.dtypes):
+            # declare types of object columns, to not infer them by sample of rows
+            table = df_to_typed_arrow(value)
+            if table is not None:
+                dataframes[name] = table
+        con.register(name, dataframes[name])
+
+    try:
+        con.execute(f'SET pandas_analyze_sample={get_type_infer_sample_size(dataframes)};')
+        result = con.execute(query_str)
+        if return_arrow:
+            result_df = result.arrow()
         else:
-            break
-    else:
-        raise InvalidInputException
-    description = con.description
-    con.close()
+            result_df = result.fetchdf()
+        description = con.description
+    except (duckdb.FatalException, duckdb.InternalException):
+        # connection could be in broken state
+        duckdb_context.reset()
+        raise
+    finally:
+        if duckdb_context.connection is not None:
+            for name in dataframes.keys():
+                try:
+                    con.unregister(name)
+                except duckdb.Error:
+                    pass
 
     return result_df, description
 
@@ -13,6 +13,9 @@ class Dummy:
 
 
 class FakeMysqlProxy(MysqlProxy):
+    # consumers of answers use the whole data
+    stream_results = False
+
     def __init__(self):
         request = Dummy()
         client_address = ['', '']
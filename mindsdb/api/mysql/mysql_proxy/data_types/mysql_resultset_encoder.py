@@ -0,0 +1,183 @@
+"""
+Column-wise encoder of rows of text resultset
+https://dev.mysql.com/doc/internals/en/com-query-response.html#packet-ProtocolText::ResultsetRow
+
+Each column is converted to strings and length-encoded once for all rows, rows and packets headers are assembled
+from these arrays, so there is no python object per row or per field.
+"""
+
+import struct
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import MAX_PACKET_SIZE, NULL_VALUE
+
+# length prefixes for strings shorter than 251 bytes
+_SHORT_PREFIXES = np.array([bytes([i]) for i in range(251)], dtype=object)
+
+
+def _length_prefix(length: int) -> bytes:
+    # length-encoded integer for lengths >= 251
+    if length < 1 << 16:
+        return b'\xfc' + struct.pack('<H', length)
+    if length < 1 << 24:
+        return b'\xfd' + struct.pack('<I', length)[:3]
+    return b'\xfe' + struct.pack('<Q', length)
+
+
+def _column_to_bytes(series: pd.Series) -> np.ndarray:
+    """Convert values of column to utf-8 strings, the same way as str(value)"""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and (dtype.kind in 'iub' or dtype == np.float64):
+        # python scalars: faster conversion to str
+        values = series.tolist()
+    else:
+        values = series.to_numpy(dtype=object)
+    return np.fromiter(
+        ((v if isinstance(v, str) else str(v)).encode('utf-8') for v in values),
+        dtype=object, count=len(values)
+    )
+
+
+def encode_column(series: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert column to length-encoded strings
+
+    Args:
+        series (pd.Series): column
+
+    Returns:
+        np.ndarray: array of encoded values (bytes), NULL_VALUE for nulls
+        np.ndarray: size of encoded values
+        np.ndarray: length of values without prefix
+    """
+    series = series.reset_index(drop=True)
+    null_mask = series.isna().to_numpy()
+
+    encoded = np.empty(len(series), dtype=object)
+    sizes = np.ones(len(series), dtype=np.int64)
+    value_lengths = np.zeros(len(series), dtype=np.int64)
+    encoded[null_mask] = NULL_VALUE
+
+    not_null = ~null_mask
+    if not_null.any():
+        values = _column_to_bytes(series[not_null])
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+
+        prefixes = np.empty(len(values), dtype=object)
+        short = lengths < 251
+        prefixes[short] = _SHORT_PREFIXES[lengths[short]]
+        for i in np.flatnonzero(~short):
+            prefixes[i] = _length_prefix(int(lengths[i]))
+
+        encoded[not_null] = prefixes + values
+        prefix_sizes = np.where(short, 1, np.where(lengths < 1 << 16, 3, np.where(lengths < 1 << 24, 4, 9)))
+        sizes[not_null] = prefix_sizes + lengths
+        value_lengths[not_null] = lengths
+
+    return encoded, sizes, value_lengths
+
+
+class TextResultsetEncoder:
+    """Encodes dataframe to packets of text resultset rows
+
+    How to use it:
+
+        encoder = TextResultsetEncoder(df)
+        columns_len = encoder.columns_max_length()
+        for chunk, next_seq in encoder.iter_packets(first_seq):
+            socket.sendall(chunk)
+    """
+
+    def __init__(self, df: pd.DataFrame, chunk_size: int = 10000):
+        """
+        Args:
+            df (pd.DataFrame): data to encode
+            chunk_size (int): count of rows encoded at once, limits used memory
+        """
+        self.df = df
+        self.chunk_size = chunk_size
+
+    def columns_max_length(self, sample_size: int = 100) -> List[int]:
+        """Max length of values of columns. It is used by mysql client to determine width of columns,
+        so it is not mandatory to get exactly max value, the sample is used
+
+        Returns:
+            List[int]: length for each column
+        """
+        sample = self.df.head(sample_size)
+        columns_len = []
+        for i in range(len(sample.columns)):
+            _, _, value_lengths = encode_column(sample.iloc[:, i])
+            columns_len.append(max(int(value_lengths.max()) if len(value_lengths) > 0 else 0, 1))
+        return columns_len
+
+    def encode_rows(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode rows to bodies of packets
+
+        Returns:
+            np.ndarray: bodies of rows (bytes)
+            np.ndarray: length of bodies
+        """
+        bodies = None
+        lengths = np.zeros(len(df), dtype=np.int64)
+        for i in range(len(df.columns)):
+            encoded, sizes, _ = encode_column(df.iloc[:, i])
+            bodies = encoded if bodies is None else bodies + encoded
+            lengths += sizes
+        if bodies is None:
+            bodies = np.full(len(df), b'', dtype=object)
+        return bodies, lengths
+
+    def iter_packets(self, seq: int) -> Iterator[Tuple[bytes, int]]:
+        """Encode data to packets
+
+        Args:
+            seq (int): sequence number of first packet
+
+        Yields:
+            bytes: packets of chunk of rows
+            int: sequence number of next packet
+        """
+        for start in range(0, len(self.df), self.chunk_size):
+            bodies, lengths = self.encode_rows(self.df.iloc[start:start + self.chunk_size])
+            if (lengths >= MAX_PACKET_SIZE).any():
+                chunk, seq = self._assemble_split(bodies, seq)
+            else:
+                chunk, seq = self._assemble(bodies, lengths, seq)
+            yield chunk, seq
+
+    @staticmethod
+    def _assemble(bodies: np.ndarray, lengths: np.ndarray, seq: int) -> Tuple[bytearray, int]:
+        # headers of all packets: 3 bytes of length + sequence number
+        count = len(bodies)
+        headers = np.empty((count, 4), dtype=np.uint8)
+        headers[:, 0] = lengths & 0xFF
+        headers[:, 1] = (lengths >> 8) & 0xFF
+        headers[:, 2] = (lengths >> 16) & 0xFF
+        headers[:, 3] = (seq + np.arange(count)) % 256
+
+        # copy everything into preallocated buffer
+        buffer = bytearray(int(lengths.sum()) + count * 4)
+        view = memoryview(buffer)
+        headers = headers.tobytes()
+        pos = 0
+        for i, (body, length) in enumerate(zip(bodies, lengths.tolist())):
+            view[pos:pos + 4] = headers[i * 4:i * 4 + 4]
+            pos += 4
+            view[pos:pos + length] = body
+            pos += length
+        return buffer, (seq + count) % 256
+
+    @staticmethod
+    def _assemble_split(bodies: np.ndarray, seq: int) -> Tuple[bytearray, int]:
+        # rows of 16Mb and bigger are split to several packets
+        buffer = bytearray()
+        for body in bodies:
+            for start in range(0, len(body) + 1, MAX_PACKET_SIZE):
+                part = body[start:start + MAX_PACKET_SIZE]
+                buffer += struct.pack('<I', len(part))[:3] + bytes([seq])
+                buffer += part
+                seq = (seq + 1) % 256
+        return buffer, seq
@@ -1,4 +1,4 @@
-from mindsdb_sql_parser import parse_sql
+from mindsdb.api.executor.sql_query.statement_cache import parse_sql
 from mindsdb.api.executor.planner import utils as planner_utils
 
 import mindsdb.utilities.profiler as profiler
@@ -31,7 +31,8 @@ class Executor:
         self.sql = ""
         self.sql_lower = ""
 
-        context = {'connection_id': self.sqlserver.connection_id}
+        # stream: result of select from integration is sent to client while it is fetched from database
+        context = {'connection_id': self.sqlserver.connection_id, 'stream': self.sqlserver.stream_results}
         self.command_executor = ExecuteCommands(self.session, context)
 
     def change_default_db(self, new_db):
@@ -76,6 +76,18 @@ class SERVER_STATUS(object):
 SERVER_STATUS = SERVER_STATUS()
 
 
+# CURSOR TYPES: flags of COM_STMT_EXECUTE
+class CURSOR_TYPE(object):
+    __slots__ = ()
+    CURSOR_TYPE_NO_CURSOR = 0
+    CURSOR_TYPE_READ_ONLY = 1
+    CURSOR_TYPE_FOR_UPDATE = 2
+    CURSOR_TYPE_SCROLLABLE = 4
+
+
+CURSOR_TYPE = CURSOR_TYPE()
+
+
 # COMMANDS
 class COMMANDS(object):
     __slots__ = ()
@@ -11,6 +11,7 @@
 
 import atexit
 import base64
+import itertools
 import os
 import select
 import socket
@@ -21,14 +22,12 @@ import sys
 import tempfile
 import traceback
 from functools import partial
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Iterator
 from dataclasses import dataclass
 
 from numpy import dtype as np_dtype
 from pandas.api import types as pd_types
 
-from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import NULL_VALUE
-from mindsdb.api.mysql.mysql_proxy.data_types.mysql_datum import Datum
 
 import mindsdb.utilities.hooks as hooks
 import mindsdb.utilities.profiler as profiler
@@ -39,6 +38,7 @@ from mindsdb.api.mysql.mysql_proxy.classes.server_capabilities import (
 )
 from mindsdb.api.executor.controllers import SessionController
 from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packet import Packet
+from mindsdb.api.mysql.mysql_proxy.data_types.mysql_resultset_encoder import TextResultsetEncoder
 from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packets import (
     BinaryResultsetRowPacket,
     ColumnCountPacket,
@@ -51,7 +51,6 @@ from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packets import (
     HandshakeResponsePacket,
     OkPacket,
     PasswordAnswer,
-    ResultsetRowPacket,
     STMTPrepareHeaderPacket,
     SwitchOutPacket,
     SwitchOutResponse,
@@ -64,13 +63,14 @@ from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import (
     CAPABILITIES,
     CHARSET_NUMBERS,
     COMMANDS,
+    CURSOR_TYPE,
     DEFAULT_AUTH_METHOD,
     ERR,
     SERVER_STATUS,
     TYPES,
     getConstName,
 )
-from mindsdb.api.executor.data_types.answer import ExecuteAnswer
+from mindsdb.api.executor.data_types.answer import ExecuteAnswer, ResultCursor
 from mindsdb.api.executor.data_types.response_type import RESPONSE_TYPE
 from mindsdb.api.mysql.mysql_proxy.utilities import (
     ErWrongCharset,
@@ -79,6 +79,7 @@ from mindsdb.api.mysql.mysql_proxy.utilities import (
 from mindsdb.api.executor import exceptions as exec_exc
 
 from mindsdb.api.common.check_auth import check_auth
+from mindsdb.api.common.async_server import AsyncTCPServer
 from mindsdb.api.mysql.mysql_proxy.utilities.lightwood_dtype import dtype
 from mindsdb.utilities import log
 from mindsdb.utilities.config import config
@@ -98,6 +99,7 @@ class SQLAnswer:
     resp_type: RESPONSE_TYPE = RESPONSE_TYPE.OK
     columns: Optional[List[Dict]] = None
     data: Optional[List[Dict]] = None   # resultSet ?
+    data_stream: Optional[Iterator] = None  # next chunks of data
     status: Optional[int] = None
     state_track: Optional[List[List]] = None
     error_code: Optional[int] = None
@@ -114,6 +116,9 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
     The Main Server controller class
     """
 
+    # results of selects can be sent to client by chunks, see send_table_packets
+    stream_results = True
+
     @staticmethod
     def server_close(srv):
         srv.server_close()
@@ -124,6 +129,7 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
         self.session = None
         self.client_capabilities = None
         self.connection_id = None
+        self.is_opened = False
         super().__init__(request, client_address, server)
 
     def init_session(self):
@@ -307,23 +313,17 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
         self.socket.sendall(string)
 
     def answer_stmt_close(self, stmt_id):
+        cursor = self.session.prepared_stmts[stmt_id].get("cursor")
+        if cursor is not None:
+            cursor.close()
         self.session.unregister_stmt(stmt_id)
 
     def send_query_answer(self, answer: SQLAnswer):
         if answer.type == RESPONSE_TYPE.TABLE:
-            packages = []
-
-            if len(answer.data) > 1000:
-                # for big responses leverage pandas map function to convert data to packages
-                self.send_table_packets(columns=answer.columns, data=answer.data)
-            else:
-                packages += self.get_table_packets(columns=answer.columns, data=answer.data.to_lists())
-
-            if answer.status is not None:
-                packages.append(self.last_packet(status=answer.status))
-            else:
-                packages.append(self.last_packet())
-            self.send_package_group(packages)
+            self.send_table_packets(
+                columns=answer.columns, data=answer.data, last_packet_status=answer.status,
+                data_stream=answer.data_stream
+            )
         elif answer.type == RESPONSE_TYPE.OK:
             self.packet(OkPacket, state_track=answer.state_track, affected_rows=answer.affected_rows).send()
         elif answer.type == RESPONSE_TYPE.ERROR:
@@ -375,40 +375,22 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             )
         return packets
 
-    def get_table_packets(self, columns, data, status=0):
-        # TODO remove columns order
-        packets = [self.packet(ColumnCountPacket, count=len(columns))]
-        packets.extend(self._get_column_defenition_packets(columns, data))
+    def send_table_packets(self, columns, data, status=0, last_packet_status=None, data_stream=None):
+        """Send resultset using text protocol. Data is encoded column by column and sent by chunks
 
-        if self.client_capabilities.DEPRECATE_EOF is False:
-            packets.append(self.packet(EofPacket, status=status))
-
-        packets += [self.packet(ResultsetRowPacket, data=x) for x in data]
-        return packets
-
-    def send_table_packets(self, columns, data, status=0):
-        # text protocol, convert all to string and serialize as packages
-        df = data.get_raw_df()
-
-        def apply_f(v):
-            if v is None:
-                return NULL_VALUE
-            if not isinstance(v, str):
-                v = str(v)
-            return Datum.serialize_str(v)
+        Args:
+            columns (List[dict]): columns definitions
+            data (ResultSet): data to send
+            status (int): status of EOF packet after columns definitions
+            last_packet_status (int): status of the last packet
+            data_stream (Iterator[ResultSet]): next chunks of data, they are sent as soon as they are fetched
+        """
+        encoder = TextResultsetEncoder(data.get_raw_df())
 
-        # get column max size
-        # column_len is used by mysql client to determine width of columns, so it is not mandatory
-        # to get exactly max value. We can approximate them by sample.
+        # column_len is used by mysql client to determine width of columns
         columns_len = None
-        if len(df) > 0:
-            sample = df.head(100)
-            columns_len = []
-            for column in sample.columns:
-                try:
-                    columns_len.append(sample[column].astype(str).str.len().max())
-                except Exception:
-                    columns_len.append(1)
+        if len(data) > 0:
+            columns_len = encoder.columns_max_length()
 
         # columns packages
         packets = [self.packet(ColumnCountPacket, count=len(columns))]
@@ -417,15 +399,29 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
 
         if self.client_capabilities.DEPRECATE_EOF is False:
             packets.append(self.packet(EofPacket, status=status))
-        self.send_package_group(packets)
 
-        chunk_size = 100
-        for start in range(0, len(df), chunk_size):
-            string = b"".join([
-                self.packet(body=body, length=len(body)).accum()
-                for body in df[start:start + chunk_size].applymap(apply_f).values.sum(axis=1)
-            ])
-            self.socket.sendall(string)
+        buffer = bytearray(b"".join([x.accum() for x in packets]))
+        encoders = [encoder]
+        if data_stream is not None:
+            encoders = itertools.chain(
+                encoders, (TextResultsetEncoder(chunk.get_raw_df()) for chunk in data_stream)
+            )
+        for encoder in encoders:
+            for chunk, seq in encoder.iter_packets(self.session.packet_sequence_number):
+                self.session.packet_sequence_number = seq
+                if len(buffer) > 0:
+                    buffer += chunk
+                    self.socket.sendall(buffer)
+                    buffer = bytearray()
+                else:
+                    self.socket.sendall(chunk)
+
+        if last_packet_status is not None:
+            last_packet = self.last_packet(status=last_packet_status)
+        else:
+            last_packet = self.last_packet()
+        buffer += last_packet.accum()
+        self.socket.sendall(buffer)
 
     def decode_utf(self, text):
         try:
@@ -553,6 +549,7 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
                 state_track=executor_answer.state_track,
                 columns=self.to_mysql_columns(executor_answer.data.columns),
                 data=executor_answer.data,
+                data_stream=executor_answer.data_stream,
                 status=executor.server_status,
                 affected_rows=executor_answer.affected_rows
             )
@@ -594,13 +591,16 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
 
         self.send_package_group(packages)
 
-    def answer_stmt_execute(self, stmt_id, parameters):
+    def answer_stmt_execute(self, stmt_id, parameters, flags=CURSOR_TYPE.CURSOR_TYPE_NO_CURSOR):
         prepared_stmt = self.session.prepared_stmts[stmt_id]
         executor: Executor = prepared_stmt["statement"]
 
         executor.stmt_execute(parameters)
 
         executor_answer: ExecuteAnswer = executor.executor_answer
+        if executor_answer.data_stream is not None:
+            # stream can be read only once: the next execution has to run the query again
+            executor.is_executed = False
 
         if executor_answer.data is None:
             resp = SQLAnswer(
@@ -614,28 +614,50 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
 
         packages.extend(self._get_column_defenition_packets(columns_def))
 
+        if flags & CURSOR_TYPE.CURSOR_TYPE_READ_ONLY:
+            # client reads rows using COM_STMT_FETCH
+            if prepared_stmt.get("cursor") is not None:
+                prepared_stmt["cursor"].close()
+            prepared_stmt["cursor"] = ResultCursor(executor_answer)
+            prepared_stmt["fetched"] = 0
+
+            status = sum(
+                [
+                    SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT,
+                    SERVER_STATUS.SERVER_STATUS_CURSOR_EXISTS,
+                ]
+            )
+            if self.client_capabilities.DEPRECATE_EOF is False:
+                packages.append(self.packet(EofPacket, status=status))
+            else:
+                packages.append(self.last_packet(status=status))
+            return self.send_package_group(packages)
+
         if self.client_capabilities.DEPRECATE_EOF is False:
             packages.append(self.packet(EofPacket, status=0x0062))
 
-        # send all
-        for row in executor_answer.data.to_lists():
-            packages.append(
-                self.packet(BinaryResultsetRowPacket, data=row, columns=columns_def)
-            )
+        # send all, chunk by chunk
+        for data in executor_answer.iter_data():
+            for row in data.to_lists():
+                packages.append(
+                    self.packet(BinaryResultsetRowPacket, data=row, columns=columns_def)
+                )
+            prepared_stmt["fetched"] += len(data)
+            self.send_package_group(packages)
+            packages = []
 
         server_status = executor.server_status or 0x0002
         packages.append(self.last_packet(status=server_status))
-        prepared_stmt["fetched"] += len(executor_answer.data)
 
         return self.send_package_group(packages)
 
     def answer_stmt_fetch(self, stmt_id, limit):
         prepared_stmt = self.session.prepared_stmts[stmt_id]
         executor = prepared_stmt["statement"]
-        fetched = prepared_stmt["fetched"]
+        cursor: ResultCursor = prepared_stmt.get("cursor")
         executor_answer: ExecuteAnswer = executor.executor_answer
 
-        if executor_answer.data is None:
+        if executor_answer.data is None or cursor is None:
             resp = SQLAnswer(
                 resp_type=RESPONSE_TYPE.OK, state_track=executor_answer.state_track
             )
@@ -643,14 +665,14 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
 
         packages = []
         columns = self.to_mysql_columns(executor_answer.data.columns)
-        for row in executor_answer.data[fetched:limit].to_lists():
+        for row in cursor.fetch(limit):
             packages.append(
                 self.packet(BinaryResultsetRowPacket, data=row, columns=columns)
             )
 
-        prepared_stmt["fetched"] += len(executor_answer.data[fetched:limit])
+        prepared_stmt["fetched"] = cursor.fetched
 
-        if len(executor_answer.data) <= limit + fetched:
+        if cursor.is_finished:
             status = sum(
                 [
                     SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT,
@@ -696,162 +718,192 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             self.session.username = "cloud"
             self.session.auth = True
 
-        while True:
-            logger.debug("Got a new packet")
-            p = self.packet(CommandPacket)
+        self.is_opened = True
+        if getattr(self.server, "is_async", False):
+            # server calls handle_command when client sends data
+            return
 
-            try:
-                success = p.get()
-            except Exception:
-                logger.error("Session closed, on packet read error")
-                logger.error(traceback.format_exc())
-                return
-
-            if success is False:
-                logger.debug("Session closed by client")
-                return
+        try:
+            while self.handle_command():
+                pass
+        finally:
+            self.close_connection()
+
+    def has_pending_data(self) -> bool:
+        """Check if data from client is already read by ssl layer"""
+        return isinstance(self.socket, ssl.SSLSocket) and self.socket.pending() > 0
+
+    def close_connection(self):
+        if self.session is None:
+            return
+        for prepared_stmt in self.session.prepared_stmts.values():
+            cursor = prepared_stmt.pop("cursor", None)
+            if cursor is not None:
+                cursor.close()
+
+    def handle_command(self) -> bool:
+        """Read and process one command from client
+
+        Returns:
+            bool: False if connection is closed
+        """
+        logger.debug("Got a new packet")
+        p = self.packet(CommandPacket)
 
-            logger.debug(
-                "Command TYPE: {type}".format(type=getConstName(COMMANDS, p.type.value))
-            )
+        try:
+            success = p.get()
+        except Exception:
+            logger.error("Session closed, on packet read error")
+            logger.error(traceback.format_exc())
+            return False
 
-            command_names = {
-                COMMANDS.COM_QUERY: "COM_QUERY",
-                COMMANDS.COM_STMT_PREPARE: "COM_STMT_PREPARE",
-                COMMANDS.COM_STMT_EXECUTE: "COM_STMT_EXECUTE",
-                COMMANDS.COM_STMT_FETCH: "COM_STMT_FETCH",
-                COMMANDS.COM_STMT_CLOSE: "COM_STMT_CLOSE",
-                COMMANDS.COM_QUIT: "COM_QUIT",
-                COMMANDS.COM_INIT_DB: "COM_INIT_DB",
-                COMMANDS.COM_FIELD_LIST: "COM_FIELD_LIST",
-            }
+        if success is False:
+            logger.debug("Session closed by client")
+            return False
 
-            command_name = command_names.get(p.type.value, f"UNKNOWN {p.type.value}")
-            sql = None
-            response = None
-            error_type = None
-            error_code = None
-            error_text = None
-            error_traceback = None
+        logger.debug(
+            "Command TYPE: {type}".format(type=getConstName(COMMANDS, p.type.value))
+        )
 
-            try:
-                if p.type.value == COMMANDS.COM_QUERY:
-                    sql = self.decode_utf(p.sql.value)
-                    sql = clear_sql(sql)
-                    logger.debug(f'Incoming query: {sql}')
-                    profiler.set_meta(
-                        query=sql, api="mysql", environment=config.get("environment")
-                    )
-                    with profiler.Context("mysql_query_processing"):
-                        response = self.process_query(sql)
-                elif p.type.value == COMMANDS.COM_STMT_PREPARE:
-                    sql = self.decode_utf(p.sql.value)
-                    self.answer_stmt_prepare(sql)
-                elif p.type.value == COMMANDS.COM_STMT_EXECUTE:
-                    self.answer_stmt_execute(p.stmt_id.value, p.parameters)
-                elif p.type.value == COMMANDS.COM_STMT_FETCH:
-                    self.answer_stmt_fetch(p.stmt_id.value, p.limit.value)
-                elif p.type.value == COMMANDS.COM_STMT_CLOSE:
-                    self.answer_stmt_close(p.stmt_id.value)
-                elif p.type.value == COMMANDS.COM_QUIT:
-                    logger.debug("Session closed, on client disconnect")
-                    self.session = None
-                    break
-                elif p.type.value == COMMANDS.COM_INIT_DB:
-                    new_database = p.database.value.decode()
-
-                    executor = Executor(session=self.session, sqlserver=self)
-                    executor.change_default_db(new_database)
-
-                    response = SQLAnswer(RESPONSE_TYPE.OK)
-                elif p.type.value == COMMANDS.COM_FIELD_LIST:
-                    # this command is deprecated, but console client still use it.
-                    response = SQLAnswer(RESPONSE_TYPE.OK)
-                elif p.type.value == COMMANDS.COM_STMT_RESET:
-                    response = SQLAnswer(RESPONSE_TYPE.OK)
-                else:
-                    logger.warning("Command has no specific handler, return OK msg")
-                    logger.debug(str(p))
-                    # p.pprintPacket() TODO: Make a version of print packet
-                    # that sends it to debug instead
-                    response = SQLAnswer(RESPONSE_TYPE.OK)
-
-            except SqlApiException as e:
-                # classified error
-                error_type = "expected"
-
-                response = SQLAnswer(
-                    resp_type=RESPONSE_TYPE.ERROR,
-                    error_code=e.err_code,
-                    error_message=str(e),
-                )
+        command_names = {
+            COMMANDS.COM_QUERY: "COM_QUERY",
+            COMMANDS.COM_STMT_PREPARE: "COM_STMT_PREPARE",
+            COMMANDS.COM_STMT_EXECUTE: "COM_STMT_EXECUTE",
+            COMMANDS.COM_STMT_FETCH: "COM_STMT_FETCH",
+            COMMANDS.COM_STMT_CLOSE: "COM_STMT_CLOSE",
+            COMMANDS.COM_QUIT: "COM_QUIT",
+            COMMANDS.COM_INIT_DB: "COM_INIT_DB",
+            COMMANDS.COM_FIELD_LIST: "COM_FIELD_LIST",
+        }
 
-            except exec_exc.ExecutorException as e:
-                # unclassified
-                error_type = "expected"
-
-                if isinstance(e, exec_exc.NotSupportedYet):
-                    error_code = ERR.ER_NOT_SUPPORTED_YET
-                elif isinstance(e, exec_exc.KeyColumnDoesNotExist):
-                    error_code = ERR.ER_KEY_COLUMN_DOES_NOT_EXIST
-                elif isinstance(e, exec_exc.TableNotExistError):
-                    error_code = ERR.ER_TABLE_EXISTS_ERROR
-                elif isinstance(e, exec_exc.WrongArgumentError):
-                    error_code = ERR.ER_WRONG_ARGUMENTS
-                elif isinstance(e, exec_exc.LogicError):
-                    error_code = ERR.ER_WRONG_USAGE
-                elif isinstance(e, (exec_exc.BadDbError, exec_exc.BadTableError)):
-                    error_code = ERR.ER_BAD_DB_ERROR
-                else:
-                    error_code = ERR.ER_SYNTAX_ERROR
+        command_name = command_names.get(p.type.value, f"UNKNOWN {p.type.value}")
+        sql = None
+        response = None
+        error_type = None
+        error_code = None
+        error_text = None
+        error_traceback = None
 
-                response = SQLAnswer(
-                    resp_type=RESPONSE_TYPE.ERROR,
-                    error_code=error_code,
-                    error_message=str(e),
-                )
-            except exec_exc.UnknownError as e:
-                # unclassified
-                error_type = "unexpected"
-
-                response = SQLAnswer(
-                    resp_type=RESPONSE_TYPE.ERROR,
-                    error_code=ERR.ER_UNKNOWN_ERROR,
-                    error_message=str(e),
+        try:
+            if p.type.value == COMMANDS.COM_QUERY:
+                sql = self.decode_utf(p.sql.value)
+                sql = clear_sql(sql)
+                logger.debug(f'Incoming query: {sql}')
+                profiler.set_meta(
+                    query=sql, api="mysql", environment=config.get("environment")
                 )
+                with profiler.Context("mysql_query_processing"):
+                    response = self.process_query(sql)
+            elif p.type.value == COMMANDS.COM_STMT_PREPARE:
+                sql = self.decode_utf(p.sql.value)
+                self.answer_stmt_prepare(sql)
+            elif p.type.value == COMMANDS.COM_STMT_EXECUTE:
+                self.answer_stmt_execute(p.stmt_id.value, p.parameters, p.flags.value)
+            elif p.type.value == COMMANDS.COM_STMT_FETCH:
+                self.answer_stmt_fetch(p.stmt_id.value, p.limit.value)
+            elif p.type.value == COMMANDS.COM_STMT_CLOSE:
+                self.answer_stmt_close(p.stmt_id.value)
+            elif p.type.value == COMMANDS.COM_QUIT:
+                logger.debug("Session closed, on client disconnect")
+                self.close_connection()
+                self.session = None
+                return False
+            elif p.type.value == COMMANDS.COM_INIT_DB:
+                new_database = p.database.value.decode()
+
+                executor = Executor(session=self.session, sqlserver=self)
+                executor.change_default_db(new_database)
+
+                response = SQLAnswer(RESPONSE_TYPE.OK)
+            elif p.type.value == COMMANDS.COM_FIELD_LIST:
+                # this command is deprecated, but console client still use it.
+                response = SQLAnswer(RESPONSE_TYPE.OK)
+            elif p.type.value == COMMANDS.COM_STMT_RESET:
+                response = SQLAnswer(RESPONSE_TYPE.OK)
+            else:
+                logger.warning("Command has no specific handler, return OK msg")
+                logger.debug(str(p))
+                # p.pprintPacket() TODO: Make a version of print packet
+                # that sends it to debug instead
+                response = SQLAnswer(RESPONSE_TYPE.OK)
+
+        except SqlApiException as e:
+            # classified error
+            error_type = "expected"
+
+            response = SQLAnswer(
+                resp_type=RESPONSE_TYPE.ERROR,
+                error_code=e.err_code,
+                error_message=str(e),
+            )
 
-            except Exception as e:
-                # any other exception
-                error_type = "unexpected"
-                error_traceback = traceback.format_exc()
-                logger.error(
-                    f"ERROR while executing query\n" f"{error_traceback}\n" f"{e}"
-                )
+        except exec_exc.ExecutorException as e:
+            # unclassified
+            error_type = "expected"
+
+            if isinstance(e, exec_exc.NotSupportedYet):
+                error_code = ERR.ER_NOT_SUPPORTED_YET
+            elif isinstance(e, exec_exc.KeyColumnDoesNotExist):
+                error_code = ERR.ER_KEY_COLUMN_DOES_NOT_EXIST
+            elif isinstance(e, exec_exc.TableNotExistError):
+                error_code = ERR.ER_TABLE_EXISTS_ERROR
+            elif isinstance(e, exec_exc.WrongArgumentError):
+                error_code = ERR.ER_WRONG_ARGUMENTS
+            elif isinstance(e, exec_exc.LogicError):
+                error_code = ERR.ER_WRONG_USAGE
+            elif isinstance(e, (exec_exc.BadDbError, exec_exc.BadTableError)):
+                error_code = ERR.ER_BAD_DB_ERROR
+            else:
                 error_code = ERR.ER_SYNTAX_ERROR
-                response = SQLAnswer(
-                    resp_type=RESPONSE_TYPE.ERROR,
-                    error_code=error_code,
-                    error_message=str(e),
-                )
 
-            if response is not None:
-                self.send_query_answer(response)
-                if response.type == RESPONSE_TYPE.ERROR:
-                    error_text = response.error_message
-                    error_code = response.error_code
-                    error_type = error_type or "expected"
-
-            hooks.after_api_query(
-                company_id=ctx.company_id,
-                api="mysql",
-                command=command_name,
-                payload=sql,
-                error_type=error_type,
+            response = SQLAnswer(
+                resp_type=RESPONSE_TYPE.ERROR,
                 error_code=error_code,
-                error_text=error_text,
-                traceback=error_traceback,
+                error_message=str(e),
+            )
+        except exec_exc.UnknownError as e:
+            # unclassified
+            error_type = "unexpected"
+
+            response = SQLAnswer(
+                resp_type=RESPONSE_TYPE.ERROR,
+                error_code=ERR.ER_UNKNOWN_ERROR,
+                error_message=str(e),
+            )
+
+        except Exception as e:
+            # any other exception
+            error_type = "unexpected"
+            error_traceback = traceback.format_exc()
+            logger.error(
+                f"ERROR while executing query\n" f"{error_traceback}\n" f"{e}"
+            )
+            error_code = ERR.ER_SYNTAX_ERROR
+            response = SQLAnswer(
+                resp_type=RESPONSE_TYPE.ERROR,
+                error_code=error_code,
+                error_message=str(e),
             )
 
+        if response is not None:
+            self.send_query_answer(response)
+            if response.type == RESPONSE_TYPE.ERROR:
+                error_text = response.error_message
+                error_code = response.error_code
+                error_type = error_type or "expected"
+
+        hooks.after_api_query(
+            company_id=ctx.company_id,
+            api="mysql",
+            command=command_name,
+            payload=sql,
+            error_type=error_type,
+            error_code=error_code,
+            error_text=error_text,
+            traceback=error_traceback,
+        )
+        return True
+
     def packet(self, packetClass=Packet, **kwargs):
         """
         Factory method for packets
@@ -919,8 +971,18 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
 
         logger.info(f"Starting MindsDB Mysql proxy server on tcp://{host}:{port}")
 
-        SocketServer.TCPServer.allow_reuse_address = True
-        server = SocketServer.ThreadingTCPServer((host, port), MysqlProxy)
+        server_config = config["api"]["mysql"].get("server", {})
+        if server_config.get("type") == "asyncio":
+            # idle connections are handled by event loop, commands are executed by pool of workers
+            server = AsyncTCPServer(
+                (host, port), MysqlProxy,
+                max_workers=server_config.get("workers", 32),
+                handshake_workers=server_config.get("handshake_workers", 8),
+                timeout=server_config.get("timeout", 60)
+            )
+        else:
+            SocketServer.TCPServer.allow_reuse_address = True
+            server = SocketServer.ThreadingTCPServer((host, port), MysqlProxy)
         server.mindsdb_config = config
         server.check_auth = partial(check_auth, config=config)
         server.cert_path = cert_path
@@ -0,0 +1,181 @@
+import datetime
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mindsdb.api.executor.sql_query.result_set import ResultSet, column_to_list
+from mindsdb.api.mysql.mysql_proxy.classes.client_capabilities import ClentCapabilities
+from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packets.resultset_row_package import ResultsetRowPacket
+from mindsdb.api.mysql.mysql_proxy.data_types.mysql_resultset_encoder import TextResultsetEncoder
+from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import CAPABILITIES, MAX_PACKET_SIZE, TYPES
+from mindsdb.api.mysql.mysql_proxy.mysql_proxy import MysqlProxy
+
+
+class Session:
+    def __init__(self, packet_sequence_number=0):
+        self.packet_sequence_number = packet_sequence_number
+
+    def inc_packet_sequence_number(self):
+        self.packet_sequence_number = (self.packet_sequence_number + 1) % 256
+
+
+def old_packets(df: pd.DataFrame, seq: int) -> bytes:
+    """Rows encoded by ResultsetRowPacket, as it was done before the encoder"""
+    session = Session(seq)
+    rows = zip(*[column_to_list(df.iloc[:, i]) for i in range(len(df.columns))])
+    buffer = b''
+    for row in rows:
+        buffer += ResultsetRowPacket(data=row, session=session).accum()
+        session.inc_packet_sequence_number()
+    return buffer
+
+
+def lenenc_string(value: bytes) -> bytes:
+    """Length-encoded string by the protocol"""
+    length = len(value)
+    if length < 251:
+        prefix = bytes([length])
+    elif length < 1 << 16:
+        prefix = b'\xfc' + struct.pack('<H', length)
+    elif length < 1 << 24:
+        prefix = b'\xfd' + struct.pack('<I', length)[:3]
+    else:
+        prefix = b'\xfe' + struct.pack('<Q', length)
+    return prefix + value
+
+
+def new_packets(df: pd.DataFrame, seq: int, chunk_size: int = 10000) -> bytes:
+    encoder = TextResultsetEncoder(df, chunk_size=chunk_size)
+    return b''.join(chunk for chunk, _ in encoder.iter_packets(seq))
+
+
+def read_packets(data: bytes) -> list:
+    """Split stream to packets
+
+    Returns:
+        list: (sequence number, payload) of packets
+    """
+    packets = []
+    pos = 0
+    while pos < len(data):
+        length = struct.unpack('<I', data[pos:pos + 3] + b'\x00')[0]
+        packets.append((data[pos + 3], data[pos + 4:pos + 4 + length]))
+        pos += 4 + length
+    assert pos == len(data)
+    return packets
+
+
+def join_split_packets(packets: list) -> list:
+    """Join payloads of packets, which were split because of size"""
+    payloads = []
+    current = None
+    for _, payload in packets:
+        current = payload if current is None else current + payload
+        if len(payload) < MAX_PACKET_SIZE:
+            payloads.append(current)
+            current = None
+    return payloads
+
+
+class TestTextResultsetEncoder:
+    def test_same_as_row_packets(self):
+        df = pd.DataFrame({
+            'int': [1, -2, 3, None, 5],
+            'float': [1.5, np.nan, -0.1, 1e20, 2.0],
+            'text': ['a', None, 'юникод', '', 'x' * 300],
+            'binary': [b'\x00\x01', None, b'abc', b'', b'\xff'],
+            'bool': [True, False, None, True, False],
+            'date': [datetime.date(2020, 1, 1), None, datetime.date(2021, 12, 31), None, None],
+            'long': ['y' * 70000, None, 'z' * 251, 'w' * 250, None],
+        })
+        df['int'] = df['int'].astype('Int64')
+        assert new_packets(df, 3) == old_packets(df, 3)
+
+    def test_all_nulls(self):
+        df = pd.DataFrame({'a': [None, None], 'b': [np.nan, np.nan]})
+        assert new_packets(df, 0) == old_packets(df, 0)
+
+    def test_sequence_wraps_between_chunks(self):
+        df = pd.DataFrame({'id': range(300), 'name': [f'name {i}' for i in range(300)]})
+        assert new_packets(df, 250, chunk_size=7) == old_packets(df, 250)
+        last_seq = None
+        for _, last_seq in TextResultsetEncoder(df, chunk_size=7).iter_packets(250):
+            pass
+        assert last_seq == (250 + 300) % 256
+
+    @pytest.mark.parametrize('body_size, packets_sizes', [
+        (MAX_PACKET_SIZE - 1, [MAX_PACKET_SIZE - 1]),
+        # payload of exactly max size is followed by empty packet
+        (MAX_PACKET_SIZE, [MAX_PACKET_SIZE, 0]),
+        (MAX_PACKET_SIZE + 10, [MAX_PACKET_SIZE, 10]),
+        (2 * MAX_PACKET_SIZE + 1, [MAX_PACKET_SIZE, MAX_PACKET_SIZE, 1]),
+    ])
+    def test_split_big_row(self, body_size, packets_sizes):
+        # value with 4 bytes of length prefix
+        value = 'v' * (body_size - 4 if body_size - 4 < 1 << 24 else body_size - 9)
+        df = pd.DataFrame({'value': ['small', value, 'small']})
+        packets = read_packets(new_packets(df, 254))
+
+        assert [len(payload) for _, payload in packets] == [6] + packets_sizes + [6]
+        # sequence numbers are consecutive
+        assert [seq for seq, _ in packets] == [(254 + i) % 256 for i in range(len(packets))]
+        # joined payloads are bodies of rows. ResultsetRowPacket can't be used to compare: it doesn't split packets
+        # and uses wrong length prefix for strings of 16Mb and bigger
+        assert join_split_packets(packets) == [lenenc_string(v.encode()) for v in df['value']]
+
+
+class FakeSocket:
+    def __init__(self):
+        self.data = bytearray()
+        self.calls = 0
+
+    def sendall(self, data):
+        self.data += data
+        self.calls += 1
+
+
+def make_proxy(deprecate_eof: bool) -> MysqlProxy:
+    proxy = MysqlProxy.__new__(MysqlProxy)
+    proxy.socket = FakeSocket()
+    proxy.session = Session(1)
+    capabilities = CAPABILITIES.CLIENT_DEPRECATE_EOF if deprecate_eof else 0
+    proxy.client_capabilities = ClentCapabilities(capabilities)
+    return proxy
+
+
+class TestSendTablePackets:
+    @pytest.mark.parametrize('deprecate_eof', [False, True])
+    def test_stream(self, deprecate_eof):
+        chunks = [
+            pd.DataFrame({'id': [1, 2], 'name': ['a', None]}),
+            pd.DataFrame({'id': [3], 'name': ['c']}),
+            pd.DataFrame({'id': [], 'name': []}),
+            pd.DataFrame({'id': [4, 5], 'name': ['d' * 300, 'e']}),
+        ]
+        columns = [
+            {'table_name': 't', 'name': 'id', 'type': TYPES.MYSQL_TYPE_LONGLONG},
+            {'table_name': 't', 'name': 'name', 'type': TYPES.MYSQL_TYPE_VAR_STRING},
+        ]
+        proxy = make_proxy(deprecate_eof)
+        proxy.send_table_packets(
+            columns, ResultSet().from_df(chunks[0].copy()),
+            data_stream=(ResultSet().from_df(chunk.copy()) for chunk in chunks[1:])
+        )
+
+        packets = read_packets(bytes(proxy.socket.data))
+        # sequence numbers are consecutive through all chunks
+        assert [seq for seq, _ in packets] == [(1 + i) % 256 for i in range(len(packets))]
+        assert proxy.session.packet_sequence_number == (1 + len(packets)) % 256
+
+        header_count = 1 + len(columns) + (0 if deprecate_eof else 1)
+        assert packets[0][1] == bytes([len(columns)])
+        rows = [payload for _, payload in packets[header_count:-1]]
+        expected = [payload for chunk in chunks for _, payload in read_packets(old_packets(chunk, 0))]
+        assert rows == expected
+
+        # EOF packets (or OK packet with EOF header)
+        assert packets[-1][1][0] == 0xFE
+        if not deprecate_eof:
+            assert packets[header_count - 1][1][0] == 0xFE
@@ -1,6 +1,6 @@
 from typing import Union
 
-from mindsdb_sql_parser import parse_sql
+from mindsdb.api.executor.sql_query.statement_cache import parse_sql
 from mindsdb.api.executor.planner import utils as planner_utils
 
 from numpy import dtype as np_dtype
@@ -10,6 +10,7 @@ from mindsdb.api.executor.sql_query import SQLQuery
 from mindsdb.api.executor.sql_query.result_set import Column
 from mindsdb.api.mysql.mysql_proxy.utilities.lightwood_dtype import dtype
 from mindsdb.api.executor.command_executor import ExecuteCommands
+from mindsdb.api.executor.data_types.answer import ResultCursor
 from mindsdb.api.mysql.mysql_proxy.utilities import SqlApiException
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_fields import POSTGRES_TYPES
 from mindsdb.utilities import log
@@ -25,7 +26,7 @@ class Executor:
         self.query = None
         self.columns = []
         self.params = []
-        self.data = None
+        self.cursor: ResultCursor = None
         self.server_status = None
         self.state_track = None
         self.is_executed = False
@@ -33,7 +34,8 @@ class Executor:
         self.sql = ""
         self.sql_lower = ""
 
-        self.command_executor = ExecuteCommands(self.session)
+        # stream: result of select from integration is sent to client while it is fetched from database
+        self.command_executor = ExecuteCommands(self.session, context={'stream': True})
 
     def parse(self, sql: Union[str, bytes]):
         self.logger.info("%s.parse: sql - %s", self.__class__.__name__, sql)
@@ -89,24 +91,12 @@ class Executor:
         self.is_executed = True
 
         if ret.data is not None:
-            self.data = ret.data.to_lists()
+            # rows are read from cursor when they are sent to client
+            self.cursor = ResultCursor(ret)
             self.columns = ret.data.columns
 
         self.state_track = ret.state_track
 
-    def _to_json(self):
-        params = {
-            "columns": self.to_postgres_columns(self.columns),
-            "params": self.to_postgres_columns(self.params),
-            "data": self.data,
-            "state_track": self.state_track,
-            "server_status": self.server_status,
-            "is_executed": self.is_executed,
-            "session": self.session.to_json()
-
-        }
-        return params
-
     def to_postgres_columns(self, columns):
 
         result = []
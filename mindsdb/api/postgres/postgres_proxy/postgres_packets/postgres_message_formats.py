@@ -182,6 +182,47 @@ class BindComplete(PostgresMessage):
             .write(write_file=write_file)
 
 
+class CloseComplete(PostgresMessage):
+    """
+    CloseComplete (B)
+    Byte1('3')
+    Identifies the message as a Close-complete indicator.
+
+    Int32(4)
+    Length of message contents in bytes, including self. """
+
+    def __init__(self):
+        self.identifier = PostgresBackendMessageIdentifier.CLOSE_COMPLETE
+        self.backend_capable = True
+        self.frontend_capable = False
+        super().__init__()
+
+    def send_internal(self, write_file: BinaryIO):
+        self.get_packet_builder() \
+            .write(write_file=write_file)
+
+
+class PortalSuspended(PostgresMessage):
+    """
+    PortalSuspended (B)
+    Byte1('s')
+    Identifies the message as a portal-suspended indicator. Note this only appears if an Execute message's row-count
+    limit was reached.
+
+    Int32(4)
+    Length of message contents in bytes, including self. """
+
+    def __init__(self):
+        self.identifier = PostgresBackendMessageIdentifier.PORTAL_SUSPENDED
+        self.backend_capable = True
+        self.frontend_capable = False
+        super().__init__()
+
+    def send_internal(self, write_file: BinaryIO):
+        self.get_packet_builder() \
+            .write(write_file=write_file)
+
+
 class Error(PostgresMessage):
     """
     ErrorResponse (B)
@@ -731,13 +772,42 @@ class Describe(BaseFrontendMessage):
         return self
 
 
+class Close(BaseFrontendMessage):
+    """
+    Close (F)
+    Byte1('C')
+    Identifies the message as a Close command.
+
+    Int32
+    Length of message contents in bytes, including self.
+
+    Byte1
+    'S' to close a prepared statement; or 'P' to close a portal.
+
+    String The name of the prepared statement or portal to close (an empty string selects the unnamed prepared statement
+    or portal)."""
+
+    def __init__(self):
+        self.identifier = PostgresFrontendMessageIdentifier.CLOSE
+        self.length = None
+        self.close_type = None
+        self.name = None
+        super().__init__()
+
+    def read(self, packet_reader: PostgresPacketReader):
+        self.length = packet_reader.read_int32()
+        self.close_type = packet_reader.read_byte()
+        self.name = packet_reader.read_string()
+        return self
+
+
 IMPLEMENTED_BACKEND_POSTGRES_MESSAGE_CLASSES = [
     NoticeResponse, AuthenticationOk, AuthenticationClearTextPassword, ReadyForQuery, CommandComplete, Error,
     RowDescriptions, DataRow, NegotiateProtocolVersion, ParameterStatus, ParseComplete, BindComplete,
-    ParameterDescription
+    ParameterDescription, PortalSuspended, CloseComplete
 ]
 IMPLEMENTED_FRONTEND_POSTGRES_MESSAGE_CLASSES = [
-    Query, Terminate, Parse, Bind, Execute, Sync, Describe
+    Query, Terminate, Parse, Bind, Execute, Sync, Describe, Close
 ]
 FE_MESSAGE_MAP: Dict[PostgresFrontendMessageIdentifier, Type[PostgresMessage]] = {
     PostgresFrontendMessageIdentifier.QUERY: Query,
@@ -746,7 +816,8 @@ FE_MESSAGE_MAP: Dict[PostgresFrontendMessageIdentifier, Type[PostgresMessage]] =
     PostgresFrontendMessageIdentifier.BIND: Bind,
     PostgresFrontendMessageIdentifier.EXECUTE: Execute,
     PostgresFrontendMessageIdentifier.SYNC: Sync,
-    PostgresFrontendMessageIdentifier.DESCRIBE: Describe
+    PostgresFrontendMessageIdentifier.DESCRIBE: Describe,
+    PostgresFrontendMessageIdentifier.CLOSE: Close
 }
 SUPPORTED_AUTH_TYPES = [PostgresAuthType.PASSWORD]
 
@@ -897,28 +968,6 @@ The process ID of the target backend.
 Int32
 The secret key for the target backend. '''
 
-'''
-Close (F)
-Byte1('C')
-Identifies the message as a Close command.
-
-Int32
-Length of message contents in bytes, including self.
-
-Byte1
-'S' to close a prepared statement; or 'P' to close a portal.
-
-String The name of the prepared statement or portal to close (an empty string selects the unnamed prepared statement
-or portal).'''
-
-'''
-CloseComplete (B)
-Byte1('3')
-Identifies the message as a Close-complete indicator.
-
-Int32(4)
-Length of message contents in bytes, including self. '''
-
 '''
 CommandComplete (B)
 Byte1('C')
@@ -1195,12 +1244,6 @@ Length of message contents in bytes, including self.
 String
 The password (encrypted, if requested). '''
 
-'''PortalSuspended (B) Byte1('s') Identifies the message as a portal-suspended indicator. Note this only appears if
-an Execute message's row-count limit was reached.
-
-Int32(4)
-Length of message contents in bytes, including self. '''
-
 '''SASLInitialResponse (F) Byte1('p') Identifies the message as an initial SASL response. Note that this is also used
 for GSSAPI, SSPI and password response messages. The exact message type is deduced from the context.
 
@@ -14,6 +14,8 @@ class PostgresBackendMessageIdentifier(Enum):
     PARSE_COMPLETE = b'1'
     BIND_COMPLETE = b'2'
     PARAMETER_DESCRIPTION = b't'
+    PORTAL_SUSPENDED = b's'
+    CLOSE_COMPLETE = b'3'
 
 
 class PostgresFrontendMessageIdentifier(Enum):
@@ -25,6 +27,7 @@ class PostgresFrontendMessageIdentifier(Enum):
     BIND = b'B'
     SYNC = b'S'
     DESCRIBE = b'D'
+    CLOSE = b'C'
 
 
 class PostgresAuthType(Enum):
@@ -14,14 +14,17 @@ from mindsdb.api.executor.controllers import SessionController
 from mindsdb.api.postgres.postgres_proxy.executor import Executor
 from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import CHARSET_NUMBERS
 from mindsdb.api.executor.data_types.response_type import RESPONSE_TYPE
+from mindsdb.api.executor.data_types.answer import ResultCursor
 from mindsdb.api.common.check_auth import check_auth
+from mindsdb.api.common.async_server import AsyncTCPServer
 from mindsdb.api.mysql.mysql_proxy.mysql_proxy import SQLAnswer
-from mindsdb.api.postgres.postgres_proxy.postgres_packets.errors import POSTGRES_SYNTAX_ERROR_CODE
+from mindsdb.api.postgres.postgres_proxy.postgres_packets.errors import POSTGRES_SYNTAX_ERROR_CODE, POSTGRES_ERROR_CODES
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_fields import GenericField, PostgresField
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_message_formats import Terminate, \
     Query, AuthenticationClearTextPassword, AuthenticationOk, RowDescriptions, DataRow, CommandComplete, \
     ReadyForQuery, ConnectionFailure, ParameterStatus, Error, Execute, Bind, Parse, Sync, ParseComplete, \
-    InvalidSQLStatementName, BindComplete, Describe, DataException, ParameterDescription
+    InvalidSQLStatementName, BindComplete, Describe, DataException, ParameterDescription, PortalSuspended, \
+    Close, CloseComplete
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_message import PostgresMessage
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_packets import PostgresPacketReader, \
     PostgresPacketBuilder
@@ -49,6 +52,7 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
         self.named_portals = {}
         self.unnamed_portal = None
         self.transaction_status = b'I'  # I: Idle, T: Transaction Block, E: Failed Transaction Block
+        self.is_opened = False
         super().__init__(request, client_address, server)
 
     def handle(self) -> None:
@@ -68,7 +72,8 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
             Bind: self.bind,
             Execute: self.execute,
             Describe: self.describe,
-            Sync: self.sync
+            Sync: self.sync,
+            Close: self.close
         }
         self.client_buffer = PostgresPacketReader(self.rfile)
         if self.is_cloud:
@@ -80,7 +85,47 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
         if started:
             self.logger.debug("connection started")
             self.send_initial_data()
-            self.main_loop()
+            self.is_opened = True
+            if getattr(self.server, 'is_async', False):
+                # server calls handle_command when client sends data
+                self.send_ready()
+                return
+            try:
+                self.main_loop()
+            finally:
+                self.close_portals()
+
+    def finish(self):
+        if self.is_opened and getattr(self.server, 'is_async', False):
+            # connection stays open after handshake, it is closed in close_connection
+            return
+        super().finish()
+
+    def has_pending_data(self) -> bool:
+        """Check if data from client is already read into buffer"""
+        timeout = self.request.gettimeout()
+        self.request.setblocking(False)
+        try:
+            return len(self.rfile.peek(1)) > 0
+        finally:
+            self.request.settimeout(timeout)
+
+    @staticmethod
+    def close_portal(portal: dict):
+        """Release the streamed result of the portal"""
+        if portal is not None and portal.get('cursor') is not None:
+            portal['cursor'].close()
+
+    def close_portals(self):
+        for portal in [self.unnamed_portal, *self.named_portals.values()]:
+            self.close_portal(portal)
+        self.unnamed_portal = None
+        self.named_portals = {}
+
+    def close_connection(self):
+        self.close_portals()
+        self.is_opened = False
+        self.finish()
 
     def is_cloud_connection(self):
         """ Determine source of connection. Must be call before handshake.
@@ -171,8 +216,10 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
         portal = statement.copy()
         portal["bind"] = message
         if message.name:
+            self.close_portal(self.named_portals.get(message.name))
             self.named_portals[message.name] = portal
         else:
+            self.close_portal(self.unnamed_portal)
             self.unnamed_portal = portal
         self.send(BindComplete())
         return True
@@ -215,17 +262,46 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
 
         executor = portal["executor"]
         params = portal["bind"].parameters
-        executor.stmt_execute(param_values=params)
-        sql_answer = self.return_executor_data(executor)
-        self.respond_from_sql_answer(sql=executor.sql, sql_answer=sql_answer, row_descs=False)
+        if "cursor" not in portal:
+            # the first execution of the portal, next ones continue to read rows
+            executor.stmt_execute(param_values=params)
+            portal["cursor"] = executor.cursor
+            # result is read only once: the next portal has to run the query again
+            executor.is_executed = False
+        sql_answer = self.return_executor_data(executor, cursor=portal["cursor"])
+        self.respond_from_sql_answer(
+            sql=executor.sql, sql_answer=sql_answer, row_descs=False, max_rows=message.max_rows_ret
+        )
         return True
 
     def sync(self, message: Sync):
         self.logger.info("Postgres_Proxy: Syncing")
         # TODO: Close/commit transaction if outside of a block. Maybe no collaries since Proxy
+        if self.transaction_status == b'I':
+            # outside of transaction block portals live until the end of implicit transaction
+            self.close_portals()
         self.send_ready()
         return True
 
+    def close(self, message: Close):
+        self.logger.info("Postgres_Proxy: Closing")
+        if message.close_type == b'P':
+            if message.name:
+                self.close_portal(self.named_portals.pop(message.name, None))
+            else:
+                self.close_portal(self.unnamed_portal)
+                self.unnamed_portal = None
+        elif message.close_type == b'S':
+            if message.name:
+                self.named_statements.pop(message.name, None)
+            else:
+                self.unnamed_statement = None
+        else:
+            self.send(DataException(message="Close did not have correct type. Can be 'P' or 'S'"))
+            return True
+        self.send(CloseComplete())
+        return True
+
     def init_session(self):
         self.logger.info('New connection [{ip}:{port}]'.format(
             ip=self.client_address[0], port=self.client_address[1]))
@@ -266,8 +342,10 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
             )
         return self.return_executor_data(executor)
 
-    def return_executor_data(self, executor):
-        if executor.data is None:
+    def return_executor_data(self, executor, cursor: ResultCursor = None):
+        if cursor is None:
+            cursor = executor.cursor
+        if cursor is None:
             resp = SQLAnswer(
                 resp_type=RESPONSE_TYPE.OK,
                 state_track=executor.state_track,
@@ -277,7 +355,7 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
                 resp_type=RESPONSE_TYPE.TABLE,
                 state_track=executor.state_track,
                 columns=executor.to_postgres_columns(executor.columns),
-                data=executor.data,
+                data=cursor,
                 status=executor.server_status
             )
         return resp
@@ -350,14 +428,36 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
             sql: str = sql.decode(encoding)
         return strip_null_byte(sql).strip(';')
 
-    def return_table(self, sql_answer: SQLAnswer, row_descs=True):
+    def return_table(self, sql_answer: SQLAnswer, row_descs=True, max_rows=0):
         fields = self.to_postgres_fields(sql_answer.columns)
-        rows = self.to_postgres_rows(sql_answer.data)
         if row_descs:
             self.send(RowDescriptions(fields=fields))
-        self.send(DataRow(rows=rows))
+
+        # rows are sent by chunks while they are fetched from database
+        cursor: ResultCursor = sql_answer.data
+        fetched = cursor.fetched
+        try:
+            if max_rows > 0:
+                self.send(DataRow(rows=self.to_postgres_rows(cursor.fetch(max_rows))))
+            else:
+                while not cursor.is_finished:
+                    self.send(DataRow(rows=self.to_postgres_rows(cursor.fetch_chunk())))
+        except Exception as e:
+            cursor.close()
+            self.logger.error(f'Error while reading result: {e}')
+            encoding = self.get_encoding()
+            self.send(Error.from_answer(
+                error_code=POSTGRES_ERROR_CODES['CLASS_XX']['internal_error'].encode(encoding),
+                error_message=str(e).encode(encoding)
+            ))
+            return True
+
+        if not cursor.is_finished:
+            # row limit of Execute is reached, client can continue with the next Execute
+            self.send(PortalSuspended())
+            return True
         encoding = self.get_encoding()
-        tag = ('SELECT %s' % str(len(rows))).encode(encoding)
+        tag = ('SELECT %s' % str(cursor.fetched - fetched)).encode(encoding)
         self.send(CommandComplete(tag=tag))
         return True
 
@@ -373,15 +473,11 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
         self.send_ready()
         return True
 
-    def respond_from_sql_answer(self, sql, sql_answer: SQLAnswer, row_descs=True) -> bool:
-        # TODO Add command complete passthrough for Complex Queries that exceed row limit in one go
-        rows = 0
-        if sql_answer.data:
-            rows = len(sql_answer.data)
+    def respond_from_sql_answer(self, sql, sql_answer: SQLAnswer, row_descs=True, max_rows=0) -> bool:
         if RESPONSE_TYPE.OK == sql_answer.type:
-            return self.return_ok(sql, rows=rows)
+            return self.return_ok(sql)
         elif RESPONSE_TYPE.TABLE == sql_answer.type:
-            return self.return_table(sql_answer, row_descs=row_descs)
+            return self.return_table(sql_answer, row_descs=row_descs, max_rows=max_rows)
         elif RESPONSE_TYPE.ERROR == sql_answer.type:
             return self.return_error(sql_answer)
 
@@ -446,23 +542,42 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
 
     def main_loop(self):
         self.send_ready()
-        while True:
-            message: PostgresMessage = self.client_buffer.read_message()
-            if message is None:  # Empty Data, Buffer done
-                break
-            tof = type(message)
-            if tof in self.message_map:
-                res = self.message_map[tof](message)
-                if not res:
-                    break
-            else:
-                self.logger.warning("Ignoring unsupported message type %s" % tof)
+        while self.handle_command():
+            pass
+
+    def handle_command(self) -> bool:
+        """Read and process one message from client
+
+        Returns:
+            bool: False if connection is closed
+        """
+        message: PostgresMessage = self.client_buffer.read_message()
+        if message is None:  # Empty Data, Buffer done
+            return False
+        tof = type(message)
+        if tof in self.message_map:
+            res = self.message_map[tof](message)
+            if not res:
+                return False
+        else:
+            self.logger.warning("Ignoring unsupported message type %s" % tof)
+        return True
 
     @staticmethod
     def startProxy():
         host = config['api']['postgres']['host']
         port = int(config['api']['postgres']['port'])
-        server = TcpServer((host, port), PostgresProxyHandler)
+        server_config = config['api']['postgres'].get('server', {})
+        if server_config.get('type') == 'asyncio':
+            # idle connections are handled by event loop, commands are executed by pool of workers
+            server = AsyncTCPServer(
+                (host, port), PostgresProxyHandler,
+                max_workers=server_config.get('workers', 32),
+                handshake_workers=server_config.get('handshake_workers', 8),
+                timeout=server_config.get('timeout', 60)
+            )
+        else:
+            server = TcpServer((host, port), PostgresProxyHandler)
         server.connection_id = 0
         server.mindsdb_config = config
         server.check_auth = partial(check_auth, config=config)
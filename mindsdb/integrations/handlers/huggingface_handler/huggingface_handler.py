@@ -161,90 +161,130 @@ class HuggingFaceHandler(BaseMLEngine):
         self.engine_storage.folder_sync(model_name)
 
     # todo move infer tasks to a seperate file
-    def predict_text_classification(self, pipeline, item, args):
+    # every task function gets list of items and returns list of results in the same order
+    def predict_text_classification(self, pipeline, items, args, batch_size=1):
         top_k = args.get("top_k", 1000)
 
-        result = pipeline(
-            [item], top_k=top_k, truncation=True, max_length=args["max_length"]
-        )[0]
-
-        final = {}
-        explain = {}
-        if type(result) == dict:
-            result = [result]
-        final[args["target"]] = args["labels_map"][result[0]["label"]]
-        for elem in result:
-            if args["labels_map"]:
-                explain[args["labels_map"][elem["label"]]] = elem["score"]
-            else:
-                explain[elem["label"]] = elem["score"]
-        final[f"{args['target']}_explain"] = explain
-        return final
-
-    def predict_text_generation(self, pipeline, item, args):
-        result = pipeline([item], max_length=args["max_length"])[0]
-
-        final = {}
-        final[args["target"]] = result["generated_text"]
-
-        return final
+        results = pipeline(
+            items, top_k=top_k, truncation=True, max_length=args["max_length"], batch_size=batch_size
+        )
+
+        finals = []
+        for result in results:
+            final = {}
+            explain = {}
+            if type(result) == dict:
+                result = [result]
+            final[args["target"]] = args["labels_map"][result[0]["label"]]
+            for elem in result:
+                if args["labels_map"]:
+                    explain[args["labels_map"][elem["label"]]] = elem["score"]
+                else:
+                    explain[elem["label"]] = elem["score"]
+            final[f"{args['target']}_explain"] = explain
+            finals.append(final)
+        return finals
+
+    def predict_text_generation(self, pipeline, items, args, batch_size=1):
+        results = pipeline(items, max_length=args["max_length"], batch_size=batch_size)
+
+        return [
+            {args["target"]: result["generated_text"]}
+            for result in results
+        ]
 
-    def predict_zero_shot(self, pipeline, item, args):
+    def predict_zero_shot(self, pipeline, items, args, batch_size=1):
         top_k = args.get("top_k", 1000)
 
-        result = pipeline(
-            [item],
+        results = pipeline(
+            items,
             candidate_labels=args["candidate_labels"],
             truncation=True,
             top_k=top_k,
             max_length=args["max_length"],
-        )[0]
-
-        final = {}
-        final[args["target"]] = result["labels"][0]
-
-        explain = dict(zip(result["labels"], result["scores"]))
-        final[f"{args['target']}_explain"] = explain
+            batch_size=batch_size,
+        )
 
-        return final
+        finals = []
+        for result in results:
+            final = {}
+            final[args["target"]] = result["labels"][0]
 
-    def predict_translation(self, pipeline, item, args):
-        result = pipeline([item], max_length=args["max_length"])[0]
+            explain = dict(zip(result["labels"], result["scores"]))
+            final[f"{args['target']}_explain"] = explain
+            finals.append(final)
+        return finals
 
-        final = {}
-        final[args["target"]] = result["translation_text"]
+    def predict_translation(self, pipeline, items, args, batch_size=1):
+        results = pipeline(items, max_length=args["max_length"], batch_size=batch_size)
 
-        return final
+        return [
+            {args["target"]: result["translation_text"]}
+            for result in results
+        ]
 
-    def predict_summarization(self, pipeline, item, args):
-        result = pipeline(
-            [item],
+    def predict_summarization(self, pipeline, items, args, batch_size=1):
+        results = pipeline(
+            items,
             min_length=args["min_output_length"],
             max_length=args["max_output_length"],
-        )[0]
-
-        final = {}
-        final[args["target"]] = result["summary_text"]
-
-        return final
-
-    def predict_text2text(self, pipeline, item, args):
-        result = pipeline([item], max_length=args["max_length"])[0]
+            batch_size=batch_size,
+        )
 
-        final = {}
-        final[args["target"]] = result["generated_text"]
+        return [
+            {args["target"]: result["summary_text"]}
+            for result in results
+        ]
 
-        return final
+    def predict_text2text(self, pipeline, items, args, batch_size=1):
+        results = pipeline(items, max_length=args["max_length"], batch_size=batch_size)
 
-    def predict_fill_mask(self, pipeline, item, args):
-        result = pipeline([item])[0]
+        return [
+            {args["target"]: result["generated_text"]}
+            for result in results
+        ]
 
-        final = {}
-        final[args["target"]] = result[0]["sequence"]
-        explain = {elem["sequence"]: elem["score"] for elem in result}
-        final[f"{args['target']}_explain"] = explain
+    def predict_fill_mask(self, pipeline, items, args, batch_size=1):
+        results = pipeline(items, batch_size=batch_size)
+        if len(items) == 1:
+            # for single input pipeline returns list of candidates instead of list of lists
+            results = [results] if isinstance(results[0], dict) else results
+
+        finals = []
+        for result in results:
+            final = {}
+            final[args["target"]] = result[0]["sequence"]
+            explain = {elem["sequence"]: elem["score"] for elem in result}
+            final[f"{args['target']}_explain"] = explain
+            finals.append(final)
+        return finals
+
+    def load_model(self, args=None):
+        try:
+            # load from model storage (finetuned models will use this)
+            hf_model_storage_path = self.model_storage.folder_get(
+                args["model_name"]
+            )
+            pipeline = transformers.pipeline(
+                task=args["task_proper"],
+                model=hf_model_storage_path,
+                tokenizer=hf_model_storage_path,
+            )
+        except (ValueError, OSError):
+            # load from engine storage (i.e. 'common' models)
+            hf_model_storage_path = self.engine_storage.folder_get(
+                args["model_name"]
+            )
+            pipeline = transformers.pipeline(
+                task=args["task_proper"],
+                model=hf_model_storage_path,
+                tokenizer=hf_model_storage_path,
+            )
+        return pipeline
 
-        return final
+    def get_model_size(self, model):
+        # weights and buffers of the model, tokenizer is small
+        return model.model.get_memory_footprint()
 
     def predict(self, df, args=None):
 
@@ -257,6 +297,8 @@ class HuggingFaceHandler(BaseMLEngine):
             "fill-mask": self.predict_fill_mask,
         }
 
+        predict_params = (args or {}).get("predict_params") or {}
+
         ###### get stuff from model folder
         args = self.model_storage.json_get("args")
 
@@ -267,67 +309,62 @@ class HuggingFaceHandler(BaseMLEngine):
 
         fnc = fnc_list[task]
 
-        try:
-            # load from model storage (finetuned models will use this)
-            hf_model_storage_path = self.model_storage.folder_get(
-                args["model_name"]
-            )
-            pipeline = transformers.pipeline(
-                task=args["task_proper"],
-                model=hf_model_storage_path,
-                tokenizer=hf_model_storage_path,
-            )
-        except (ValueError, OSError):
-            # load from engine storage (i.e. 'common' models)
-            hf_model_storage_path = self.engine_storage.folder_get(
-                args["model_name"]
-            )
-            pipeline = transformers.pipeline(
-                task=args["task_proper"],
-                model=hf_model_storage_path,
-                tokenizer=hf_model_storage_path,
-            )
+        pipeline = self.get_model(args)
 
         input_column = args["input_column"]
         if input_column not in df.columns:
             raise RuntimeError(f'Column "{input_column}" not found in input data')
-        input_list = df[input_column]
+        items = [str(item) for item in df[input_column]]
+        results = [None] * len(items)
 
         max_tokens = pipeline.tokenizer.model_max_length
 
-        results = []
-        for item in input_list:
-            if max_tokens is not None:
-                tokens = pipeline.tokenizer.encode(item)
-                if len(tokens) > max_tokens:
-                    truncation_policy = args.get("truncation_policy", "strict")
-                    if truncation_policy == "strict":
-                        results.append(
-                            {
-                                "error": f"Tokens count exceed model limit: {len(tokens)} > {max_tokens}"
-                            }
-                        )
-                        continue
-                    elif truncation_policy == "left":
-                        tokens = tokens[
-                            -max_tokens + 1 : -1
-                        ]  # cut 2 empty tokens from left and right
-                    else:
-                        tokens = tokens[
-                            1 : max_tokens - 1
-                        ]  # cut 2 empty tokens from left and right
-
-                    item = pipeline.tokenizer.decode(tokens)
-
-            item = str(item)
+        # region tokenize all items at once, truncate too long items
+        input_ids = pipeline.tokenizer(items)["input_ids"] if len(items) > 0 else []
+        lengths = [len(tokens) for tokens in input_ids]
+        if max_tokens is not None:
+            too_long = [i for i, length in enumerate(lengths) if length > max_tokens]
+            truncation_policy = args.get("truncation_policy", "strict")
+            if truncation_policy == "strict":
+                for i in too_long:
+                    results[i] = {
+                        "error": f"Tokens count exceed model limit: {lengths[i]} > {max_tokens}"
+                    }
+            elif len(too_long) > 0:
+                if truncation_policy == "left":
+                    # cut 2 empty tokens from left and right
+                    truncated = [input_ids[i][-max_tokens + 1 : -1] for i in too_long]
+                else:
+                    truncated = [input_ids[i][1 : max_tokens - 1] for i in too_long]
+                for i, item in zip(too_long, pipeline.tokenizer.batch_decode(truncated)):
+                    items[i] = item
+                    lengths[i] = max_tokens
+        # endregion
+
+        # items with similar length are put in the same batch to minimize padding
+        order = sorted(
+            (i for i in range(len(items)) if results[i] is None),
+            key=lambda i: lengths[i],
+            reverse=True
+        )
+        batch_size = predict_params.get("batch_size", args.get("batch_size", 8))
+        for start in range(0, len(order), batch_size):
+            batch = order[start : start + batch_size]
             try:
-                result = fnc(pipeline, item, args)
-            except Exception as e:
-                msg = str(e).strip()
-                if msg == "":
-                    msg = e.__class__.__name__
-                result = {"error": msg}
-            results.append(result)
+                batch_results = fnc(pipeline, [items[i] for i in batch], args, batch_size=batch_size)
+            except Exception:
+                # find out which items failed
+                batch_results = []
+                for i in batch:
+                    try:
+                        batch_results.extend(fnc(pipeline, [items[i]], args))
+                    except Exception as e:
+                        msg = str(e).strip()
+                        if msg == "":
+                            msg = e.__class__.__name__
+                        batch_results.append({"error": msg})
+            for i, result in zip(batch, batch_results):
+                results[i] = result
 
         pred_df = pd.DataFrame(results)
 
@@ -172,10 +172,15 @@ class LangchainEmbeddingHandler(BaseMLEngine):
         ] = target  # this is the name of the column to store the embeddings
         self.model_storage.json_set("args", user_args)
 
-    def predict(self, df: DataFrame, args) -> DataFrame:
+    def load_model(self, args: Union[Dict, None] = None) -> Embeddings:
         # reconstruct the model from the model storage
         user_args = self.model_storage.json_get("args")
-        model = construct_model_from_args(user_args)
+        return construct_model_from_args(user_args)
+
+    def predict(self, df: DataFrame, args) -> DataFrame:
+        # the model is reused by next predictions in the same process
+        model = self.get_model(args)
+        user_args = self.model_storage.json_get("args")
 
         # get the target from the model storage
         target = user_args["target"]
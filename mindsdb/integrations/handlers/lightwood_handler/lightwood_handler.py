@@ -2,7 +2,6 @@ import copy
 import json
 import sys
 from datetime import datetime
-from functools import lru_cache
 from typing import Dict, Optional
 
 import lightwood
@@ -83,26 +82,22 @@ class LightwoodHandler(BaseMLEngine):
     ) -> None:
         run_finetune(df, args, self.model_storage)
 
-    @staticmethod
-    @lru_cache(maxsize=5)
-    def get_predictor(predictor_path, predictor_code):
-        predictor = lightwood.predictor_from_state(predictor_path, predictor_code)
-        return predictor
+    def load_model(self, args=None):
+        self.model_storage.fileStorage.pull()
+        predictor_path = (
+            self.model_storage.fileStorage.folder_path
+            / self.model_storage.fileStorage.folder_name
+        )
+        return lightwood.predictor_from_state(predictor_path, args['code'])
 
     @profiler.profile('LightwoodHandler.predict')
     def predict(self, df, args=None):
         pred_format = args['pred_format']
-        predictor_code = args['code']
         learn_args = args['learn_args']
         pred_args = args.get('predict_params', {})
-        self.model_storage.fileStorage.pull()
 
         with profiler.Context('load model'):
-            predictor_path = (
-                self.model_storage.fileStorage.folder_path
-                / self.model_storage.fileStorage.folder_name
-            )
-            predictor = LightwoodHandler.get_predictor(predictor_path, predictor_code)
+            predictor = self.get_model(args)
 
         dtype_dict = predictor.dtype_dict
 
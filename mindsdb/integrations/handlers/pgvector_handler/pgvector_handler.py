@@ -1,13 +1,18 @@
 import os
 import json
+import math
 from enum import Enum
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 from urllib.parse import urlparse
+from uuid import uuid4
 
+import numpy as np
 import pandas as pd
 import psycopg
+from psycopg.types.json import Jsonb
 from mindsdb_sql_parser.ast import Parameter, Identifier, Update, BinaryOperation
 from pgvector.psycopg import register_vector
+from pgvector.utils import Bit, SparseVector, Vector
 
 from mindsdb.integrations.handlers.postgres_handler.postgres_handler import (
     PostgresHandler,
@@ -15,12 +20,12 @@ from mindsdb.integrations.handlers.postgres_handler.postgres_handler import (
 from mindsdb.integrations.libs.response import RESPONSE_TYPE, HandlerResponse as Response
 from mindsdb.integrations.libs.vectordatabase_handler import (
     FilterCondition,
+    FilterOperator,
     VectorStoreHandler,
     DistanceFunction,
     TableField
 )
 from mindsdb.utilities import log
-from mindsdb.utilities.profiler import profiler
 from mindsdb.utilities.context import context as ctx
 
 logger = log.getLogger(__name__)
@@ -32,11 +37,27 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
 
     name = "pgvector"
 
+    # parameters of search in WHERE of select: name -> setting of postgres
+    SEARCH_PARAMS = {
+        'ef_search': 'hnsw.ef_search',
+        'probes': 'ivfflat.probes',
+        # continue scan of hnsw index if filters by metadata removed found rows (pgvector >= 0.8)
+        'iterative_scan': 'hnsw.iterative_scan',
+    }
+    ITERATIVE_SCAN_MODES = ('off', 'strict_order', 'relaxed_order')
+    # distances of binary vectors (column of bit type): hamming, jaccard
+    BIT_DISTANCE_OPS = ('<~>', '<%>')
+
+    # ivfflat index with automatic count of lists is rebuilt when the table grows in so many times
+    IVFFLAT_REBUILD_GROWTH = 2
+
+    # generated column and index for keyword search
+    KEYWORD_COLUMN = 'content_tsv'
+
     def __init__(self, name: str, **kwargs):
 
         super().__init__(name=name, **kwargs)
         self._is_shared_db = False
-        self._is_vector_registered = False
         # we get these from the connection args on PostgresHandler parent
         self._is_sparse = self.connection_args.get('is_sparse', False)
         self._vector_size = self.connection_args.get('vector_size', None) 
@@ -45,8 +66,8 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
             if not self._vector_size:
                 raise ValueError("vector_size is required when is_sparse=True")
 
-                # Use inner product for sparse vectors
-                distance_op = "<#>"
+            # Use inner product for sparse vectors
+            distance_op = "<#>"
 
         else:
             distance_op = '<=>'
@@ -65,6 +86,12 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
                     raise ValueError(f'Wrong distance type. Allowed options are {list(distance_ops.keys())}')
 
         self.distance_op = distance_op
+        # tables with checked indexes: {table_name: params of index}
+        self._indexed_tables = {}
+        # tables which have column for keyword search: {table_name: bool}
+        self._keyword_columns = {}
+        # tables which have unique index on id column, required by upsert: {table_name: bool}
+        self._unique_id_tables = {}
         self.connect()
 
     def _make_connection_args(self):
@@ -101,100 +128,160 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         if resp.resp_type == RESPONSE_TYPE.TABLE:
             return resp.data_frame
 
-    @profiler.profile()
-    def connect(self) -> psycopg.connection:
+    @staticmethod
+    def _init_connection(connection: psycopg.Connection):
         """
-        Handles the connection to a PostgreSQL database instance.
+        Loads pgvector extension and registers vector types for the new connection.
         """
-        self.connection = super().connect()
-        if self._is_vector_registered:
-            return self.connection
-
-        with self.connection.cursor() as cur:
+        with connection.cursor() as cur:
             try:
                 # load pg_vector extension
                 cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                connection.commit()
                 logger.info("pg_vector extension loaded")
 
             except psycopg.Error as e:
-                self.connection.rollback()
+                connection.rollback()
                 logger.error(
                     f"Error loading pg_vector extension, ensure you have installed it before running, {e}!"
                 )
                 raise
 
-        # register vector type with psycopg2 connection
-        register_vector(self.connection)
-        self._is_vector_registered = True
-
-        return self.connection
+        # register vector type with psycopg connection
+        register_vector(connection)
 
     @staticmethod
-    def _translate_conditions(conditions: List[FilterCondition]) -> Union[dict, None]:
+    def _add_param(params: dict, value, binary: bool = False) -> str:
         """
-        Translate filter conditions to a dictionary
+        Adds value to named parameters of the query and returns its placeholder
         """
+        name = f'p{len(params)}'
+        params[name] = value
+        return f'%({name})b' if binary else f'%({name})s'
 
-        if conditions is None:
-            return {}
-
-        filter_conditions = {}
-
-        for condition in conditions:
-
-            parts = condition.column.split(".")
-            key = parts[0]
-            # converts 'col.el1.el2' to col->'el1'->>'el2'
-            if len(parts) > 1:
-                # intermediate elements
-                for el in parts[1:-1]:
-                    key += f" -> '{el}'"
-
-                # last element
-                key += f" ->> '{parts[-1]}'"
-
-            filter_conditions[key] = {
-                "op": condition.op.value,
-                "value": condition.value,
-            }
-
-        return filter_conditions
+    @staticmethod
+    def _to_json_text(value) -> str:
+        # value as it is returned by ->> operator
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value)
 
     @staticmethod
-    def _construct_where_clause(filter_conditions=None):
+    def _json_variants(value) -> list:
         """
-        Construct where clauses from filter conditions
+        Variants of json value which can be stored in metadata for the value of the filter:
+        metadata values are mostly stored as strings, but they also can be numbers or booleans
         """
-        if filter_conditions is None:
-            return ""
-
-        where_clauses = []
-
-        for key, value in filter_conditions.items():
-            if key == "embeddings":
-                continue
-            if value['op'].lower() in ('in', 'not in'):
-                values = list(repr(i) for i in value['value'])
-                value['value'] = '({})'.format(', '.join(values))
-            else:
-                value['value'] = repr(value['value'])
-            where_clauses.append(f'{key} {value["op"]} {value["value"]}')
+        variants = [value]
+        if isinstance(value, (bool, int, float)):
+            variants.append(str(value))
+        elif isinstance(value, str):
+            for cast in (int, float):
+                try:
+                    variants.append(cast(value))
+                    break
+                except ValueError:
+                    pass
+        # nan and infinity are not valid json numbers, postgres rejects them
+        return [
+            variant for variant in variants
+            if not isinstance(variant, float) or math.isfinite(variant)
+        ]
+
+    def _build_condition(self, condition: FilterCondition, params: dict) -> Union[str, None]:
+        """
+        Builds SQL condition for the filter, values are passed as parameters of the query
 
-        if len(where_clauses) > 1:
-            return f"WHERE {' AND '.join(where_clauses)}"
-        elif len(where_clauses) == 1:
-            return f"WHERE {where_clauses[0]}"
+        Equality and IN conditions for keys of metadata are converted to containment (metadata @> '{"key": value}'),
+        which is able to use GIN index of metadata column. Other conditions for metadata use text value of the key.
+        """
+        parts = condition.column.split('.')
+        column = parts[0]
+        if column == TableField.EMBEDDINGS.value:
+            return None
+        op = condition.op.value
+        value = condition.value
+
+        if len(parts) > 1:
+            if op in ('=', 'IN', 'NOT IN') and value is not None:
+                values = value if op != '=' else [value]
+                documents = []
+                for item in values:
+                    for variant in self._json_variants(item):
+                        document = variant
+                        for key in reversed(parts[1:]):
+                            document = {key: document}
+                        documents.append(f'{column} @> {self._add_param(params, Jsonb(document))}')
+                if len(documents) == 0:
+                    clause = 'FALSE'
+                else:
+                    clause = f"({' OR '.join(documents)})"
+                if op == 'NOT IN':
+                    # rows without the key are not selected, as by comparison of text value of the key (it is NULL)
+                    path = self._add_param(params, parts[1:])
+                    clause = f'({column} #>> {path}::text[]) IS NOT NULL AND NOT {clause}'
+                return clause
+
+            # converts 'col.el1.el2' to col #>> '{el1,el2}'
+            expression = f'({column} #>> {self._add_param(params, parts[1:])}::text[])'
+            to_param = self._to_json_text
         else:
-            return ""
+            expression = column
+            to_param = str
+
+        if op in ('IS NULL', 'IS NOT NULL'):
+            return f'{expression} {op}'
+        if op in ('IS', 'IS NOT'):
+            if value is None:
+                return f'{expression} {op} NULL'
+            return f'{expression} {op} {self._add_param(params, value)}'
+        if op in ('IN', 'NOT IN'):
+            placeholder = self._add_param(params, [to_param(item) for item in value])
+            clause = f'{expression} = ANY({placeholder}::text[])'
+            return clause if op == 'IN' else f'NOT ({clause})'
+        if op in ('BETWEEN', 'NOT BETWEEN'):
+            low, high = value
+            low = self._add_param(params, to_param(low))
+            high = self._add_param(params, to_param(high))
+            return f'{expression} {op} {low} AND {high}'
+        if value is None:
+            return f'{expression} {op} NULL'
+        return f'{expression} {op} {self._add_param(params, to_param(value))}'
+
+    def _build_where_clause(self, conditions: List[FilterCondition] = None, params: dict = None) -> str:
+        """
+        Construct where clause from filter conditions, values of the conditions are added to params
+        """
+        where_clauses = []
+        for condition in conditions or []:
+            clause = self._build_condition(condition, params)
+            if clause is not None:
+                where_clauses.append(clause)
 
-    @staticmethod
-    def _construct_full_after_from_clause(
-        where_clause: str,
-        offset_clause: str,
-        limit_clause: str,
-    ) -> str:
+        if len(where_clauses) == 0:
+            return ''
+        return f"WHERE {' AND '.join(where_clauses)}"
 
-        return f"{where_clause} {offset_clause} {limit_clause}"
+    def _to_search_vector(self, value):
+        """
+        Converts search vector from the filter to object which is passed to postgres in binary format
+        """
+        if self._is_sparse:
+            if isinstance(value, SparseVector):
+                return value
+            if isinstance(value, str):
+                return SparseVector.from_text(value)
+            return SparseVector(value, self._vector_size)
+        if self.distance_op in self.BIT_DISTANCE_OPS:
+            if isinstance(value, str) and not value.startswith('['):
+                # text of bit string: '0101'
+                return Bit(value)
+            if isinstance(value, str):
+                value = json.loads(value)
+            return Bit(np.asarray(value, dtype=bool))
+        if isinstance(value, str):
+            value = json.loads(value)
+        return np.asarray(value, dtype=np.float32)
 
     def _build_select_query(
         self,
@@ -203,21 +290,18 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         conditions: List[FilterCondition] = None,
         limit: int = None,
         offset: int = None,
-    ) -> str:
+    ) -> Tuple[str, dict]:
         """
-        given inputs, build string query
+        given inputs, build query and its parameters
         """
-        limit_clause = f"LIMIT {limit}" if limit else ""
-        offset_clause = f"OFFSET {offset}" if offset else ""
-
-        # translate filter conditions to dictionary
-        filter_conditions = self._translate_conditions(conditions)
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        offset_clause = f"OFFSET {int(offset)}" if offset else ""
 
         # check if search vector is in filter conditions
-        embedding_search = filter_conditions.get("embeddings", None)
-
-        # given filter conditions, construct where clause
-        where_clause = self._construct_where_clause(filter_conditions)
+        search_vector = None
+        for condition in conditions or []:
+            if condition.column == TableField.EMBEDDINGS.value:
+                search_vector = self._to_search_vector(condition.value)
 
         # Handle distance column specially since it's calculated, not stored
         modified_columns = []
@@ -233,38 +317,26 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
             has_distance = True
 
         targets = ', '.join(modified_columns)
-
-
-        if filter_conditions:
-
-            if embedding_search:
-                search_vector = filter_conditions["embeddings"]["value"]
-                filter_conditions.pop("embeddings")
-
-                if self._is_sparse:
-                    # Convert dict to sparse vector if needed
-                    if isinstance(search_vector, dict):
-                        from pgvector.utils import SparseVector
-                        embedding = SparseVector(search_vector, self._vector_size)
-                        search_vector = embedding.to_text()
-                else:
-                    # Convert list to vector string if needed
-                    if isinstance(search_vector, list):
-                        search_vector = f"[{','.join(str(x) for x in search_vector)}]"
-
-                # Calculate distance as part of the query if needed
-                if has_distance:
-                    targets = f"{targets}, (embeddings {self.distance_op} '{search_vector}') as distance"
-                
-                return f"SELECT {targets} FROM {table_name} {where_clause} ORDER BY embeddings {self.distance_op} '{search_vector}' ASC {limit_clause} {offset_clause} "
-
-            else:
-                # if filter conditions, return rows that satisfy the conditions
-                return f"SELECT {targets} FROM {table_name} {where_clause} {limit_clause} {offset_clause}"
-
-        else:
-            # if no filter conditions, return all rows
-            return f"SELECT {targets} FROM {table_name} {limit_clause} {offset_clause}"
+        params = {}
+
+        if search_vector is None:
+            where_clause = self._build_where_clause(conditions, params)
+            return f"SELECT {targets} FROM {table_name} {where_clause} {limit_clause} {offset_clause}", params
+
+        # search vector is sent once in binary format and used for distance and for ordering
+        vector_param = self._add_param(params, search_vector, binary=True)
+        # '%' is a placeholder symbol in query with parameters (jaccard distance: <%>)
+        distance_op = self.distance_op.replace('%', '%%')
+        # Calculate distance as part of the query if needed
+        if has_distance:
+            distance = f"(embeddings {distance_op} {vector_param}) as distance"
+            targets = f"{targets}, {distance}" if targets else distance
+        where_clause = self._build_where_clause(conditions, params)
+        query = (
+            f"SELECT {targets} FROM {table_name} {where_clause} "
+            f"ORDER BY embeddings {distance_op} {vector_param} ASC {limit_clause} {offset_clause}"
+        )
+        return query, params
 
     def _check_table(self, table_name: str):
         # Apply namespace for a user
@@ -289,15 +361,89 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         if columns is None:
             columns = ["id", "content", "embeddings", "metadata"]
 
-        query = self._build_select_query(table_name, columns, conditions, limit, offset)
-        result = self.raw_query(query)
+        conditions, search_settings = self._extract_search_settings(conditions)
+
+        query, params = self._build_select_query(table_name, columns, conditions, limit, offset)
+        # vectors are received in binary format and converted to text only if they are selected
+        result = self._fetch(query, params, settings=search_settings, binary=True)
 
         # ensure embeddings are returned as string so they can be parsed by mindsdb
-        if "embeddings" in columns:
-            result["embeddings"] = result["embeddings"].astype(str)
+        if "embeddings" in result.columns:
+            result["embeddings"] = result["embeddings"].apply(self._vector_to_text)
 
         return result
 
+    @staticmethod
+    def _vector_to_text(value) -> Union[str, None]:
+        if value is None:
+            return None
+        if isinstance(value, SparseVector):
+            return value.to_text()
+        return Vector(value).to_text()
+
+    def _extract_search_settings(self, conditions: List[FilterCondition] = None):
+        """
+        Separate parameters of search (ef_search, probes) from filter conditions
+
+        Returns:
+            conditions without parameters of search, settings of postgres for the query
+        """
+        if conditions is None:
+            return None, {}
+
+        filters = []
+        settings = {}
+        for condition in conditions:
+            if condition.column == 'iterative_scan':
+                value = str(condition.value).lower()
+                if value not in self.ITERATIVE_SCAN_MODES:
+                    raise ValueError(
+                        f'Wrong value of iterative_scan: {condition.value}, allowed: {self.ITERATIVE_SCAN_MODES}'
+                    )
+                settings[self.SEARCH_PARAMS[condition.column]] = value
+            elif condition.column in self.SEARCH_PARAMS:
+                try:
+                    value = int(condition.value)
+                except (TypeError, ValueError):
+                    raise ValueError(f'Wrong value of {condition.column}: {condition.value}, it must be integer')
+                settings[self.SEARCH_PARAMS[condition.column]] = value
+            else:
+                filters.append(condition)
+        return filters, settings
+
+    def _fetch(
+        self, query: str, params: Union[tuple, dict] = None, settings: dict = None, binary: bool = False
+    ) -> pd.DataFrame:
+        """
+        Executes select query and returns result as dataframe
+
+        Args:
+            query (str): query
+            params (tuple | dict): parameters of the query
+            settings (dict): settings of postgres, they are applied only to this query (SET LOCAL)
+            binary (bool): receive result in binary format: vectors are loaded without parsing of text
+
+        Returns:
+            pd.DataFrame: result of the query
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cur:
+                try:
+                    with connection.transaction():
+                        for name, value in (settings or {}).items():
+                            cur.execute('SELECT set_config(%s, %s, true)', (name, str(value)))
+                        cur.execute(query, params, binary=binary)
+                        df = pd.DataFrame(cur.fetchall(), columns=[x.name for x in cur.description])
+                        self._cast_dtypes(df, cur.description)
+                    if not connection.autocommit:
+                        connection.commit()
+                except Exception as e:
+                    logger.error(f'Error running query: {query} on {self.database}, {e}!')
+                    if not connection.autocommit:
+                        connection.rollback()
+                    raise RuntimeError(str(e))
+        return df
+
     def hybrid_search(
         self,
         table_name: str,
@@ -331,19 +477,24 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         if query is None and metadata is None:
             raise ValueError('Must provide at least one of: query for keyword search, or metadata filters. For only embeddings search, use normal search instead.')
 
+        table_name = self._check_table(table_name)
+
         id_column_name = kwargs.get('id_column_name', 'id')
         content_column_name = kwargs.get('content_column_name', 'content')
         embeddings_column_name = kwargs.get('embeddings_column_name', 'embeddings')
         metadata_column_name = kwargs.get('metadata_column_name', 'metadata')
         # Filter by given metadata for semantic search & full text search CTEs, if present.
-        where_clause = ' WHERE '
         if metadata is None:
-            where_clause = ''
             metadata = {}
-        for i, (k, v) in enumerate(metadata.items()):
-            where_clause += f"{metadata_column_name}->>'{k}' = '{v}'"
-            if i < len(metadata.items()) - 1:
-                where_clause += ' AND '
+        params = {}
+        conditions = [
+            FilterCondition(column=f'{metadata_column_name}.{key}', op=FilterOperator.EQUAL, value=value)
+            for key, value in metadata.items()
+        ]
+        where_clause = self._build_where_clause(conditions, params)
+        if where_clause:
+            where_clause = f' {where_clause}'
+        vector_param = self._add_param(params, self._to_search_vector(embeddings), binary=True)
 
         # See https://docs.pgvecto.rs/use-case/hybrid-search.html#advanced-search-merge-the-results-of-full-text-search-and-vector-search.
         #
@@ -370,23 +521,28 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         # We calculate the final "hybrid" rank by summing the reciprocals of the ranks from each individual CTE.
         semantic_search_cte = f'''WITH semantic_search AS (
     SELECT {id_column_name}, {content_column_name}, {embeddings_column_name},
-    RANK () OVER (ORDER BY {embeddings_column_name} {distance_function.value} '{str(embeddings)}') AS rank
+    RANK () OVER (ORDER BY {embeddings_column_name} {distance_function.value} {vector_param}) AS rank
     FROM {table_name}{where_clause}
-    ORDER BY {embeddings_column_name} {distance_function.value} '{str(embeddings)}'::vector
+    ORDER BY {embeddings_column_name} {distance_function.value} {vector_param}
     )'''
 
         full_text_search_cte = ''
         if query is not None:
-            ts_vector_clause = f"WHERE to_tsvector('english', {content_column_name}) @@ plainto_tsquery('english', '{query}')"
-            if metadata:
-                ts_vector_clause = f"AND to_tsvector('english', {content_column_name}) @@ plainto_tsquery('english', '{query}')"
+            # use generated column with GIN index if it exists
+            ts_vector = f"to_tsvector('english', {content_column_name})"
+            if content_column_name == TableField.CONTENT.value and self._has_keyword_column(table_name):
+                ts_vector = self.KEYWORD_COLUMN
+            ts_query = f"plainto_tsquery('english', {self._add_param(params, query)})"
+            ts_vector_clause = f"WHERE {ts_vector} @@ {ts_query}"
+            if where_clause:
+                ts_vector_clause = f"AND {ts_vector} @@ {ts_query}"
             full_text_search_cte = f''',
     full_text_search AS (
     SELECT {id_column_name}, {content_column_name}, {embeddings_column_name},
-    RANK () OVER (ORDER BY ts_rank(to_tsvector('english', {content_column_name}), plainto_tsquery('english', '{query}')) DESC) AS rank
+    RANK () OVER (ORDER BY ts_rank({ts_vector}, {ts_query}) DESC) AS rank
     FROM {table_name}{where_clause}
     {ts_vector_clause}
-    ORDER BY ts_rank(to_tsvector('english', {content_column_name}), plainto_tsquery('english', '{query}')) DESC
+    ORDER BY ts_rank({ts_vector}, {ts_query}) DESC
     )'''
 
         hybrid_select = '''
@@ -402,11 +558,12 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         '''
 
         full_search_query = f'{semantic_search_cte}{full_text_search_cte}{hybrid_select}'
-        return self.raw_query(full_search_query)
+        return self._fetch(full_search_query, params, binary=True)
 
     def create_table(self, table_name: str):
         """Create a table with a vector column."""
-        with self.connection.cursor() as cur:
+        table_name = self._check_table(table_name)
+        with self._get_connection() as connection, connection.cursor() as cur:
             # For sparse vectors, use sparsevec type
             vector_column_type = 'sparsevec' if self._is_sparse else 'vector'
             
@@ -427,24 +584,359 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
                     metadata JSONB
                 )
             """)
-            self.connection.commit()
+            # index for filters by metadata, see _build_condition
+            cur.execute(self._metadata_index_query(table_name))
+            connection.commit()
+
+    def create_index(self, table_name: str, params: dict = None) -> bool:
+        """
+        Creates ANN index (hnsw or ivfflat) on embeddings column and, optionally, generated tsvector column with
+        GIN index for keyword search of hybrid search. If the index exists with other parameters, it is recreated.
+
+        Vector index requires dimension of the column. If it is not defined, it is taken from the stored embeddings.
+        If the table is empty, creation of the vector index is postponed until the next call (after insert of data):
+        also it gives better index for ivfflat, which is trained on the existing data.
+
+        Count of lists of ivfflat index depends on count of rows. If it is not set explicitly, the index is rebuilt
+        by the call after insert when the table grew in IVFFLAT_REBUILD_GROWTH times since the index was built.
+        The index is built concurrently and replaces the old one only when it is ready, see _swap_index.
+
+        Args:
+            table_name (str): name of the table
+            params (dict): parameters of the index:
+              - type: hnsw (default) or ivfflat
+              - m, ef_construction: parameters of hnsw, by default 16 and 64
+              - lists: parameter of ivfflat, by default rows / 1000 (sqrt(rows) for tables bigger than 1M rows)
+              - keyword_index: create tsvector column with GIN index, default True
+              - metadata_index: create GIN index on metadata for pre-filtering of search, default True
+
+        Returns:
+            bool: True if vector index exists
+        """
+        params = dict(params or {})
+        table_name = self._check_table(table_name)
+        index_type = str(params.get('type', 'hnsw')).lower()
+        auto_lists = index_type == 'ivfflat' and 'lists' not in params
+        if self._indexed_tables.get(table_name) == params and not auto_lists:
+            return True
+
+        if index_type == 'hnsw':
+            options = {
+                'm': int(params.get('m', 16)),
+                'ef_construction': int(params.get('ef_construction', 64)),
+            }
+        elif index_type == 'ivfflat':
+            if self._is_sparse:
+                raise ValueError('ivfflat index is not supported for sparse vectors, use hnsw')
+            options = {}
+            if 'lists' in params:
+                options['lists'] = int(params['lists'])
+        else:
+            raise ValueError(f'Unknown type of index: {index_type}. Supported types: hnsw, ivfflat')
+        operator_class = self._get_index_operator_class()
+
+        if params.get('keyword_index', True):
+            self._create_keyword_index(table_name)
+        if params.get('metadata_index', True):
+            # tables created before the index was added to create_table
+            self.raw_query(self._metadata_index_query(table_name))
+
+        if not self._set_vector_dimension(table_name):
+            logger.info(f'Creation of vector index for {table_name} is postponed: there is no data in the table')
+            return False
+
+        index_name = f'{table_name}_embeddings_idx'
+        # parameters of index are stored in comment to recreate the index if they are changed
+        definition = json.dumps({'type': index_type, **options}, sort_keys=True)
+        existing = self._fetch(
+            "SELECT obj_description(to_regclass(%s), 'pg_class') AS definition",
+            (index_name,)
+        )
+        existing_definition = existing['definition'][0] if len(existing) > 0 else None
+        built_rows = None
+        if existing_definition is not None:
+            try:
+                existing_definition = json.loads(existing_definition)
+                # count of rows of table at the moment of building of ivfflat index with automatic lists
+                built_rows = existing_definition.pop('rows', None)
+                existing_definition = json.dumps(existing_definition, sort_keys=True)
+            except ValueError:
+                pass
+
+        rebuild = existing_definition != definition
+        if auto_lists:
+            count = self._count_rows(table_name)
+            if not rebuild and count > self.IVFFLAT_REBUILD_GROWTH * max(built_rows or 0, 1000):
+                logger.info(f'Table {table_name} grew from {built_rows} to {count} rows, ivfflat index is rebuilt')
+                rebuild = True
+        if rebuild:
+            comment = definition
+            if auto_lists:
+                lists = count // 1000 if count <= 1_000_000 else int(math.sqrt(count))
+                options['lists'] = max(lists, 1)
+                comment = json.dumps({**json.loads(definition), 'rows': count}, sort_keys=True)
+
+            with_clause = ', '.join(f'{key} = {value}' for key, value in options.items())
+            logger.info(f'Creating {index_type} index for {table_name} with {with_clause}')
+            self._swap_index(
+                table_name, index_name,
+                f'USING {index_type} (embeddings {operator_class}) WITH ({with_clause})',
+                comment
+            )
+
+        self._indexed_tables[table_name] = params
+        return True
+
+    def _swap_index(self, table_name: str, index_name: str, index_definition: str, comment: str):
+        """
+        Builds the index under temporary name using CREATE INDEX CONCURRENTLY, it doesn't block inserts and
+        searches in the table while the index is being built. Then the old index is replaced by the new one in a short
+        transaction.
+
+        Args:
+            table_name (str): name of the table
+            index_name (str): name of the index
+            index_definition (str): part of CREATE INDEX after the table name
+            comment (str): comment of the index
+        """
+        temp_name = f'{index_name[:50]}_{uuid4().hex[:8]}'
+        # concurrent build can't be executed inside of transaction
+        connection = self._open_connection({**self._make_connection_args(), 'autocommit': True})
+        try:
+            try:
+                connection.execute(f'CREATE INDEX CONCURRENTLY {temp_name} ON {table_name} {index_definition}')
+            except Exception:
+                # failed concurrent build leaves invalid index
+                try:
+                    connection.execute(f'DROP INDEX IF EXISTS {temp_name}')
+                except Exception as e:
+                    logger.warning(f"Can't drop invalid index {temp_name}: {e}")
+                raise
+            with connection.transaction():
+                connection.execute(f'DROP INDEX IF EXISTS {index_name}')
+                connection.execute(f'ALTER INDEX {temp_name} RENAME TO {index_name}')
+                connection.execute(f"COMMENT ON INDEX {index_name} IS '{comment}'")
+        finally:
+            connection.close()
+
+    def _count_rows(self, table_name: str) -> int:
+        # estimation from statistics is used for big tables: exact count would scan the table after each insert
+        estimation = self._fetch(
+            'SELECT reltuples::bigint AS count FROM pg_class WHERE oid = to_regclass(%s)', (table_name,)
+        )
+        if len(estimation) > 0 and estimation['count'][0] > 100_000:
+            return int(estimation['count'][0])
+        return int(self._fetch(f'SELECT count(*) AS count FROM {table_name}')['count'][0])
+
+    def _get_index_operator_class(self) -> str:
+        vector_type = 'sparsevec' if self._is_sparse else 'vector'
+        distances = {
+            '<=>': 'cosine',
+            '<->': 'l2',
+            '<#>': 'ip',
+            '<+>': 'l1',
+        }
+        if self.distance_op not in distances:
+            raise ValueError(f'Vector index is not supported for distance operator {self.distance_op}')
+        return f'{vector_type}_{distances[self.distance_op]}_ops'
+
+    def _set_vector_dimension(self, table_name: str) -> bool:
+        """
+        Set dimension of embeddings column, if it is not defined, using dimension of stored embeddings
+
+        Returns:
+            bool: False if dimension is not known
+        """
+        column = self._fetch(
+            "SELECT atttypmod FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'embeddings'",
+            (table_name,)
+        )
+        if len(column) == 0:
+            raise ValueError(f'Table {table_name} does not exist')
+        if column['atttypmod'][0] > 0:
+            return True
+        if self._is_sparse:
+            return False
+
+        dims = self._fetch(
+            f'SELECT vector_dims(embeddings) AS dims FROM {table_name} WHERE embeddings IS NOT NULL LIMIT 1'
+        )
+        if len(dims) == 0:
+            return False
+        self.raw_query(f'ALTER TABLE {table_name} ALTER COLUMN embeddings TYPE vector({int(dims["dims"][0])})')
+        return True
+
+    @staticmethod
+    def _metadata_index_query(table_name: str) -> str:
+        # jsonb_path_ops supports only containment (@>), but it is smaller and faster than default jsonb_ops
+        return (
+            f'CREATE INDEX IF NOT EXISTS {table_name}_metadata_idx '
+            f'ON {table_name} USING gin (metadata jsonb_path_ops)'
+        )
+
+    def _create_keyword_index(self, table_name: str):
+        self.raw_query(f"""
+            ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {self.KEYWORD_COLUMN} tsvector
+            GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED
+        """)
+        self.raw_query(
+            f'CREATE INDEX IF NOT EXISTS {table_name}_{self.KEYWORD_COLUMN}_idx '
+            f'ON {table_name} USING gin ({self.KEYWORD_COLUMN})'
+        )
+        self._keyword_columns[table_name] = True
+
+    def _has_keyword_column(self, table_name: str) -> bool:
+        if table_name not in self._keyword_columns:
+            column = self._fetch(
+                'SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = %s AND NOT attisdropped',
+                (table_name, self.KEYWORD_COLUMN)
+            )
+            self._keyword_columns[table_name] = len(column) > 0
+        return self._keyword_columns[table_name]
+
+    def _has_unique_id(self, table_name: str) -> bool:
+        if table_name not in self._unique_id_tables:
+            # ON CONFLICT (id) requires unique index (or primary key) on this column only, without predicate
+            index = self._fetch(
+                """
+                SELECT 1 FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+                WHERE i.indrelid = to_regclass(%s) AND i.indisunique AND i.indnkeyatts = 1
+                    AND i.indpred IS NULL AND i.indexprs IS NULL AND a.attname = %s
+                """,
+                (table_name, TableField.ID.value)
+            )
+            self._unique_id_tables[table_name] = len(index) > 0
+        return self._unique_id_tables[table_name]
+
+    def _copy_column_types(self) -> dict:
+        # types of columns of vector table for binary COPY
+        return {
+            TableField.ID.value: 'text',
+            TableField.CONTENT.value: 'text',
+            TableField.EMBEDDINGS.value: 'sparsevec' if self._is_sparse else 'vector',
+            TableField.METADATA.value: 'jsonb',
+        }
+
+    def _copy_data(self, cur: psycopg.Cursor, table_name: str, data: pd.DataFrame):
+        """
+        Writes data to the table using binary COPY: vectors and metadata are not converted to text
+        """
+        column_types = self._copy_column_types()
+        columns = list(data.columns)
+        values = []
+        for column in columns:
+            if column == TableField.EMBEDDINGS.value:
+                convert = self._to_copy_vector
+            elif column == TableField.METADATA.value:
+                convert = self._to_copy_metadata
+            else:
+                convert = self._to_copy_text
+            values.append([convert(value) for value in data[column]])
+
+        with cur.copy(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT BINARY)") as copy:
+            copy.set_types([column_types[column] for column in columns])
+            for row in zip(*values):
+                copy.write_row(row)
 
     def insert(
         self, table_name: str, data: pd.DataFrame
     ):
         """
         Insert data into the pgvector table database.
+
+        Columns of vector table are inserted using binary COPY: vectors and metadata are not converted to text.
         """
         table_name = self._check_table(table_name)
 
-        if 'metadata' in data.columns:
-             data['metadata'] = data['metadata'].apply(json.dumps)
+        if not set(data.columns).issubset(self._copy_column_types()):
+            # unknown columns: use text COPY of postgres handler
+            if 'metadata' in data.columns:
+                data['metadata'] = data['metadata'].apply(json.dumps)
+
+            resp = super().insert(table_name, data)
+            if resp.resp_type == RESPONSE_TYPE.ERROR:
+                raise RuntimeError(resp.error_message)
+            if resp.resp_type == RESPONSE_TYPE.TABLE:
+                return resp.data_frame
+            return
+
+        with self._get_connection() as connection:
+            with connection.cursor() as cur:
+                try:
+                    self._copy_data(cur, table_name, data)
+                    connection.commit()
+                except Exception as e:
+                    logger.error(f'Error running insert to {table_name} on {self.database}, {e}!')
+                    connection.rollback()
+                    raise RuntimeError(str(e))
+
+    def upsert(self, table_name: str, data: pd.DataFrame):
+        """
+        Insert rows and update existing rows with the same id in one transaction.
+        Data is copied (binary COPY) to temporary table and merged into the table by INSERT ... ON CONFLICT
 
-        resp = super().insert(table_name, data)
-        if resp.resp_type == RESPONSE_TYPE.ERROR:
-            raise RuntimeError(resp.error_message)
-        if resp.resp_type == RESPONSE_TYPE.TABLE:
-            return resp.data_frame
+        Tables without unique index on id (created not by the handler) raise NotImplementedError,
+        they are updated by generic upsert of VectorStoreHandler.
+        """
+        id_column = TableField.ID.value
+        columns = list(data.columns)
+        if id_column not in columns or not set(columns).issubset(self._copy_column_types()):
+            raise NotImplementedError()
+
+        table_name = self._check_table(table_name)
+        if not self._has_unique_id(table_name):
+            raise NotImplementedError(f'Table {table_name} has no unique index on {id_column}')
+        temp_table = 'upsert_data'
+        targets = ', '.join(columns)
+        update_columns = [column for column in columns if column != id_column]
+        if update_columns:
+            on_conflict = 'DO UPDATE SET ' + ', '.join(f'{column} = EXCLUDED.{column}' for column in update_columns)
+        else:
+            on_conflict = 'DO NOTHING'
+
+        with self._get_connection() as connection:
+            with connection.cursor() as cur:
+                try:
+                    with connection.transaction():
+                        # temp table is dropped at the end of transaction
+                        cur.execute(
+                            f'CREATE TEMP TABLE {temp_table} ON COMMIT DROP AS '
+                            f'SELECT {targets} FROM {table_name} WITH NO DATA'
+                        )
+                        self._copy_data(cur, temp_table, data)
+                        cur.execute(
+                            f'INSERT INTO {table_name} ({targets}) SELECT {targets} FROM {temp_table} '
+                            f'ON CONFLICT ({id_column}) {on_conflict}'
+                        )
+                    if not connection.autocommit:
+                        connection.commit()
+                except Exception as e:
+                    logger.error(f'Error running upsert to {table_name} on {self.database}, {e}!')
+                    if not connection.autocommit:
+                        connection.rollback()
+                    raise RuntimeError(str(e))
+
+    @staticmethod
+    def _is_null(value) -> bool:
+        return value is None or (isinstance(value, float) and math.isnan(value))
+
+    def _to_copy_text(self, value) -> Union[str, None]:
+        if self._is_null(value):
+            return None
+        return str(value)
+
+    def _to_copy_metadata(self, value) -> Union[dict, None]:
+        if self._is_null(value):
+            return None
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    def _to_copy_vector(self, value):
+        if self._is_null(value):
+            return None
+        return self._to_search_vector(value)
 
     def update(
         self, table_name: str, data: pd.DataFrame, key_columns: List[str] = None
@@ -481,23 +973,20 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
             where=where
         )
 
-        if TableField.METADATA.value in data.columns:
-            def fnc(v):
-                if isinstance(v, dict):
-                    return json.dumps(v)
-            data[TableField.METADATA.value] = data[TableField.METADATA.value].apply(fnc)
-
-            data = data.astype({TableField.METADATA.value: str})
-
-        transposed_data = []
-        for _, record in data.iterrows():
-            row = [
-                record[col]
-                for col in update_columns.keys()
-            ]
-            for key_column in key_columns:
-                row.append(record[key_column])
-            transposed_data.append(row)
+        def to_metadata(value):
+            value = self._to_copy_metadata(value)
+            return None if value is None else Jsonb(value)
+
+        # parameters are built by columns: vectors are passed as pgvector objects, metadata as jsonb
+        values = []
+        for col in [*update_columns.keys(), *key_columns]:
+            if col == TableField.EMBEDDINGS.value:
+                values.append([self._to_copy_vector(v) for v in data[col]])
+            elif col == TableField.METADATA.value:
+                values.append([to_metadata(v) for v in data[col]])
+            else:
+                values.append(data[col].tolist())
+        transposed_data = list(zip(*values))
 
         query_str = self.renderer.get_string(query)
         self.raw_query(query_str, transposed_data)
@@ -507,13 +996,14 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
     ):
         table_name = self._check_table(table_name)
 
-        filter_conditions = self._translate_conditions(conditions)
-        where_clause = self._construct_where_clause(filter_conditions)
+        params = {}
+        where_clause = self._build_where_clause(conditions, params)
 
         query = (
             f"DELETE FROM {table_name} {where_clause}"
         )
-        self.raw_query(query)
+        # raw_query executes query with parameters by executemany
+        self.raw_query(query, [params] if params else None)
 
     def drop_table(self, table_name: str, if_exists=True):
         """
@@ -521,3 +1011,6 @@ class PgVectorHandler(PostgresHandler, VectorStoreHandler):
         """
         table_name = self._check_table(table_name)
         self.raw_query(f"DROP TABLE IF EXISTS {table_name}")
+        # the table can be created again with other structure
+        for checked_tables in (self._indexed_tables, self._keyword_columns, self._unique_id_tables):
+            checked_tables.pop(table_name, None)
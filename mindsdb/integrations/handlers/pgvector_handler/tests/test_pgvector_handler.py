@@ -0,0 +1,130 @@
+import json
+import re
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import psycopg
+import pytest
+from psycopg._queries import PostgresQuery
+from psycopg.adapt import AdaptersMap, Transformer
+from pgvector.psycopg.bit import register_bit_info
+from pgvector.utils import Bit
+
+from mindsdb.integrations.handlers.pgvector_handler.pgvector_handler import PgVectorHandler
+from mindsdb.integrations.utilities.sql_utils import FilterCondition, FilterOperator
+
+
+def get_handler(**connection_data) -> PgVectorHandler:
+    connection_data = {'host': '127.0.0.1', 'database': 'test', **connection_data}
+    with patch.object(PgVectorHandler, 'connect'):
+        return PgVectorHandler('test_pgvector', connection_data=connection_data)
+
+
+def convert(query: str, params: dict) -> str:
+    """Convert query with parameters as psycopg does it before sending to postgres"""
+    # adapters of connection after register_vector, bit is built-in type of postgres
+    context = SimpleNamespace(adapters=AdaptersMap(psycopg.adapters), connection=None)
+    register_bit_info(context, psycopg.adapters.types['bit'])
+    pg_query = PostgresQuery(Transformer(context))
+    pg_query.convert(query, params)
+    return pg_query.query.decode()
+
+
+class TestSelectQuery:
+    @pytest.mark.parametrize('distance, operator', [('jaccard', '<%>'), ('hamming', '<~>')])
+    def test_bit_distance(self, distance, operator):
+        handler = get_handler(distance=distance)
+        conditions = [FilterCondition('embeddings', FilterOperator.EQUAL, [1, 0, 1, 1])]
+        query, params = handler._build_select_query('items', conditions=conditions, limit=5)
+
+        search_vector = params['p0']
+        assert isinstance(search_vector, Bit)
+        assert search_vector.to_text() == '1011'
+
+        sql = convert(query, params)
+        assert f'embeddings {operator} $1' in sql
+        assert 'ORDER BY embeddings' in sql
+
+    def test_bit_string_vector(self):
+        handler = get_handler(distance='jaccard')
+        conditions = [FilterCondition('embeddings', FilterOperator.EQUAL, '0110')]
+        _, params = handler._build_select_query('items', conditions=conditions)
+        assert params['p0'].to_text() == '0110'
+
+    def test_query_without_vector(self):
+        handler = get_handler(distance='jaccard')
+        conditions = [FilterCondition('metadata.author', FilterOperator.EQUAL, 'me')]
+        query, params = handler._build_select_query('items', conditions=conditions)
+        assert 'metadata @> $' in convert(query, params)
+
+
+class TestMetadataConditions:
+    def test_not_in_skips_rows_without_key(self):
+        handler = get_handler()
+        params = {}
+        condition = FilterCondition('metadata.author', FilterOperator.NOT_IN, ['a', 'b'])
+        clause = handler._build_condition(condition, params)
+
+        assert clause.startswith('(metadata #>> %(p2)s::text[]) IS NOT NULL AND NOT (')
+        assert params['p2'] == ['author']
+        assert clause.count('metadata @>') == 2
+
+    def test_in(self):
+        handler = get_handler()
+        params = {}
+        condition = FilterCondition('metadata.year', FilterOperator.IN, ['2020'])
+        clause = handler._build_condition(condition, params)
+        # string and number variants of the value
+        assert clause.count('metadata @>') == 2
+        assert 'IS NOT NULL' not in clause
+
+    def test_non_finite_variants(self):
+        assert PgVectorHandler._json_variants('nan') == ['nan']
+        assert PgVectorHandler._json_variants('Infinity') == ['Infinity']
+        assert PgVectorHandler._json_variants('7') == ['7', 7]
+
+
+class TestIndex:
+    def test_ivfflat_rebuild_is_concurrent(self):
+        handler = get_handler()
+        connection = MagicMock()
+        definition = json.dumps({'type': 'ivfflat', 'rows': 1000})
+        with patch.object(handler, '_set_vector_dimension', return_value=True), \
+                patch.object(handler, '_fetch', return_value=pd.DataFrame({'definition': [definition]})), \
+                patch.object(handler, '_count_rows', return_value=5000), \
+                patch.object(handler, '_open_connection', return_value=connection) as open_connection:
+            handler.create_index('items', {'type': 'ivfflat', 'keyword_index': False, 'metadata_index': False})
+
+        assert open_connection.call_args[0][0]['autocommit'] is True
+        queries = [c[0][0] for c in connection.execute.call_args_list]
+        temp_name = re.match(r'CREATE INDEX CONCURRENTLY (\w+) ON items USING ivfflat', queries[0]).group(1)
+        assert temp_name != 'items_embeddings_idx'
+        assert 'lists = 5' in queries[0]
+        assert queries[1:3] == [
+            'DROP INDEX IF EXISTS items_embeddings_idx',
+            f'ALTER INDEX {temp_name} RENAME TO items_embeddings_idx',
+        ]
+        assert '"rows": 5000' in queries[3]
+        connection.transaction.assert_called_once()
+        connection.close.assert_called_once()
+
+    def test_index_is_not_rebuilt_without_growth(self):
+        handler = get_handler()
+        definition = json.dumps({'type': 'ivfflat', 'rows': 1000})
+        with patch.object(handler, '_set_vector_dimension', return_value=True), \
+                patch.object(handler, '_fetch', return_value=pd.DataFrame({'definition': [definition]})), \
+                patch.object(handler, '_count_rows', return_value=1500), \
+                patch.object(handler, '_swap_index') as swap_index:
+            handler.create_index('items', {'type': 'ivfflat', 'keyword_index': False, 'metadata_index': False})
+        swap_index.assert_not_called()
+
+    def test_failed_build_drops_temp_index(self):
+        handler = get_handler()
+        connection = MagicMock()
+        connection.execute.side_effect = [psycopg.errors.QueryCanceled(), None]
+        with patch.object(handler, '_open_connection', return_value=connection):
+            with pytest.raises(psycopg.errors.QueryCanceled):
+                handler._swap_index('items', 'items_embeddings_idx', 'USING hnsw (embeddings)', '{}')
+        assert connection.execute.call_args_list[1][0][0].startswith('DROP INDEX IF EXISTS items_embeddings_idx_')
+        connection.transaction.assert_not_called()
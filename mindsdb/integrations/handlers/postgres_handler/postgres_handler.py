@@ -1,19 +1,27 @@
+import re
 import time
 import json
+import threading
+from uuid import uuid4
+from contextlib import contextmanager
+from functools import partial
 from typing import Optional
 
 import pandas as pd
 import psycopg
 from psycopg.postgres import types
-from psycopg.pq import ExecStatus
+from psycopg.pq import ExecStatus, TransactionStatus
 from pandas import DataFrame
 
 from mindsdb_sql_parser import parse_sql
+from mindsdb_sql_parser.ast import Select, Union, Intersect, Except
 from mindsdb.utilities.render.sqlalchemy_render import SqlalchemyRender
 from mindsdb_sql_parser.ast.base import ASTNode
 
 from mindsdb.integrations.libs.base import DatabaseHandler
+from mindsdb.integrations.libs.connection_pool import checkout, is_pool_enabled, pooled_connection
 from mindsdb.utilities import log
+from mindsdb.utilities.context import context as ctx
 from mindsdb.integrations.libs.response import (
     HandlerStatusResponse as StatusResponse,
     HandlerResponse as Response,
@@ -26,6 +34,12 @@ logger = log.getLogger(__name__)
 
 SUBSCRIBE_SLEEP_INTERVAL = 1
 
+# statements which change state of the session: it has to be kept for the next queries of the thread
+SESSION_STATE_RE = re.compile(
+    r'^\s*(set\s+(?!local\b|transaction\b)|reset\s|create\s+((global|local)\s+)?temp(orary)?\s|prepare\s|listen\s|load\s)',
+    re.IGNORECASE
+)
+
 
 def _map_type(internal_type_name: str) -> MYSQL_DATA_TYPE:
     """Map Postgres types to MySQL types.
@@ -59,6 +73,21 @@ def _map_type(internal_type_name: str) -> MYSQL_DATA_TYPE:
     return MYSQL_DATA_TYPE.VARCHAR
 
 
+def _check_connection(connection: psycopg.Connection):
+    # check that pooled connection is alive before use
+    connection.execute('select 1')
+    connection.rollback()
+
+
+def _reset_connection(connection: psycopg.Connection):
+    # clean connection before return to the pool
+    status = connection.info.transaction_status
+    if connection.closed or status == TransactionStatus.UNKNOWN:
+        raise psycopg.OperationalError('Connection is lost')
+    if status != TransactionStatus.IDLE:
+        connection.rollback()
+
+
 class PostgresHandler(DatabaseHandler):
     """
     This handler handles connection and execution of the PostgreSQL statements.
@@ -76,7 +105,12 @@ class PostgresHandler(DatabaseHandler):
 
         self.connection = None
         self.is_connected = False
-        self.thread_safe = False
+        # with the pool each operation uses own connection, so the handler can be shared between threads
+        self.use_pool = is_pool_enabled()
+        self.thread_safe = self.use_pool
+        # pooled connections with changed session state, they are kept by the thread until disconnect
+        self._pinned_connections = {}
+        self._pinned_lock = threading.Lock()
 
     def __del__(self):
         if self.is_connected:
@@ -110,37 +144,162 @@ class PostgresHandler(DatabaseHandler):
             config['options'] = f'-c search_path={self.connection_args.get("schema")},public'
         return config
 
+    @classmethod
+    def _open_connection(cls, config: dict) -> psycopg.Connection:
+        """
+        Opens a new connection to a PostgreSQL database.
+
+        Args:
+            config (dict): connection arguments, result of _make_connection_args
+
+        Raises:
+            psycopg.Error: If an error occurs while connecting to the PostgreSQL database.
+
+        Returns:
+            psycopg.Connection: A connection object to the PostgreSQL database.
+        """
+        try:
+            connection = psycopg.connect(**config)
+        except psycopg.Error as e:
+            logger.error(f'Error connecting to PostgreSQL {config.get("dbname")}, {e}!')
+            raise
+        try:
+            cls._init_connection(connection)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    @staticmethod
+    def _init_connection(connection: psycopg.Connection):
+        """
+        Prepares a new connection for use, it is called once for each opened connection.
+
+        Args:
+            connection (psycopg.Connection): new connection
+        """
+        pass
+
+    def _pool_args(self) -> dict:
+        config = self._make_connection_args()
+        return dict(
+            key=(type(self).name, ctx.company_id, self.name, json.dumps(config, sort_keys=True, default=str)),
+            connect=partial(type(self)._open_connection, config),
+            check=_check_connection,
+            reset=_reset_connection,
+            name=type(self).name
+        )
+
+    @contextmanager
+    def _get_connection(self, pin: bool = False):
+        """
+        Provides a connection for the duration of the context: from the pool of the integration or own connection of
+        the handler (it is closed at the exit if it was not opened before).
+
+        Args:
+            pin (bool): the query changes state of the session. The pooled connection is not returned to the pool and
+                is used by the next queries of the current thread, until disconnect.
+
+        Yields:
+            psycopg.Connection: A connection object to the PostgreSQL database.
+        """
+        if self.use_pool:
+            thread_id = threading.get_native_id()
+            with self._pinned_lock:
+                pinned = self._pinned_connections.get(thread_id)
+            if pinned is None and pin:
+                pinned = checkout(**self._pool_args())
+                with self._pinned_lock:
+                    self._pinned_connections[thread_id] = pinned
+                self.is_connected = True
+            if pinned is not None:
+                yield pinned[1]
+                return
+
+            with pooled_connection(**self._pool_args()) as connection:
+                yield connection
+            return
+
+        need_to_close = not self.is_connected
+        connection = self.connect()
+        try:
+            yield connection
+        finally:
+            if need_to_close:
+                self.disconnect()
+
+    @contextmanager
+    def _get_stream_connection(self):
+        """
+        Provides a connection for query_stream: in pool mode it is a new connection (or the pinned connection of the
+        thread), which is closed at the exit.
+
+        Yields:
+            psycopg.Connection: A connection object to the PostgreSQL database.
+        """
+        if not self.use_pool or threading.get_native_id() in self._pinned_connections:
+            with self._get_connection() as connection:
+                yield connection
+            return
+
+        connection = self._open_connection(self._make_connection_args())
+        try:
+            yield connection
+        finally:
+            connection.close()
+
     @profiler.profile()
     def connect(self):
         """
         Establishes a connection to a PostgreSQL database.
+        If the pool of connections is used, the handler doesn't keep own connection: the connection is taken from the
+        pool and returned back to check that the database is reachable. Queries of the handler get connections from
+        the pool, so the state of the session (SET, temporary tables, etc) is kept only for the thread which changed it,
+        see _get_connection.
 
         Raises:
             psycopg.Error: If an error occurs while connecting to the PostgreSQL database.
 
         Returns:
-            psycopg.Connection: A connection object to the PostgreSQL database.
+            psycopg.Connection: A connection object to the PostgreSQL database, None if the pool is used.
         """
+        if self.use_pool:
+            try:
+                with self._get_connection():
+                    pass
+            except Exception:
+                self.is_connected = False
+                raise
+            self.is_connected = True
+            return None
+
         if self.is_connected:
             return self.connection
 
         config = self._make_connection_args()
         try:
-            self.connection = psycopg.connect(**config)
+            self.connection = self._open_connection(config)
             self.is_connected = True
             return self.connection
-        except psycopg.Error as e:
-            logger.error(f'Error connecting to PostgreSQL {self.database}, {e}!')
+        except psycopg.Error:
             self.is_connected = False
             raise
 
     def disconnect(self):
         """
         Closes the connection to the PostgreSQL database if it's currently open.
+        Pooled connections with changed session state are closed, so the state doesn't leak to other handlers.
         """
         if not self.is_connected:
             return
-        self.connection.close()
+        if self.use_pool:
+            with self._pinned_lock:
+                pinned = list(self._pinned_connections.values())
+                self._pinned_connections.clear()
+            for pool, connection in pinned:
+                pool.putconn(connection, discard=True)
+        else:
+            self.connection.close()
         self.is_connected = False
 
     def check_connection(self) -> StatusResponse:
@@ -151,26 +310,49 @@ class PostgresHandler(DatabaseHandler):
             StatusResponse: An object containing the success status and an error message if an error occurs.
         """
         response = StatusResponse(False)
-        need_to_close = not self.is_connected
 
         try:
-            connection = self.connect()
-            with connection.cursor() as cur:
-                # Execute a simple query to test the connection
-                cur.execute('select 1;')
+            with self._get_connection() as connection:
+                with connection.cursor() as cur:
+                    # Execute a simple query to test the connection
+                    cur.execute('select 1;')
             response.success = True
         except psycopg.Error as e:
             logger.error(f'Error connecting to PostgreSQL {self.database}, {e}!')
             response.error_message = str(e)
 
-        if response.success and need_to_close:
-            self.disconnect()
-        elif not response.success and self.is_connected:
+        if not response.success and self.is_connected:
             self.is_connected = False
 
         return response
 
-    def _cast_dtypes(self, df: DataFrame, description: list) -> DataFrame:
+    @staticmethod
+    def _get_cast_plan(description: list) -> dict:
+        """
+        Get dtypes of numeric columns, which have to be casted, basing on postgres types
+
+            Args:
+                description (list): psycopg cursor description
+
+            Returns:
+                dict: dtype by index of column
+        """
+        types_map = {
+            'int2': 'int16',
+            'int4': 'int32',
+            'int8': 'int64',
+            'numeric': 'float64',
+            'float4': 'float32',
+            'float8': 'float64'
+        }
+        cast_plan = {}
+        for column_index, column in enumerate(description):
+            pg_type = types.get(column.type_code)
+            if pg_type is not None and pg_type.name in types_map:
+                cast_plan[column_index] = types_map[pg_type.name]
+        return cast_plan
+
+    def _cast_dtypes(self, df: DataFrame, description: list, cast_plan: Optional[dict] = None) -> DataFrame:
         """
         Cast df dtypes basing on postgres types
             Note:
@@ -185,28 +367,18 @@ class PostgresHandler(DatabaseHandler):
             Args:
                 df (DataFrame)
                 description (list): psycopg cursor description
+                cast_plan (dict): result of _get_cast_plan, to not compute it for every batch of the stream
         """
-        types_map = {
-            'int2': 'int16',
-            'int4': 'int32',
-            'int8': 'int64',
-            'numeric': 'float64',
-            'float4': 'float32',
-            'float8': 'float64'
-        }
-        columns = df.columns
-        df.columns = list(range(len(columns)))
-        for column_index, column_name in enumerate(df.columns):
-            col = df[column_name]
+        if cast_plan is None:
+            cast_plan = self._get_cast_plan(description)
+        for column_index, dtype in cast_plan.items():
+            col = df.iloc[:, column_index]
             if str(col.dtype) == 'object':
-                pg_type = types.get(description[column_index].type_code)
-                if pg_type is not None and pg_type.name in types_map:
-                    col = col.fillna(0)
-                    try:
-                        df[column_name] = col.astype(types_map[pg_type.name])
-                    except ValueError as e:
-                        logger.error(f'Error casting column {col.name} to {types_map[pg_type.name]}: {e}')
-        df.columns = columns
+                col = col.fillna(0)
+                try:
+                    df.isetitem(column_index, col.astype(dtype))
+                except ValueError as e:
+                    logger.error(f'Error casting column {col.name} to {dtype}: {e}')
 
     @profiler.profile()
     def native_query(self, query: str, params=None) -> Response:
@@ -219,41 +391,37 @@ class PostgresHandler(DatabaseHandler):
         Returns:
             Response: A response object containing the result of the query or an error message.
         """
-        need_to_close = not self.is_connected
-
-        connection = self.connect()
-        with connection.cursor() as cur:
-            try:
-                if params is not None:
-                    cur.executemany(query, params)
-                else:
-                    cur.execute(query)
-                if cur.pgresult is None or ExecStatus(cur.pgresult.status) == ExecStatus.COMMAND_OK:
-                    response = Response(RESPONSE_TYPE.OK, affected_rows=cur.rowcount)
-                else:
-                    result = cur.fetchall()
-                    df = DataFrame(
-                        result,
-                        columns=[x.name for x in cur.description]
-                    )
-                    self._cast_dtypes(df, cur.description)
+        pin = isinstance(query, str) and SESSION_STATE_RE.match(query) is not None
+        with self._get_connection(pin=pin) as connection:
+            with connection.cursor() as cur:
+                try:
+                    if params is not None:
+                        cur.executemany(query, params)
+                    else:
+                        cur.execute(query)
+                    if cur.pgresult is None or ExecStatus(cur.pgresult.status) == ExecStatus.COMMAND_OK:
+                        response = Response(RESPONSE_TYPE.OK, affected_rows=cur.rowcount)
+                    else:
+                        result = cur.fetchall()
+                        df = DataFrame(
+                            result,
+                            columns=[x.name for x in cur.description]
+                        )
+                        self._cast_dtypes(df, cur.description)
+                        response = Response(
+                            RESPONSE_TYPE.TABLE,
+                            data_frame=df,
+                            affected_rows=cur.rowcount
+                        )
+                    connection.commit()
+                except Exception as e:
+                    logger.error(f'Error running query: {query} on {self.database}, {e}!')
                     response = Response(
-                        RESPONSE_TYPE.TABLE,
-                        data_frame=df,
-                        affected_rows=cur.rowcount
+                        RESPONSE_TYPE.ERROR,
+                        error_code=0,
+                        error_message=str(e)
                     )
-                connection.commit()
-            except Exception as e:
-                logger.error(f'Error running query: {query} on {self.database}, {e}!')
-                response = Response(
-                    RESPONSE_TYPE.ERROR,
-                    error_code=0,
-                    error_message=str(e)
-                )
-                connection.rollback()
-
-        if need_to_close:
-            self.disconnect()
+                    connection.rollback()
 
         return response
 
@@ -261,45 +429,54 @@ class PostgresHandler(DatabaseHandler):
         """
         Executes a SQL query and stream results outside by batches
 
+        Select queries are executed using server-side (named) cursor: the database sends rows by batches of
+        fetch_size, so the whole result is not loaded into memory at once.
+        The connection is held until the stream is consumed, so if the pool is used the stream opens a separate
+        connection: slow consumer doesn't keep the connection of the pool from other queries.
+
         :param query: An ASTNode representing the SQL query to be executed.
         :param fetch_size: size of the batch
         :return: generator with query results
         """
         query_str, params = self.renderer.get_exec_params(query, with_failback=True)
-
-        need_to_close = not self.is_connected
-
-        connection = self.connect()
-        with connection.cursor() as cur:
-            try:
-                if params is not None:
-                    cur.executemany(query_str, params)
-                else:
-                    cur.execute(query_str)
-
-                if cur.pgresult is not None and ExecStatus(cur.pgresult.status) != ExecStatus.COMMAND_OK:
-                    while True:
-                        result = cur.fetchmany(fetch_size)
-                        if not result:
-                            break
-                        df = DataFrame(
-                            result,
-                            columns=[x.name for x in cur.description]
-                        )
-                        self._cast_dtypes(df, cur.description)
-                        yield df
-                connection.commit()
-            finally:
-                connection.rollback()
-
-        if need_to_close:
-            self.disconnect()
+        fetch_size = fetch_size or 1000
+
+        with self._get_stream_connection() as connection:
+            # server-side cursor can exist only inside of transaction
+            use_server_cursor = (
+                params is None
+                and not connection.autocommit
+                and isinstance(query, (Select, Union, Intersect, Except))
+            )
+            if use_server_cursor:
+                cursor = connection.cursor(name=f'mindsdb_stream_{uuid4().hex}')
+                cursor.itersize = fetch_size
+            else:
+                cursor = connection.cursor()
+            with cursor as cur:
+                try:
+                    if params is not None:
+                        cur.executemany(query_str, params)
+                    else:
+                        cur.execute(query_str)
+
+                    if use_server_cursor or (
+                        cur.pgresult is not None and ExecStatus(cur.pgresult.status) != ExecStatus.COMMAND_OK
+                    ):
+                        columns = [x.name for x in cur.description]
+                        cast_plan = self._get_cast_plan(cur.description)
+                        while True:
+                            result = cur.fetchmany(fetch_size)
+                            if not result:
+                                break
+                            df = DataFrame(result, columns=columns)
+                            self._cast_dtypes(df, cur.description, cast_plan)
+                            yield df
+                    connection.commit()
+                finally:
+                    connection.rollback()
 
     def insert(self, table_name: str, df: pd.DataFrame) -> Response:
-        need_to_close = not self.is_connected
-
-        connection = self.connect()
-
         columns = df.columns
 
         resp = self.get_columns(table_name)
@@ -320,20 +497,18 @@ class PostgresHandler(DatabaseHandler):
         columns = [f'"{c}"' for c in columns]
         rowcount = None
 
-        with connection.cursor() as cur:
-            try:
-                with cur.copy(f'copy "{table_name}" ({",".join(columns)}) from STDIN WITH CSV') as copy:
-                    df.to_csv(copy, index=False, header=False)
-
-                connection.commit()
-            except Exception as e:
-                logger.error(f'Error running insert to {table_name} on {self.database}, {e}!')
-                connection.rollback()
-                raise e
-            rowcount = cur.rowcount
-
-        if need_to_close:
-            self.disconnect()
+        with self._get_connection() as connection:
+            with connection.cursor() as cur:
+                try:
+                    with cur.copy(f'copy "{table_name}" ({",".join(columns)}) from STDIN WITH CSV') as copy:
+                        df.to_csv(copy, index=False, header=False)
+
+                    connection.commit()
+                except Exception as e:
+                    logger.error(f'Error running insert to {table_name} on {self.database}, {e}!')
+                    connection.rollback()
+                    raise e
+                rowcount = cur.rowcount
 
         return Response(RESPONSE_TYPE.OK, affected_rows=rowcount)
 
@@ -0,0 +1,289 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg.pq import TransactionStatus
+
+from mindsdb.integrations.libs import connection_pool
+from mindsdb.integrations.libs.connection_pool import ConnectionPool, PoolClosed, PoolTimeout, pooled_connection
+from mindsdb.integrations.handlers.postgres_handler import postgres_handler
+from mindsdb.integrations.handlers.postgres_handler.postgres_handler import PostgresHandler
+from mindsdb.utilities.context import context as ctx
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs) -> ConnectionPool:
+    connections = []
+
+    def connect():
+        connection = FakeConnection()
+        connections.append(connection)
+        return connection
+
+    pool = ConnectionPool(connect=connect, **kwargs)
+    pool.connections = connections
+    return pool
+
+
+@pytest.fixture
+def registry():
+    yield connection_pool.pools_registry
+    connection_pool.pools_registry.close()
+
+
+class TestConnectionPool:
+    def test_checkout(self):
+        pool = make_pool(max_size=2)
+        connection = pool.getconn()
+        assert pool.size == 1
+        pool.putconn(connection)
+        # idle connection is reused
+        assert pool.getconn() is connection
+        second = pool.getconn()
+        assert second is not connection
+        assert pool.size == 2
+        pool.putconn(connection)
+        pool.putconn(second)
+        assert pool.size == 2
+        assert not any(c.closed for c in pool.connections)
+
+    def test_discard(self):
+        pool = make_pool()
+        connection = pool.getconn()
+        pool.putconn(connection, discard=True)
+        assert connection.closed
+        assert pool.size == 0
+
+    def test_reset_failed(self):
+        def reset(connection):
+            raise ValueError('broken')
+
+        pool = make_pool(reset=reset)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        assert connection.closed
+        assert pool.size == 0
+
+    def test_timeout(self):
+        pool = make_pool(max_size=1)
+        connection = pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn(timeout=0.05)
+
+        # waiting thread gets the connection as soon as it is returned
+        threading.Timer(0.05, pool.putconn, args=(connection,)).start()
+        assert pool.getconn(timeout=5) is connection
+
+    def test_failed_connect_frees_slot(self):
+        def connect():
+            raise ConnectionError()
+
+        pool = ConnectionPool(connect=connect, max_size=1)
+        with pytest.raises(ConnectionError):
+            pool.getconn()
+        assert pool.size == 0
+
+    def test_lifetime(self):
+        pool = make_pool(max_lifetime=0.05)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        time.sleep(0.1)
+
+        # expired idle connection is not used
+        new_connection = pool.getconn()
+        assert new_connection is not connection
+        assert connection.closed
+
+        # expired connection is closed when it is returned
+        time.sleep(0.1)
+        pool.putconn(new_connection)
+        assert new_connection.closed
+        assert pool.size == 0
+
+    def test_idle_eviction(self):
+        pool = make_pool(max_idle=0.05, min_size=1)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        time.sleep(0.1)
+        pool.maintain()
+        # min_size connections are kept
+        assert pool.size == 1
+        assert sum(c.closed for c in pool.connections) == 1
+
+    def test_min_size(self):
+        pool = make_pool(min_size=2)
+        pool.maintain()
+        assert pool.size == 2
+        assert len(pool.connections) == 2
+
+    def test_check(self):
+        def check(connection):
+            if connection.broken:
+                raise ConnectionError()
+
+        pool = make_pool(check=check, check_interval=0)
+        connection = pool.getconn()
+        connection.broken = True
+        pool.putconn(connection)
+        new_connection = pool.getconn()
+        assert new_connection is not connection
+        assert connection.closed
+
+    def test_close(self):
+        pool = make_pool()
+        idle, used = pool.getconn(), pool.getconn()
+        pool.putconn(idle)
+        pool.close()
+        assert idle.closed
+        assert not used.closed
+        with pytest.raises(PoolClosed):
+            pool.getconn()
+        # used connection is closed when it is returned
+        pool.putconn(used)
+        assert used.closed
+        assert pool.size == 0
+
+    def test_close_if_unused(self):
+        pool = make_pool()
+        connection = pool.getconn()
+        assert pool.close_if_unused() is False
+        pool.putconn(connection, discard=True)
+        assert pool.close_if_unused() is True
+
+
+class TestPooledConnection:
+    def test_pool_closed_after_get(self, registry):
+        """Pool is closed by maintenance between get_pool and getconn"""
+        key = ('test', 'closed_after_get')
+        original_get = registry.get
+        closed_pools = []
+
+        def get_and_close(key, **kwargs):
+            pool = original_get(key, **kwargs)
+            if not closed_pools:
+                with registry._lock:
+                    assert pool.close_if_unused()
+                    del registry._pools[key]
+                closed_pools.append(pool)
+            return pool
+
+        with patch.object(registry, 'get', side_effect=get_and_close):
+            with pooled_connection(key=key, connect=FakeConnection) as connection:
+                assert isinstance(connection, FakeConnection)
+
+        pool = registry._pools[key]
+        assert pool is not closed_pools[0]
+        assert pool.size == 1
+
+    def test_concurrent_close_if_unused(self, registry):
+        key = ('test', 'concurrent')
+        stop = threading.Event()
+        errors = []
+
+        def close_unused():
+            while not stop.is_set():
+                with registry._lock:
+                    pool = registry._pools.get(key)
+                    if pool is not None and pool.close_if_unused():
+                        del registry._pools[key]
+
+        def reset(connection):
+            # connection is closed on return, so the pool becomes empty and can be closed by maintenance
+            raise ValueError()
+
+        def use():
+            try:
+                for _ in range(300):
+                    with pooled_connection(key=key, connect=FakeConnection, reset=reset, max_size=4) as connection:
+                        assert not connection.closed
+            except Exception as e:
+                errors.append(e)
+
+        closer = threading.Thread(target=close_unused)
+        closer.start()
+        workers = [threading.Thread(target=use) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stop.set()
+        closer.join()
+        assert errors == []
+
+
+def make_pg_connection():
+    connection = MagicMock()
+    connection.closed = False
+    connection.autocommit = False
+    connection.info.transaction_status = TransactionStatus.IDLE
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.pgresult = None
+    cursor.rowcount = 0
+    return connection
+
+
+@pytest.fixture
+def pool_handler(registry):
+    with patch.object(postgres_handler, 'is_pool_enabled', return_value=True), \
+            patch.object(PostgresHandler, '_open_connection', side_effect=lambda config: make_pg_connection()):
+        handler = PostgresHandler('test_pool', connection_data={'host': '127.0.0.1', 'database': 'test'})
+        yield handler
+        handler.disconnect()
+
+
+class TestPostgresHandlerPool:
+    def test_connect(self, pool_handler):
+        assert pool_handler.thread_safe
+        pool_handler.connect()
+        assert pool_handler.is_connected
+        pool_handler.disconnect()
+        assert not pool_handler.is_connected
+
+    def test_session_state_is_kept_by_thread(self, pool_handler):
+        pool_handler.connect()
+        pool_handler.native_query('SET search_path TO other')
+        with pool_handler._get_connection() as pinned:
+            pass
+        # the same connection is used by the next queries of the thread, it is not returned to the pool
+        pinned.cursor.return_value.__enter__.return_value.execute.assert_called_once_with('SET search_path TO other')
+        pool_handler.native_query('select 1')
+        assert pinned.cursor.return_value.__enter__.return_value.execute.call_count == 2
+
+        # another thread doesn't use it
+        other_connections = []
+
+        def query():
+            ctx.set_default()
+            with pool_handler._get_connection() as other:
+                other_connections.append(other)
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+        assert other_connections[0] is not pinned
+
+        # connection with changed state is not returned to the pool
+        pool_handler.disconnect()
+        pinned.close.assert_called_once()
+        other_connections[0].close.assert_not_called()
+
+    def test_set_local_is_not_pinned(self, pool_handler):
+        pool_handler.native_query('SET LOCAL statement_timeout = 100')
+        assert pool_handler._pinned_connections == {}
+
+    def test_stream_uses_own_connection(self, pool_handler):
+        with pool_handler._get_connection() as pooled:
+            pass
+        with pool_handler._get_stream_connection() as connection:
+            assert connection is not pooled
+        connection.close.assert_called_once()
+        pooled.close.assert_not_called()
@@ -9,6 +9,7 @@ from mindsdb_sql_parser.ast.base import ASTNode
 from mindsdb.utilities import log
 
 from mindsdb.integrations.libs.response import HandlerResponse, HandlerStatusResponse
+from mindsdb.integrations.libs.ml_models_cache import models_cache
 
 logger = log.getLogger(__name__)
 
@@ -351,5 +352,34 @@ class BaseMLEngine(ArgProbeMixin):
         """
         raise NotImplementedError
 
+    def load_model(self, args: Optional[Dict] = None) -> Any:
+        """Optional.
+
+        Loads model object (weights, pipeline, deserialized predictor) from the storage to use it in `predict`.
+        Handlers which implement it have to get model using `get_model`: the loaded model is kept in memory of ML process
+        and reused by next predictions.
+        """
+        raise NotImplementedError
+
+    def get_model_size(self, model: Any) -> Optional[int]:
+        """Optional.
+
+        Returns size in bytes of the model loaded by `load_model`, it is used for memory limit of the models cache.
+        None - size is unknown, such model is limited only by count of cached models.
+        """
+        return None
+
+    def get_model(self, args: Optional[Dict] = None) -> Any:
+        """
+        Warning: This method should not be overridden.
+
+        Returns model loaded by `load_model`. The model is cached in the process if `model_cache_key` is set
+        (it is done for predictions), otherwise the model is loaded on every call.
+        """
+        model_cache_key = getattr(self, 'model_cache_key', None)
+        if model_cache_key is None:
+            return self.load_model(args)
+        return models_cache.get(model_cache_key, lambda: self.load_model(args), get_size=self.get_model_size)
+
     def close(self):
         pass
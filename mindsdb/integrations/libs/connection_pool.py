@@ -0,0 +1,388 @@
+"""
+Pool of connections of data handlers.
+
+Handlers, which are not thread safe, are cached per thread (see HandlersCache) and keep own connection. In that case
+threads of partitions fetching, concurrent sessions and jobs open own connection to the same database and each of
+them pays for TCP/TLS handshake and authentication. Handler can use a pool of connections instead: the pool is shared
+by all handlers of the integration in the process, each operation takes a connection from the pool and returns it
+back, so the handler becomes thread safe. Pooling is disabled by default, see 'connection_pool' in the config.
+
+How to use it in the handler:
+
+    with pooled_connection(
+        key=(self.name, ctx.company_id, json.dumps(config, sort_keys=True)),
+        connect=lambda: psycopg.connect(**config),
+        ...
+    ) as connection:
+        ...
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from mindsdb.metrics import metrics
+from mindsdb.utilities import log
+from mindsdb.utilities.config import config
+
+logger = log.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PoolClosed(Exception):
+    pass
+
+
+@dataclass
+class _PooledConnection:
+    connection: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections
+
+    Connections are taken from the pool in LIFO order, so rarely used connections stay idle and are closed after
+    max_idle seconds. A connection which was idle more than check_interval seconds is checked before use.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        close: Optional[Callable[[Any], None]] = None,
+        check: Optional[Callable[[Any], None]] = None,
+        reset: Optional[Callable[[Any], None]] = None,
+        min_size: int = 0,
+        max_size: int = 10,
+        max_lifetime: float = 3600,
+        max_idle: float = 300,
+        timeout: float = 30,
+        check_interval: float = 30,
+        name: str = 'pool'
+    ):
+        """
+        Args:
+            connect (Callable): function to open new connection
+            close (Callable): function to close connection, by default connection.close() is called
+            check (Callable): function to check the connection is alive, has to raise exception if it is not
+            reset (Callable): function to clean the connection when it is returned to the pool (rollback opened
+                transaction, etc), has to raise exception if connection can't be reused
+            min_size (int): count of connections kept opened even if they are idle
+            max_size (int): max count of opened connections (used and idle)
+            max_lifetime (float): connection is closed after that time (seconds), when it is returned to the pool
+            max_idle (float): idle connection is closed after that time (seconds)
+            timeout (float): how long (seconds) to wait for free connection if pool reached max_size
+            check_interval (float): idle connection is checked before use if it was not used for this time (seconds)
+            name (str): name of pool, it is used in metrics
+        """
+        self._connect = connect
+        self._close = close or (lambda connection: connection.close())
+        self._check = check
+        self._reset = reset
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.name = name
+
+        self._idle = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.last_used_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        """Count of opened connections"""
+        return self._size
+
+    def _open(self) -> _PooledConnection:
+        try:
+            return _PooledConnection(self._connect())
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _discard(self, pooled: _PooledConnection):
+        # must be called without lock
+        try:
+            self._close(pooled.connection)
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        """Take connection from the pool, it has to be returned by putconn
+
+        Args:
+            timeout (float): how long to wait for free connection
+
+        Returns:
+            Any: connection
+        """
+        if timeout is None:
+            timeout = self.timeout
+        wait_start = time.monotonic()
+        deadline = wait_start + timeout
+        while True:
+            pooled = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolClosed(f'Connection pool {self.name} is closed')
+                    if len(self._idle) > 0:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"Can't get connection from pool {self.name} in {timeout} seconds, "
+                            f"all {self.max_size} connections are in use"
+                        )
+                    self._condition.wait(remaining)
+
+            now = time.monotonic()
+            if pooled is None:
+                pooled = self._open()
+                result = 'created'
+            else:
+                if now - pooled.created_at > self.max_lifetime:
+                    self._discard(pooled)
+                    continue
+                if self._check is not None and now - pooled.last_used_at > self.check_interval:
+                    try:
+                        self._check(pooled.connection)
+                    except Exception as e:
+                        logger.debug(f'Connection from pool {self.name} is broken: {e}')
+                        self._discard(pooled)
+                        continue
+                result = 'reused'
+            break
+
+        with self._condition:
+            self._in_use[id(pooled.connection)] = pooled
+            self.last_used_at = now
+        metrics.INTEGRATION_POOL_CHECKOUTS.labels(self.name, result).inc()
+        metrics.INTEGRATION_POOL_WAIT_TIME.labels(self.name).observe(now - wait_start)
+        return pooled.connection
+
+    def putconn(self, connection: Any, discard: bool = False):
+        """Return connection to the pool
+
+        Args:
+            connection (Any): connection taken by getconn
+            discard (bool): close connection instead of returning to the pool
+        """
+        with self._condition:
+            pooled = self._in_use.pop(id(connection))
+
+        if not discard and self._reset is not None:
+            try:
+                self._reset(connection)
+            except Exception as e:
+                logger.debug(f"Connection can't be returned to pool {self.name}: {e}")
+                discard = True
+
+        now = time.monotonic()
+        if discard or self._closed or now - pooled.created_at > self.max_lifetime:
+            self._discard(pooled)
+            return
+
+        pooled.last_used_at = now
+        with self._condition:
+            self._idle.append(pooled)
+            self.last_used_at = now
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Take connection from the pool for the duration of the context"""
+        connection = self.getconn(timeout)
+        try:
+            yield connection
+        finally:
+            self.putconn(connection)
+
+    def maintain(self):
+        """Close idle and expired connections, open connections up to min_size"""
+        now = time.monotonic()
+        to_close = []
+        with self._condition:
+            keep = deque()
+            # from the most recently used
+            while len(self._idle) > 0:
+                pooled = self._idle.pop()
+                if (
+                    now - pooled.created_at > self.max_lifetime
+                    or (now - pooled.last_used_at > self.max_idle and self._size - len(to_close) > self.min_size)
+                ):
+                    to_close.append(pooled)
+                else:
+                    keep.appendleft(pooled)
+            self._idle = keep
+            to_open = 0
+            if not self._closed:
+                to_open = max(self.min_size - (self._size - len(to_close)), 0)
+                self._size += to_open
+
+        for pooled in to_close:
+            self._discard(pooled)
+
+        for _ in range(to_open):
+            try:
+                pooled = self._open()
+            except Exception as e:
+                logger.warning(f"Can't open connection for pool {self.name}: {e}")
+                break
+            with self._condition:
+                self._idle.appendleft(pooled)
+                self._condition.notify()
+
+    def close_if_unused(self) -> bool:
+        """Close the pool if it has no connections
+
+        Returns:
+            bool: True if pool was closed
+        """
+        with self._condition:
+            if self._size > 0:
+                return False
+            self._closed = True
+            return True
+
+    def close(self):
+        """Close idle connections, used connections are closed when they are returned"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+
+class PoolsRegistry:
+    """Pools of the process by keys. Pools are maintained by the background thread and closed if they
+    were not used for max_idle time
+    """
+
+    def __init__(self, maintain_interval: float = 5):
+        self.maintain_interval = maintain_interval
+        self._pools: Dict[Hashable, ConnectionPool] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def get(self, key: Hashable, **kwargs) -> ConnectionPool:
+        """Get pool by key, create it if it doesn't exist
+
+        Args:
+            key (Hashable): key of the pool, it has to include everything what makes connections different
+            kwargs: arguments of ConnectionPool
+
+        Returns:
+            ConnectionPool
+        """
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = ConnectionPool(**kwargs)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._maintain, name='ConnectionPools.maintain', daemon=True)
+                self._thread.start()
+        return pool
+
+    def _maintain(self):
+        while True:
+            time.sleep(self.maintain_interval)
+            with self._lock:
+                pools = list(self._pools.items())
+            for key, pool in pools:
+                try:
+                    pool.maintain()
+                except Exception:
+                    logger.exception(f'Error in maintenance of pool {pool.name}:')
+                if pool.size == 0 and time.monotonic() - pool.last_used_at > pool.max_idle:
+                    with self._lock:
+                        if self._pools.get(key) is pool and pool.close_if_unused():
+                            del self._pools[key]
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+
+pools_registry = PoolsRegistry()
+
+
+def get_pool(key: Hashable, **kwargs) -> ConnectionPool:
+    """Get shared pool by key, size and timeouts of the pool are taken from the config if they are not set
+
+    Args:
+        key (Hashable): key of the pool
+        kwargs: arguments of ConnectionPool
+
+    Returns:
+        ConnectionPool
+    """
+    pool_config = config['connection_pool']
+    for name in ('min_size', 'max_size', 'max_lifetime', 'max_idle', 'timeout', 'check_interval'):
+        kwargs.setdefault(name, pool_config[name])
+    return pools_registry.get(key, **kwargs)
+
+
+def checkout(key: Hashable, **kwargs) -> Tuple[ConnectionPool, Any]:
+    """Take connection from the shared pool, it has to be returned by pool.putconn
+
+    Args:
+        key (Hashable): key of the pool
+        kwargs: arguments of ConnectionPool
+
+    Returns:
+        Tuple[ConnectionPool, Any]: pool and connection
+    """
+    while True:
+        pool = get_pool(key, **kwargs)
+        try:
+            return pool, pool.getconn()
+        except PoolClosed:
+            # pool was closed as unused right now, the new one will be created
+            continue
+
+
+@contextmanager
+def pooled_connection(key: Hashable, **kwargs):
+    """Take connection from the shared pool for the duration of the context
+
+    Args:
+        key (Hashable): key of the pool
+        kwargs: arguments of ConnectionPool
+    """
+    pool, connection = checkout(key, **kwargs)
+    try:
+        yield connection
+    finally:
+        pool.putconn(connection)
+
+
+def is_pool_enabled() -> bool:
+    return config['connection_pool']['enabled'] is True
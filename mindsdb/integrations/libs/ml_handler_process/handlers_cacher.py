@@ -13,7 +13,8 @@ class HandlersCache(UserDict):
                 self.data.items(),
                 key=lambda x: x[1]['last_usage_at']
             )
-            del self.data[sorted_elements[0][0]]
+            removed = self.data.pop(sorted_elements[0][0])
+            removed['handler'].close()
         self.data[key] = {
             'last_usage_at': time.time(),
             'handler': value
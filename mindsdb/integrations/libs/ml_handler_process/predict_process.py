@@ -6,11 +6,14 @@ import mindsdb.interfaces.storage.db as db
 from mindsdb.interfaces.storage.model_fs import ModelStorage, HandlerStorage
 from mindsdb.integrations.libs.ml_handler_process.handlers_cacher import handlers_cacher
 from mindsdb.utilities.functions import mark_process
+from mindsdb.utilities.dataframe_transport import SharedDataFrame, share_dataframe, read_dataframe
 
 
 @mark_process(name='learn')
 def predict_process(integration_id: int, predictor_record: db.Predictor, args: dict,
-                    module_path: str, ml_engine_name: str, dataframe: DataFrame) -> DataFrame:
+                    module_path: str, ml_engine_name: str,
+                    dataframe: DataFrame | SharedDataFrame) -> DataFrame | SharedDataFrame:
+    dataframe = read_dataframe(dataframe)
     module = importlib.import_module(module_path)
 
     if predictor_record.id not in handlers_cacher:
@@ -30,6 +33,9 @@ def predict_process(integration_id: int, predictor_record: db.Predictor, args: d
         args['dtype_dict'] = predictor_record.dtype_dict
         args['learn_args'] = predictor_record.learn_args
 
+    # loaded model is reused while the model is not updated, see BaseMLEngine.get_model
+    ml_handler.model_cache_key = (predictor_record.id, predictor_record.version, predictor_record.updated_at)
+
     predictions = ml_handler.predict(dataframe, args)
-    ml_handler.close()
-    return predictions
+    # handler is kept in handlers_cacher, it is closed when it is removed from the cache
+    return share_dataframe(predictions)
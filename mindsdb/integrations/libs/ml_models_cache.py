@@ -0,0 +1,124 @@
+"""
+Cache of loaded models in the ML process.
+
+Loading of the model (reading files from the storage, deserialization, building of pipelines) can take longer than
+prediction itself. Handlers which implement `BaseMLEngine.load_model` get loaded models through `BaseMLEngine.get_model`,
+the loaded model is kept in memory of the process and reused by next predictions of the same model.
+
+Models are cached by (model id, version, time of model update), so updated models are reloaded. The cache is limited
+by count of models and by memory. The least recently used models are evicted.
+
+Size of the model is reported by the handler (`BaseMLEngine.get_model_size`). It can't be measured reliably from
+outside: memory freed by evicted models stays in the allocator of the process and is reused by the next model, so
+growth of RSS during loading is often about zero. Models whose size is not reported count toward `max_count` only.
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+from mindsdb.utilities import log
+from mindsdb.utilities.config import config
+
+logger = log.getLogger(__name__)
+
+
+@dataclass
+class _CachedModel:
+    model: Any
+    size: int
+    last_usage_at: float = field(default_factory=time.time)
+
+
+class ModelsCache:
+    def __init__(self, max_count: int = 5, max_memory: int = None):
+        """
+        Args:
+            max_count (int): max count of models in the cache
+            max_memory (int): max summary size of models in bytes (as reported by handlers), None - no limit
+        """
+        self.max_count = max_count
+        self.max_memory = max_memory
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        # models are loaded one at a time, to not load the same model twice
+        self._load_lock = threading.Lock()
+
+    @property
+    def memory(self) -> int:
+        return sum(cached.size for cached in self._models.values())
+
+    def _get(self, key: Hashable):
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is None:
+                return None
+            self._models.move_to_end(key)
+            cached.last_usage_at = time.time()
+            return cached
+
+    def get(self, key: Hashable, load: Callable[[], Any],
+            get_size: Optional[Callable[[Any], Optional[int]]] = None) -> Any:
+        """Get model from the cache, load it if it is not cached
+
+        Args:
+            key (Hashable): key of the model
+            load (Callable): function to load the model
+            get_size (Callable): function which returns size of loaded model in bytes, or None if it is unknown
+
+        Returns:
+            Any: loaded model
+        """
+        cached = self._get(key)
+        if cached is not None:
+            return cached.model
+
+        with self._load_lock:
+            cached = self._get(key)
+            if cached is not None:
+                return cached.model
+
+            model = load()
+            size = None
+            if get_size is not None:
+                try:
+                    size = get_size(model)
+                except Exception as e:
+                    logger.warning(f"Can't get size of model {key}: {e}")
+            # model of unknown size is limited only by count
+            size = size or 0
+
+            with self._lock:
+                self._models[key] = _CachedModel(model, size)
+                evicted = self._evict(keep=key)
+            if evicted:
+                # free memory of evicted models before the next loading
+                gc.collect()
+        logger.debug(f'Model {key} is loaded to the cache, size: {size}')
+        return model
+
+    def _evict(self, keep: Hashable) -> bool:
+        # must be called with lock
+        evicted = False
+        while len(self._models) > 1:
+            if len(self._models) <= self.max_count and (self.max_memory is None or self.memory <= self.max_memory):
+                break
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            del self._models[key]
+            evicted = True
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+models_cache = ModelsCache(
+    max_count=config['ml_models_cache']['max_count'],
+    max_memory=config['ml_models_cache']['max_memory']
+)
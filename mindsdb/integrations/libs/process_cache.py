@@ -1,5 +1,6 @@
 import time
 import threading
+from collections import OrderedDict
 from typing import Optional, Callable
 from concurrent.futures import ProcessPoolExecutor, Future
 
@@ -9,6 +10,7 @@ import mindsdb.interfaces.storage.db as db
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.context import context as ctx
 from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
+from mindsdb.utilities.dataframe_transport import SharedDataFrame, share_dataframe, read_dataframe
 from mindsdb.integrations.libs.ml_handler_process import (
     learn_process,
     update_process,
@@ -38,6 +40,28 @@ def empty_callback(_task):
     return None
 
 
+def chain_future(task: Future, func: Callable) -> Future:
+    """ get future which result is result of the task, processed by the function
+
+        Args:
+            task (Future): source future
+            func (Callable): function to apply to the result of the task
+
+        Returns:
+            Future
+    """
+    future = Future()
+
+    def callback(_task):
+        try:
+            future.set_result(func(_task.result()))
+        except BaseException as e:
+            future.set_exception(e)
+
+    task.add_done_callback(callback)
+    return future
+
+
 class MLProcessException(Exception):
     """Wrapper for exception to safely send it back to the main process.
 
@@ -71,7 +95,9 @@ class WarmProcess:
         """
         self.pool = ProcessPoolExecutor(1, initializer=initializer, initargs=initargs)
         self.last_usage_at = time.time()
-        self._markers = set()
+        # models which are used in the process, the same count as the process keeps loaded (see ml_models_cache)
+        self._markers = OrderedDict()
+        self._max_markers = Config()['ml_models_cache']['max_count']
         # region bacause of ProcessPoolExecutor does not start new process
         # untill it get a task, we need manually run dummy task to force init.
         self.task = self.pool.submit(dummy_task)
@@ -118,7 +144,10 @@ class WarmProcess:
                 marker (tuple): identifier of model
         """
         if marker is not None:
-            self._markers.add(marker)
+            self._markers[marker] = True
+            self._markers.move_to_end(marker)
+            while len(self._markers) > self._max_markers:
+                self._markers.popitem(last=False)
 
     def has_marker(self, marker: tuple) -> bool:
         """ check if that process processed task for model
@@ -275,6 +304,8 @@ class ProcessCache:
             }
         elif task_type == ML_TASK_TYPE.PREDICT:
             func = predict_process
+            # dataframes are sent through shared memory instead of pickling
+            dataframe = share_dataframe(dataframe)
             kwargs = {
                 'predictor_record': payload['predictor_record'],
                 'ml_engine_name': payload['handler_meta']['engine'],
@@ -353,13 +384,13 @@ class ProcessCache:
                     except StopIteration:
                         pass
                 if warm_process is None:
-                    try:
-                        warm_process = next(
-                            p for p in self.cache[ml_engine_name]['processes']
-                            if p.ready()
-                        )
-                    except StopIteration:
-                        pass
+                    # prefer processes without loaded models, to keep models in other processes
+                    ready_processes = sorted(
+                        (p for p in self.cache[ml_engine_name]['processes'] if p.ready()),
+                        key=lambda p: p.is_marked()
+                    )
+                    if len(ready_processes) > 0:
+                        warm_process = ready_processes[0]
                 if warm_process is None:
                     warm_process = WarmProcess(init_ml_handler, (handler_module_path,))
                     self.cache[ml_engine_name]['processes'].append(warm_process)
@@ -367,6 +398,12 @@ class ProcessCache:
             task = warm_process.apply_async(warm_function, func, payload['context'], **kwargs)
             self.cache[ml_engine_name]['last_usage_at'] = time.time()
             warm_process.add_marker(model_marker)
+
+        if task_type == ML_TASK_TYPE.PREDICT:
+            if isinstance(dataframe, SharedDataFrame):
+                # file is removed by the process after reading, but the process could fail before it
+                task.add_done_callback(lambda _task: dataframe.delete())
+            task = chain_future(task, read_dataframe)
         return task
 
     def _clean(self) -> None:
@@ -76,6 +76,13 @@ class VectorStoreHandler(BaseHandler):
         },
     ]
 
+    # parameters of search (like size of candidates list of ANN index) which can be set in WHERE of select,
+    # they are passed to `select` in conditions and are not filters
+    SEARCH_PARAMS = {}
+
+    # count of rows in one select of existing ids by do_upsert, if handler doesn't have native upsert
+    UPSERT_BATCH_SIZE = 1000
+
     def validate_connection_parameters(self, name, **kwargs):
         """Create validation for input parameters."""
 
@@ -148,7 +155,7 @@ class VectorStoreHandler(BaseHandler):
 
     def _is_condition_allowed(self, condition: FilterCondition) -> bool:
         allowed_field_values = set([field.value for field in TableField])
-        if condition.column in allowed_field_values:
+        if condition.column in allowed_field_values or condition.column in self.SEARCH_PARAMS:
             return True
         else:
             # check if column is a metadata column
@@ -277,12 +284,14 @@ class VectorStoreHandler(BaseHandler):
 
         return self.do_upsert(table_name, df)
 
-    def do_upsert(self, table_name, df):
+    def do_upsert(self, table_name, df, batch_size: int = None):
         """Upsert data into table, handling document updates and deletions.
 
         Args:
             table_name (str): Name of the table
             df (pd.DataFrame): DataFrame containing the data to upsert
+            batch_size (int): count of rows to check and write at once if handler doesn't have native upsert,
+                UPSERT_BATCH_SIZE by default
 
         The function handles three cases:
         1. New documents: Insert them
@@ -294,24 +303,35 @@ class VectorStoreHandler(BaseHandler):
         def gen_hash(v):
             return hashlib.md5(str(v).encode()).hexdigest()
 
+        df = df.reset_index(drop=True)
         if id_col not in df.columns:
             # generate for all
-            df[id_col] = df[content_col].apply(gen_hash)
+            df[id_col] = [gen_hash(v) for v in df[content_col]]
         else:
             # generate for empty
-            for i in range(len(df)):
-                if pd.isna(df.loc[i, id_col]):
-                    df.loc[i, id_col] = gen_hash(df.loc[i, content_col])
+            empty = df[id_col].isna()
+            if empty.any():
+                df.loc[empty, id_col] = [gen_hash(v) for v in df.loc[empty, content_col]]
 
         # remove duplicated ids
         df = df.drop_duplicates([TableField.ID.value])
 
         # id is string TODO is it ok?
-        df[id_col] = df[id_col].apply(str)
+        df[id_col] = df[id_col].astype(str)
 
-        if hasattr(self, 'upsert'):
+        try:
             self.upsert(table_name, df)
             return
+        except NotImplementedError:
+            pass
+
+        if batch_size is None:
+            batch_size = self.UPSERT_BATCH_SIZE
+        for start in range(0, len(df), batch_size):
+            self._upsert_batch(table_name, df.iloc[start: start + batch_size])
+
+    def _upsert_batch(self, table_name: str, df: pd.DataFrame):
+        id_col = TableField.ID.value
 
         # find existing ids
         res = self.select(
@@ -335,7 +355,7 @@ class VectorStoreHandler(BaseHandler):
                 conditions = [FilterCondition(
                     column=id_col,
                     op=FilterOperator.IN,
-                    value=list(df[id_col])
+                    value=list(df_update[id_col])
                 )]
                 self.delete(table_name, conditions)
                 self.insert(table_name, df_update)
@@ -443,6 +463,18 @@ class VectorStoreHandler(BaseHandler):
         """
         raise NotImplementedError()
 
+    def create_index(self, table_name: str, params: dict = None) -> bool:
+        """Optional. Create index for search by embeddings
+
+        Args:
+            table_name (str): table name
+            params (dict): type and parameters of index, they depend on the vector database
+
+        Returns:
+            bool: True if index exists, False if creation of index is postponed
+        """
+        raise NotImplementedError()
+
     def drop_table(self, table_name: str, if_exists=True) -> HandlerResponse:
         """Drop table
 
@@ -485,6 +517,16 @@ class VectorStoreHandler(BaseHandler):
         """
         raise NotImplementedError()
 
+    def upsert(self, table_name: str, data: pd.DataFrame):
+        """Optional. Insert rows and update existing rows with the same id in one operation.
+        If it is not implemented, do_upsert checks existing ids and uses update and insert
+
+        Args:
+            table_name (str): table name
+            data (pd.DataFrame): data to upsert, ids are unique
+        """
+        raise NotImplementedError()
+
     def delete(
         self, table_name: str, conditions: List[FilterCondition] = None
     ) -> HandlerResponse:
@@ -1,22 +1,78 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import math
 import os
 import random
+import re
+import threading
+import time
 from abc import ABC
-from typing import Any, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from openai import AsyncOpenAI, AsyncAzureOpenAI
 from pydantic import field_validator
 from pydantic import BaseModel
 
 from mindsdb.integrations.utilities.rag.settings import DEFAULT_RERANKING_MODEL, DEFAULT_LLM_ENDPOINT
+from mindsdb.metrics import metrics
+from mindsdb.utilities.cache import str_checksum
+from mindsdb.utilities.config import config
 
 log = logging.getLogger(__name__)
 
 
+class ScoresCache:
+    """
+    Relevance scores of documents, shared by rerankers of the process.
+    Keys include model and method of scoring, the least recently used scores are evicted
+    """
+
+    def __init__(self, max_count: int = 10000):
+        """
+        Args:
+            max_count (int): max count of stored scores, 0 - cache is disabled
+        """
+        self.max_count = max_count
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[tuple]) -> Dict[tuple, float]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    found[key] = self._scores[key]
+        metrics.CACHE_REQUESTS.labels('reranker_scores', 'memory', 'hit').inc(len(found))
+        metrics.CACHE_REQUESTS.labels('reranker_scores', 'memory', 'miss').inc(len(keys) - len(found))
+        return found
+
+    def set_many(self, scores: Dict[tuple, float]):
+        if self.max_count <= 0 or len(scores) == 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._scores.update(scores)
+            for key in scores:
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_count:
+                self._scores.popitem(last=False)
+                evicted += 1
+        if evicted > 0:
+            metrics.CACHE_EVICTIONS.labels('reranker_scores', 'memory').inc(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+
+
+scores_cache = ScoresCache(max_count=config['reranker_scores_cache']['max_count'])
+
+
 class BaseLLMReranker(BaseModel, ABC):
 
     filtering_threshold: float = 0.0  # Default threshold for filtering
@@ -37,6 +93,7 @@ class BaseLLMReranker(BaseModel, ABC):
     request_timeout: float = 20.0  # Timeout for API requests
     early_stop: bool = True  # Whether to enable early stopping
     early_stop_threshold: float = 0.8  # Confidence threshold for early stopping
+    documents_per_request: int = 1  # Score several documents in one request with listwise prompt if > 1
 
     class Config:
         arbitrary_types_allowed = True
@@ -76,13 +133,20 @@ class BaseLLMReranker(BaseModel, ABC):
                 base_url = self.base_url or DEFAULT_LLM_ENDPOINT
                 self.client = AsyncOpenAI(api_key=openai_api_key, base_url=base_url, timeout=self.request_timeout, max_retries=2)
 
+    async def _create_completion(self, **kwargs) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return await self.client.chat.completions.create(**kwargs)
+        finally:
+            metrics.RERANKER_TIME.labels('request').observe(time.perf_counter() - started_at)
+
     async def search_relevancy(self, query: str, document: str, rerank_callback=None) -> Any:
         await self._init_client()
 
         async with self._semaphore:
             for attempt in range(self.max_retries):
                 try:
-                    response = await self.client.chat.completions.create(
+                    response = await self._create_completion(
                         model=self.model,
                         messages=[
                             {"role": "system", "content": "Rate the relevance of the document to the query. Respond with 'yes' or 'no'."},
@@ -117,68 +181,13 @@ class BaseLLMReranker(BaseModel, ABC):
                     retry_delay = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.1)
                     await asyncio.sleep(retry_delay)
 
-    async def _rank(self, query_document_pairs: List[Tuple[str, str]], rerank_callback=None) -> List[Tuple[str, float]]:
-        ranked_results = []
-
-        # Process in larger batches for better throughput
-        batch_size = min(self.max_concurrent_requests * 2, len(query_document_pairs))
-        for i in range(0, len(query_document_pairs), batch_size):
-            batch = query_document_pairs[i:i + batch_size]
-            try:
-                results = await asyncio.gather(
-                    *[self.search_relevancy(query=query, document=document, rerank_callback=rerank_callback) for (query, document) in batch],
-                    return_exceptions=True
-                )
-
-                for idx, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        log.error(f"Error processing document {i+idx}: {str(result)}")
-                        ranked_results.append((batch[idx][1], 0.0))
-                        continue
-
-                    answer = result["answer"]
-                    logprob = result["logprob"]
-                    prob = math.exp(logprob)
-
-                    # Convert answer to score using the model's confidence
-                    if answer.lower().strip() == "yes":
-                        score = prob  # If yes, use the model's confidence
-                    elif answer.lower().strip() == "no":
-                        score = 1 - prob  # If no, invert the confidence
-                    else:
-                        score = 0.5 * prob  # For unclear answers, reduce confidence
-
-                    ranked_results.append((batch[idx][1], score))
-
-                    # Check if we should stop early
-                    try:
-                        high_scoring_docs = [r for r in ranked_results if r[1] >= self.filtering_threshold]
-                        can_stop_early = (
-                            self.early_stop  # Early stopping is enabled
-                            and self.num_docs_to_keep  # We have a target number of docs
-                            and len(high_scoring_docs) >= self.num_docs_to_keep  # Found enough good docs
-                            and score >= self.early_stop_threshold  # Current doc is good enough
-                        )
-
-                        if can_stop_early:
-                            log.info(f"Early stopping after finding {self.num_docs_to_keep} documents with high confidence")
-                            return ranked_results
-                    except Exception as e:
-                        # Don't let early stopping errors stop the whole process
-                        log.warning(f"Error in early stopping check: {str(e)}")
-
-            except Exception as e:
-                log.error(f"Batch processing error: {str(e)}")
-                continue
-        return ranked_results
-
     async def search_relevancy_score(self, query: str, document: str) -> Any:
         await self._init_client()
 
         async with self._semaphore:
             for attempt in range(self.max_retries):
                 try:
-                    response = await self.client.chat.completions.create(
+                    response = await self._create_completion(
                         model=self.model,
                         messages=[
                             {"role": "system", "content": """
@@ -290,60 +299,196 @@ class BaseLLMReranker(BaseModel, ABC):
                     retry_delay = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.1)
                     await asyncio.sleep(retry_delay)
 
+    async def search_relevancy_list(self, query: str, documents: List[str]) -> List[float]:
+        """
+        Scores several documents in one request (listwise prompt)
+
+        Returns:
+            List[float]: relevance scores from 0 to 1 in order of documents
+        """
+        await self._init_client()
+
+        numbered_documents = '\n\n'.join(
+            f'Document {i}: {document}'
+            for i, document in enumerate(documents, 1)
+        )
+        async with self._semaphore:
+            for attempt in range(self.max_retries):
+                try:
+                    response = await self._create_completion(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": (
+                                "You evaluate how relevant each of the given document chunks is to a user's search query. "
+                                "Rate every document with an integer score from 0 (not relevant) to 100 (highly relevant). "
+                                f"Respond with only a JSON array of {len(documents)} integers, one per document, "
+                                "in the order of the documents."
+                            )},
+                            {"role": "user", "content": f"Search query: {query}\n\n{numbered_documents}"}
+                        ],
+                        temperature=self.temperature,
+                        n=1,
+                        max_tokens=5 * len(documents) + 10
+                    )
+                    return self._parse_list_scores(response.choices[0].message.content, len(documents))
+
+                except Exception as e:
+                    if attempt == self.max_retries - 1:
+                        log.error(f"Failed after {self.max_retries} attempts: {str(e)}")
+                        raise
+                    # Exponential backoff with jitter
+                    retry_delay = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.1)
+                    await asyncio.sleep(retry_delay)
+
+    @staticmethod
+    def _parse_list_scores(content: str, count: int) -> List[float]:
+        match = re.search(r'\[[^\[\]]*\]', content or '')
+        if match is None:
+            raise ValueError(f"Can't find list of scores in the response: {content}")
+        scores = json.loads(match.group(0))
+        if len(scores) != count:
+            raise ValueError(f"Response has {len(scores)} scores, expected {count}: {content}")
+        return [min(max(float(score) / 100, 0.0), 1.0) for score in scores]
+
+    @staticmethod
+    def _answer_to_score(result: dict) -> float:
+        # score of binary method
+        prob = math.exp(result["logprob"])
+
+        # Convert answer to score using the model's confidence
+        answer = result["answer"].lower().strip()
+        if answer == "yes":
+            return prob  # If yes, use the model's confidence
+        elif answer == "no":
+            return 1 - prob  # If no, invert the confidence
+        return 0.5 * prob  # For unclear answers, reduce confidence
+
+    async def _score_units(
+        self, query_document_pairs: List[Tuple[str, str]], method: str, rerank_callback=None
+    ) -> Dict[int, float]:
+        """
+        Scores documents by method ('multi-class' or 'binary'): one request per document or,
+        if documents_per_request > 1, one request per group of documents of the same query (listwise prompt). Requests are sent by sliding window: a new request is started as soon as one
+        of max_concurrent_requests running requests is finished.
+
+        Returns:
+            Dict[int, float]: scores by index of the pair, failed pairs have score 0.0. If early stop is triggered,
+                not scored pairs are absent
+        """
+        scores = {}
+
+        # scores of the same query and document by the same model are reused
+        cache_keys = [self._cache_key(method, query, document) for query, document in query_document_pairs]
+        cached = scores_cache.get_many(cache_keys)
+        indexes = []
+        for i, key in enumerate(cache_keys):
+            if key in cached:
+                scores[i] = cached[key]
+            else:
+                indexes.append(i)
+
+        # groups of indexes of pairs, which are scored by one request
+        units = []
+        for i in indexes:
+            query = query_document_pairs[i][0]
+            if (
+                len(units) > 0
+                and len(units[-1]) < self.documents_per_request
+                and query_document_pairs[units[-1][0]][0] == query
+            ):
+                units[-1].append(i)
+            else:
+                units.append([i])
+
+        async def score_unit(unit: List[int]) -> List[float]:
+            if self.documents_per_request > 1:
+                query = query_document_pairs[unit[0]][0]
+                documents = [query_document_pairs[i][1] for i in unit]
+                unit_scores = await self.search_relevancy_list(query, documents)
+                # stream reranking update for each document, as it is done by search_relevancy
+                if rerank_callback is not None:
+                    for document, score in zip(documents, unit_scores):
+                        rerank_callback({"document": document, "relevance_score": score})
+                return unit_scores
+
+            query, document = query_document_pairs[unit[0]]
+            if method == "multi-class":
+                result = await self.search_relevancy_score(query=query, document=document)
+                return [min(max(result["relevance_score"], 0.0), 1.0)]
+            result = await self.search_relevancy(query=query, document=document, rerank_callback=rerank_callback)
+            return [self._answer_to_score(result)]
+
+        units_iter = iter(units)
+        running = {}
+
+        def refill():
+            while len(running) < self.max_concurrent_requests:
+                unit = next(units_iter, None)
+                if unit is None:
+                    break
+                running[asyncio.ensure_future(score_unit(unit))] = unit
+
+        refill()
+        while running:
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            new_scores = {}
+            for task in done:
+                unit = running.pop(task)
+                try:
+                    unit_scores = task.result()
+                except Exception as e:
+                    log.error(f"Error processing documents {unit}: {str(e)}")
+                    for i in unit:
+                        scores[i] = 0.0
+                    continue
+                for i, score in zip(unit, unit_scores):
+                    scores[i] = score
+                    new_scores[cache_keys[i]] = score
+            scores_cache.set_many(new_scores)
+
+            if self._can_stop_early(scores, new_scores.values()):
+                log.info(f"Early stopping after finding {self.num_docs_to_keep} documents with high confidence")
+                for task in running:
+                    task.cancel()
+                break
+            refill()
+
+        return scores
+
+    def _can_stop_early(self, scores: Dict[int, float], new_scores) -> bool:
+        if not self.early_stop or not self.num_docs_to_keep:
+            return False
+        high_scoring_docs = [score for score in scores.values() if score >= self.filtering_threshold]
+        return (
+            len(high_scoring_docs) >= self.num_docs_to_keep  # Found enough good docs
+            and any(score >= self.early_stop_threshold for score in new_scores)  # Current doc is good enough
+        )
+
+    def _cache_key(self, method: str, query: str, document: str) -> tuple:
+        if self.documents_per_request > 1:
+            method = 'list'
+        return (
+            self.provider, self.base_url, self.model, method,
+            str_checksum(query), str_checksum(document)
+        )
+
+    async def _rank_by_method(
+        self, query_document_pairs: List[Tuple[str, str]], method: str, rerank_callback=None
+    ) -> List[Tuple[str, float]]:
+        started_at = time.perf_counter()
+        scores = await self._score_units(query_document_pairs, method, rerank_callback=rerank_callback)
+        metrics.RERANKER_TIME.labels('rerank').observe(time.perf_counter() - started_at)
+        return [(query_document_pairs[i][1], score) for i, score in sorted(scores.items())]
+
+    async def _rank(self, query_document_pairs: List[Tuple[str, str]], rerank_callback=None) -> List[Tuple[str, float]]:
+        return await self._rank_by_method(query_document_pairs, 'binary', rerank_callback=rerank_callback)
+
     async def _rank_score(self, query_document_pairs: List[Tuple[str, str]]) -> List[Tuple[str, float]]:
-        ranked_results = []
-
-        # Process in larger batches for better throughput
-        batch_size = min(self.max_concurrent_requests * 2, len(query_document_pairs))
-        for i in range(0, len(query_document_pairs), batch_size):
-            batch = query_document_pairs[i:i + batch_size]
-            try:
-                results = await asyncio.gather(
-                    *[self.search_relevancy_score(query=query, document=document) for (query, document) in batch],
-                    return_exceptions=True
-                )
-
-                for idx, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        log.error(f"Error processing document {i+idx}: {str(result)}")
-                        ranked_results.append((batch[idx][1], 0.0))
-                        continue
-
-                    score = result["relevance_score"]
-                    if score is not None:
-                        if score > 1.0:
-                            score = 1.0
-                        elif score < 0.0:
-                            score = 0.0
-
-                    ranked_results.append((batch[idx][1], score))
-                    # Check if we should stop early
-                    try:
-                        high_scoring_docs = [r for r in ranked_results if r[1] >= self.filtering_threshold]
-                        can_stop_early = (
-                            self.early_stop  # Early stopping is enabled
-                            and self.num_docs_to_keep  # We have a target number of docs
-                            and len(high_scoring_docs) >= self.num_docs_to_keep  # Found enough good docs
-                            and score >= self.early_stop_threshold  # Current doc is good enough
-                        )
-
-                        if can_stop_early:
-                            log.info(f"Early stopping after finding {self.num_docs_to_keep} documents with high confidence")
-                            return ranked_results
-                    except Exception as e:
-                        # Don't let early stopping errors stop the whole process
-                        log.warning(f"Error in early stopping check: {str(e)}")
-
-            except Exception as e:
-                log.error(f"Batch processing error: {str(e)}")
-                continue
-
-        return ranked_results
+        return await self._rank_by_method(query_document_pairs, 'multi-class')
 
     def get_scores(self, query: str, documents: list[str]):
         query_document_pairs = [(query, doc) for doc in documents]
         # Create event loop and run async code
-        import asyncio
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
@@ -351,10 +496,9 @@ class BaseLLMReranker(BaseModel, ABC):
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        if self.method == "multi-class":  # default 'multi-class' method
-            documents_and_scores = loop.run_until_complete(self._rank_score(query_document_pairs))
-        else:
-            documents_and_scores = loop.run_until_complete(self._rank(query_document_pairs))
+        started_at = time.perf_counter()
+        scores = loop.run_until_complete(self._score_units(query_document_pairs, self.method))
+        metrics.RERANKER_TIME.labels('rerank').observe(time.perf_counter() - started_at)
 
-        scores = [score for _, score in documents_and_scores]
-        return scores
+        # documents which are not scored because of early stop get 0
+        return [scores.get(i, 0.0) for i in range(len(documents))]
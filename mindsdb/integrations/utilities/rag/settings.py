@@ -728,6 +728,7 @@ class RerankerConfig(BaseModel):
     retry_delay: float = 1.0
     early_stop: bool = True  # Whether to enable early stopping
     early_stop_threshold: float = 0.8  # Confidence threshold for early stopping
+    documents_per_request: int = 1  # Score several documents in one request if > 1
 
 
 class MultiHopRetrieverConfig(BaseModel):
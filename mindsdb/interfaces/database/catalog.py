@@ -0,0 +1,224 @@
+"""
+In-process cache of the catalog: projects, integrations and objects of projects (models, views, knowledge bases,
+agents).
+
+Datanodes and the planner look up the catalog several times per query, the cache allows doing it without queries to
+the metadata database. The cache is versioned: any change of the catalog increases its version in the metadata
+database (see db.CatalogVersion), so all API processes see changes consistently. The version is read once per query
+(see query_scope) and the cache of the company is rebuilt if the version is changed.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import sqlalchemy as sa
+
+from mindsdb.interfaces.storage import db
+from mindsdb.utilities.config import config
+from mindsdb.utilities.context import context as ctx
+
+# version of the catalog read in the current query
+_query_version: ContextVar[Optional[dict]] = ContextVar('catalog_query_version', default=None)
+
+_catalogs: Dict[int, 'Catalog'] = {}
+
+
+def _get_company_id() -> int:
+    return ctx.company_id or 0
+
+
+def _has_uncommitted_changes() -> bool:
+    # changes of the catalog, made in the current transaction, are not visible to other processes yet
+    return db.session.info.get('catalog_changed', False)
+
+
+@contextmanager
+def query_scope():
+    """Within the scope the version of the catalog is read from the metadata database only once.
+    Nested scopes use the version of the outer one.
+    """
+    if _query_version.get() is not None:
+        yield
+        return
+    token = _query_version.set({})
+    try:
+        yield
+    finally:
+        _query_version.reset(token)
+
+
+def get_catalog_version() -> int:
+    """Version of the catalog of the company. Any change of the catalog increases the version, it is used to
+    invalidate caches of objects built on top of the catalog (like query plans).
+
+    Returns:
+        int: version
+    """
+    company_id = _get_company_id()
+    scope = _query_version.get()
+    if (
+        scope is not None
+        and scope.get('company_id') == company_id
+        and scope.get('local_changes') == db.local_catalog_changes
+        and not _has_uncommitted_changes()
+    ):
+        return scope['version']
+
+    local_changes = db.local_catalog_changes
+    version = db.session.query(db.CatalogVersion.version).filter_by(company_id=company_id).scalar() or 0
+    if scope is not None:
+        scope.update(company_id=company_id, version=version, local_changes=local_changes)
+    return version
+
+
+class Catalog:
+    """Snapshot of the catalog of the company for the specific version"""
+
+    def __init__(self, version: int):
+        from mindsdb.interfaces.database.integrations import integration_controller
+
+        self.version = version
+        company_id = _get_company_id()
+
+        self.projects = OrderedDict()
+        records = db.session.query(db.Project.id, db.Project.name, db.Project.metadata_).filter(
+            (db.Project.company_id == company_id) & (db.Project.deleted_at == sa.null())
+        ).order_by(db.Project.name)
+        for project_id, name, metadata in records:
+            self.projects[name.lower()] = {'id': project_id, 'name': name, 'metadata': metadata}
+
+        self.integrations = OrderedDict()
+        records = db.session.query(db.Integration.id, db.Integration.name, db.Integration.engine).filter(
+            (db.Integration.company_id == ctx.company_id) & (db.Integration.data != sa.null())
+        )
+        for integration_id, name, engine in records:
+            handler_meta = integration_controller.get_handler_metadata(engine) or {}
+            self.integrations[name.lower()] = {
+                'id': integration_id,
+                'name': name,
+                'engine': engine,
+                'type': handler_meta.get('type'),
+                'class_type': handler_meta.get('class_type'),
+                'permanent': handler_meta.get('permanent', False)
+            }
+
+        self._project_objects = {}
+
+    def get_databases(self) -> List[dict]:
+        """List of databases in the same format as DatabaseController.get_list, without connection data"""
+        result = [{
+            'name': name,
+            'type': 'system',
+            'id': None,
+            'engine': None,
+            'visible': True,
+            'deletable': False
+        } for name in ('information_schema', 'log')]
+        for project in self.projects.values():
+            result.append({
+                'name': project['name'],
+                'type': 'project',
+                'id': project['id'],
+                'engine': None,
+                'visible': True,
+                'deletable': project['name'].lower() != config.get('default_project')
+            })
+        for integration in self.integrations.values():
+            if integration['type'] == 'ml':
+                continue
+            result.append({
+                'name': integration['name'],
+                'type': integration['type'] or 'data',
+                'id': integration['id'],
+                'engine': integration['engine'],
+                'class_type': integration['class_type'],
+                'visible': True,
+                'deletable': integration['permanent'] is False
+            })
+        return result
+
+    def get_project(self, name: str):
+        """Get project by name (case insensitive)
+
+        Returns:
+            Optional[Project]: project, it can't be used to modify the project
+        """
+        from mindsdb.interfaces.database.projects import Project
+
+        project = self.projects.get(name.lower())
+        if project is None:
+            return None
+        record = db.Project(
+            id=project['id'],
+            name=project['name'],
+            company_id=_get_company_id(),
+            metadata_=project['metadata']
+        )
+        return Project.from_record(record)
+
+    def get_integration(self, name: str) -> Optional[dict]:
+        """Get integration by name (case insensitive)
+
+        Returns:
+            Optional[dict]: id, name, engine and type of integration
+        """
+        return self.integrations.get(name.lower())
+
+    def get_project_objects(self, project_id: int) -> Dict[str, str]:
+        """Names of objects of project: models, views, knowledge bases and agents
+
+        Returns:
+            Dict[str, str]: type of object by its lower name
+        """
+        objects = self._project_objects.get(project_id)
+        if objects is not None:
+            return objects
+
+        company_id = _get_company_id()
+        objects = {}
+        records = db.session.query(db.Predictor.name).filter(
+            (db.Predictor.company_id == ctx.company_id)
+            & (db.Predictor.project_id == project_id)
+            & (db.Predictor.deleted_at == sa.null())
+            & (db.Predictor.active.is_(True))
+        )
+        for name, in records:
+            objects[name.lower()] = 'model'
+        records = db.session.query(db.Agents.name).filter(
+            (db.Agents.company_id == ctx.company_id)
+            & (db.Agents.project_id == project_id)
+            & (db.Agents.deleted_at == sa.null())
+        )
+        for name, in records:
+            objects[name.lower()] = 'agent'
+        records = db.session.query(db.KnowledgeBase.name).filter_by(project_id=project_id)
+        for name, in records:
+            objects[name.lower()] = 'knowledge_base'
+        # views have priority over other objects with the same name
+        records = db.session.query(db.View.name).filter_by(company_id=ctx.company_id, project_id=project_id)
+        for name, in records:
+            objects[name.lower()] = 'view'
+
+        if not _has_uncommitted_changes() and _catalogs.get(company_id) is self:
+            self._project_objects[project_id] = objects
+        return objects
+
+
+def get_catalog() -> Catalog:
+    """Get catalog of the company, it is rebuilt if the catalog is changed
+
+    Returns:
+        Catalog: snapshot of the catalog, it must not be modified
+    """
+    company_id = _get_company_id()
+    version = get_catalog_version()
+    catalog = _catalogs.get(company_id)
+    if catalog is not None and catalog.version == version and not _has_uncommitted_changes():
+        return catalog
+
+    catalog = Catalog(version)
+    if not _has_uncommitted_changes():
+        _catalogs[company_id] = catalog
+    return catalog
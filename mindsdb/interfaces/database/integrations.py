@@ -122,13 +122,14 @@ class HandlersCache:
                 name (str): handler name
         """
         with self._lock:
-            key = (name, ctx.company_id, threading.get_native_id())
-            if key in self.handlers:
-                try:
-                    self.handlers[key].disconnect()
-                except Exception:
-                    pass
-                del self.handlers[key]
+            # handler of the current thread and thread safe handler
+            for key in ((name, ctx.company_id, threading.get_native_id()), (name, ctx.company_id, 0)):
+                if key in self.handlers:
+                    try:
+                        self.handlers[key]['handler'].disconnect()
+                    except Exception:
+                        pass
+                    del self.handlers[key]
             if len(self.handlers) == 0:
                 self._stop_clean()
 
@@ -231,6 +231,7 @@ class DuckDBFunctions:
         ]
 
         self.functions[name] = {
+            'source': meta['callback'],
             'callback': function_maker(len(input_types), meta['callback']),
             'input': input_types,
             'output': python_to_duckdb_type(meta['output_type'])
@@ -1,5 +1,7 @@
 import os
 import copy
+import json
+import time
 from typing import Dict, List, Optional
 
 import pandas as pd
@@ -35,11 +37,22 @@ from mindsdb.interfaces.database.projects import ProjectController
 from mindsdb.interfaces.variables.variables_controller import variables_controller
 from mindsdb.interfaces.knowledge_base.preprocessing.models import PreprocessingConfig, Document
 from mindsdb.interfaces.knowledge_base.preprocessing.document_preprocessor import PreprocessorFactory
+from mindsdb.interfaces.knowledge_base.embeddings_cache import (
+    EmbeddingsCache,
+    content_hash,
+    embed_with_cache,
+    drop_cache as drop_embeddings_cache
+)
+from mindsdb.interfaces.knowledge_base.query_embeddings_cache import query_embeddings_cache
 from mindsdb.interfaces.model.functions import PredictorRecordNotFound
 from mindsdb.utilities.exception import EntityExistsError, EntityNotExistsError
 from mindsdb.integrations.utilities.sql_utils import FilterCondition, FilterOperator
 from mindsdb.utilities.config import config
+from mindsdb.utilities.cache import json_checksum, str_checksum
+from mindsdb.utilities.json_encoder import CustomJSONEncoder
 from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.context_executor import parallel_map
+from mindsdb.metrics import metrics
 
 from mindsdb.api.executor.command_executor import ExecuteCommands
 from mindsdb.api.executor.utilities.sql import query_df
@@ -107,12 +120,22 @@ def get_reranking_model_from_params(reranking_model_params: dict):
     return BaseLLMReranker(**params_copy)
 
 
+def _count_insert_stage(stage: str, count: int, started_at: float):
+    metrics.KNOWLEDGE_BASE_INSERT_ROWS.labels(stage).inc(count)
+    metrics.KNOWLEDGE_BASE_INSERT_TIME.labels(stage).inc(time.time() - started_at)
+
+
 class KnowledgeBaseTable:
     """
     Knowledge base table interface
     Handlers requests to KB table and modifies data in linked vector db table
     """
 
+    # count of input rows in batch of insert
+    INSERT_BATCH_SIZE = 1000
+    # count of concurrent requests to embedding model during insert
+    INSERT_THREADS = 4
+
     def __init__(self, kb: db.KnowledgeBase, session):
         self._kb = kb
         self._vector_db = None
@@ -201,6 +224,17 @@ class KnowledgeBaseTable:
 
         # Set default limit if query is present
         if query_text is not None:
+            # default parameters of search in index
+            vector_index = self._kb.params.get('vector_index') or {}
+            used_params = {item.column for item in conditions}
+            for name in db_handler.SEARCH_PARAMS:
+                if name in vector_index and name not in used_params:
+                    conditions.append(FilterCondition(
+                        column=name,
+                        value=vector_index[name],
+                        op=FilterOperator.EQUAL,
+                    ))
+
             limit = query.limit.value if query.limit is not None else None
             if limit is None:
                 limit = 10
@@ -449,9 +483,18 @@ class KnowledgeBaseTable:
     def insert(self, df: pd.DataFrame, params: dict = None):
         """Insert dataframe to KB table.
 
+        Rows are processed in batches by pipeline:
+         - rows of batch are converted to documents and split into chunks, unchanged chunks are skipped
+         - embeddings are computed for several batches concurrently
+         - batches with embeddings are written to vector db in order of input
+        Count of batches in processing is limited, memory usage doesn't depend on size of input.
+
         Args:
             df: DataFrame to insert
-            params: User parameters of insert
+            params: User parameters of insert:
+              - kb_no_upsert: insert without checking existing records
+              - kb_batch_size: count of input rows in batch, default 1000
+              - kb_threads: count of concurrent requests to embedding model, default 4
         """
         if df.empty:
             return
@@ -468,16 +511,82 @@ class KnowledgeBaseTable:
 
         # First adapt column names to identify content and metadata columns
         adapted_df = self._adapt_column_names(df)
+
+        params = params or {}
+        no_upsert = params.get('kb_no_upsert', False)
+        batch_size = max(int(params.get('kb_batch_size', self.INSERT_BATCH_SIZE)), 1)
+        threads = max(int(params.get('kb_threads', self.INSERT_THREADS)), 1)
+
+        db_handler = self.get_vector_db()
+        chunks_count = 0
+
+        def prepare_batches():
+            nonlocal chunks_count
+            for start in range(0, len(adapted_df), batch_size):
+                df_rows = adapted_df.iloc[start: start + batch_size]
+                started_at = time.time()
+                df_chunks = self._rows_to_chunks(df_rows)
+                _count_insert_stage('chunk', len(df_rows), started_at)
+                chunks_count += len(df_chunks)
+
+                if not no_upsert and not df_chunks.empty:
+                    # unchanged chunks are not embedded and not written again
+                    started_at = time.time()
+                    checked_count = len(df_chunks)
+                    df_chunks = self._remove_unchanged_chunks(df_chunks)
+                    _count_insert_stage('compare', checked_count, started_at)
+
+                if not df_chunks.empty:
+                    yield df_chunks
+
+        def add_embeddings(df_chunks: pd.DataFrame) -> pd.DataFrame:
+            try:
+                started_at = time.time()
+                df_chunks[TableField.EMBEDDINGS.value] = self._chunks_to_embeddings(df_chunks)
+                _count_insert_stage('embed', len(df_chunks), started_at)
+                return df_chunks
+            finally:
+                # the worker thread is reused: release its db session
+                db.session.remove()
+
+        written_count = 0
+        for df_chunks in parallel_map(add_embeddings, prepare_batches(), thread_count=threads):
+            started_at = time.time()
+            if no_upsert:
+                # speed up inserting by disable checking existing records
+                db_handler.insert(self._kb.vector_database_table, df_chunks)
+            else:
+                db_handler.do_upsert(self._kb.vector_database_table, df_chunks)
+            _count_insert_stage('write', len(df_chunks), started_at)
+            written_count += len(df_chunks)
+
+        if chunks_count == 0:
+            logger.warning("No valid content found in any content columns")
+
+        vector_index = self._kb.params.get('vector_index')
+        if written_count > 0 and vector_index is not None:
+            # index which was postponed until data is inserted
+            db_handler.create_index(self._kb.vector_database_table, vector_index)
+
+    def _rows_to_chunks(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts rows to documents, creating separate documents for each content column,
+        and splits them into chunks
+        :param df: rows with adapted columns
+        :return: dataframe with content, id and metadata of chunks
+        """
         content_columns = self._kb.params.get('content_columns', [TableField.CONTENT.value])
+        content_columns = [col for col in content_columns if col in df.columns]
+        has_metadata = TableField.METADATA.value in df.columns
+        has_id = TableField.ID.value in df.columns
 
-        # Convert DataFrame rows to documents, creating separate documents for each content column
         raw_documents = []
-        for idx, row in adapted_df.iterrows():
-            base_metadata = self._parse_metadata(row.get(TableField.METADATA.value, {}))
-            provided_id = row.get(TableField.ID.value)
+        for idx, row in zip(df.index, df.to_dict('records')):
+            base_metadata = self._parse_metadata(row[TableField.METADATA.value]) if has_metadata else {}
+            provided_id = row[TableField.ID.value] if has_id else None
 
             for col in content_columns:
-                content = row.get(col)
+                content = row[col]
                 if content and str(content).strip():
                     content_str = str(content)
 
@@ -503,26 +612,67 @@ class KnowledgeBaseTable:
             processed_chunks = raw_documents  # Use raw documents if no preprocessing
 
         # Convert processed chunks back to DataFrame with standard structure
-        df = pd.DataFrame([{
+        return pd.DataFrame([{
             TableField.CONTENT.value: chunk.content,
             TableField.ID.value: chunk.id,
             TableField.METADATA.value: chunk.metadata
         } for chunk in processed_chunks])
 
-        if df.empty:
-            logger.warning("No valid content found in any content columns")
-            return
+    def _remove_unchanged_chunks(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Removes chunks which are already stored in vector db with the same content and metadata
+        :param df: chunks with id, content and metadata
+        :return: new and changed chunks
+        """
+        id_col = TableField.ID.value
+        content_col = TableField.CONTENT.value
+        metadata_col = TableField.METADATA.value
 
-        # add embeddings and send to vector db
-        df_emb = self._df_to_embeddings(df)
-        df = pd.concat([df, df_emb], axis=1)
         db_handler = self.get_vector_db()
+        try:
+            existing = db_handler.select(
+                self._kb.vector_database_table,
+                columns=[id_col, content_col, metadata_col],
+                conditions=[
+                    FilterCondition(column=id_col, op=FilterOperator.IN, value=list(df[id_col].astype(str)))
+                ]
+            )
+        except Exception as e:
+            logger.warning(f"Can't get existing chunks from vector db: {e}")
+            return df
 
-        if params is not None and params.get('kb_no_upsert', False):
-            # speed up inserting by disable checking existing records
-            db_handler.insert(self._kb.vector_database_table, df)
-        else:
-            db_handler.do_upsert(self._kb.vector_database_table, df)
+        if existing is None or existing.empty or not {id_col, content_col, metadata_col}.issubset(existing.columns):
+            return df
+
+        stored = {
+            str(chunk_id): self._chunk_checksum(content, metadata)
+            for chunk_id, content, metadata in zip(existing[id_col], existing[content_col], existing[metadata_col])
+        }
+        unchanged = [
+            stored.get(str(chunk_id)) == self._chunk_checksum(content, metadata)
+            for chunk_id, content, metadata in zip(df[id_col], df[content_col], df[metadata_col])
+        ]
+        if any(unchanged):
+            logger.debug(f"Skip {sum(unchanged)} unchanged chunks of {len(df)}")
+            df = df[~np.array(unchanged)].reset_index(drop=True)
+        return df
+
+    @staticmethod
+    def _chunk_checksum(content, metadata) -> str:
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except ValueError:
+                pass
+        if isinstance(metadata, dict):
+            # position of row in inserted dataframe is not a change of chunk
+            metadata = {
+                key: value
+                for key, value in metadata.items()
+                if key != 'original_row_index'
+            }
+        # metadata is stored in jsonb, it doesn't keep order of keys
+        return str_checksum(json.dumps([str(content), metadata], sort_keys=True, cls=CustomJSONEncoder))
 
     def _adapt_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
         '''
@@ -705,15 +855,52 @@ class KnowledgeBaseTable:
 
         return df_out
 
+    def _chunks_to_embeddings(self, df: pd.DataFrame) -> list:
+        """
+        Returns embeddings for content of chunks.
+        Duplicated content is embedded once, embeddings computed before for the same content by the same model
+        are taken from the embeddings cache of knowledge base
+        :param df: chunks
+        :return: embeddings in order of chunks
+        """
+        cache = None
+        if config['kb_embeddings_cache']['enabled']:
+            model_key = self._embedding_model_key()
+            if model_key is not None:
+                cache = EmbeddingsCache(self._kb.id, model_key)
+
+        def embed(contents: List[str]) -> list:
+            df_content = pd.DataFrame({TableField.CONTENT.value: contents})
+            return self._df_to_embeddings(df_content)[TableField.EMBEDDINGS.value].tolist()
+
+        return embed_with_cache(df, TableField.CONTENT.value, embed, cache=cache)
+
+    def _embedding_model_key(self) -> Optional[str]:
+        """
+        Key of embedding model: id, version and parameters of the model
+        :return: key or None if model is not found
+        """
+        model_rec = db.Predictor.query.get(self._kb.embedding_model_id)
+        if model_rec is None:
+            return None
+        return json_checksum([model_rec.id, model_rec.version, model_rec.learn_args, self.model_params])
+
     def _content_to_embeddings(self, content: str) -> List[float]:
         """
-        Converts string to embeddings
+        Converts string to embeddings.
+        Embeddings of the same query for the same model are taken from the in-memory cache of the process
         :param content: input string
         :return: embeddings
         """
-        df = pd.DataFrame([[content]], columns=[TableField.CONTENT.value])
-        res = self._df_to_embeddings(df)
-        return res[TableField.EMBEDDINGS.value][0]
+        def compute():
+            df = pd.DataFrame([[content]], columns=[TableField.CONTENT.value])
+            res = self._df_to_embeddings(df)
+            return res[TableField.EMBEDDINGS.value][0]
+
+        model_key = self._embedding_model_key()
+        if model_key is None:
+            return compute()
+        return query_embeddings_cache.get((model_key, content_hash(content)), compute)
 
     def build_rag_pipeline(self, retrieval_config: dict):
         """
@@ -942,9 +1129,17 @@ class KnowledgeBaseController:
             vector_db_name, vector_table_name = storage.parts
 
         # create table in vectordb before creating KB
-        self.session.datahub.get(vector_db_name).integration_handler.create_table(
-            vector_table_name
-        )
+        vector_db_handler = self.session.datahub.get(vector_db_name).integration_handler
+        vector_db_handler.create_table(vector_table_name)
+
+        vector_index = params.get('vector_index')
+        if vector_index is not None:
+            if not isinstance(vector_index, dict):
+                raise ValueError('vector_index has to be a dict with type and parameters of index')
+            try:
+                vector_db_handler.create_index(vector_table_name, vector_index)
+            except NotImplementedError:
+                raise ValueError(f'Vector database {vector_db_name} does not support indexes')
         vector_database_id = self.session.integration_controller.get(vector_db_name)['id']
 
         # Store sparse vector settings in params if specified
@@ -1068,6 +1263,7 @@ class KnowledgeBaseController:
         # kb exists
         db.session.delete(kb)
         db.session.commit()
+        drop_embeddings_cache(kb.id)
 
         # drop objects if they were created automatically
         if 'default_vector_storage' in kb.params:
@@ -0,0 +1,206 @@
+"""
+Content-addressed cache of embeddings of knowledge base chunks.
+
+Embeddings are stored in sqlite database in the storage folder of the knowledge base and identified by
+(key of embedding model, hash of normalized content). Re-ingestion of unchanged documents and duplicated chunks
+(boilerplate, repeated paragraphs) reuse stored embeddings instead of calling the embedding model.
+
+Key of embedding model includes id, version and parameters of the model: embeddings of other versions of the model
+are not used and are removed from the cache.
+"""
+
+import pickle
+import re
+import sqlite3
+import threading
+import unicodedata
+from contextlib import closing
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+from mindsdb.interfaces.storage.fs import FileStorage, RESOURCE_GROUP
+from mindsdb.utilities import log
+from mindsdb.utilities.cache import str_checksum
+
+logger = log.getLogger(__name__)
+
+# max count of parameters in sqlite query
+_QUERY_BATCH_SIZE = 500
+
+_WHITESPACES = re.compile(r'\s+')
+
+
+def content_hash(content: str) -> str:
+    """Hash of normalized content: unicode normalization and collapsing of whitespaces
+
+    Args:
+        content (str): content of chunk
+
+    Returns:
+        str: hex hash
+    """
+    content = unicodedata.normalize('NFC', str(content))
+    content = _WHITESPACES.sub(' ', content).strip()
+    return str_checksum(content)
+
+
+class EmbeddingsCache:
+    """Storage of embeddings of knowledge base
+
+    How to use it:
+
+        cache = EmbeddingsCache(kb.id, model_key)
+        hashes = [content_hash(content) for content in contents]
+        found = cache.get(hashes)  # {hash: embedding}, only found
+        ...
+        cache.set(new_embeddings)  # {hash: embedding}
+    """
+
+    _FILE_NAME = 'embeddings_cache.sqlite'
+
+    # model keys, outdated embeddings of which are already removed: {path: model_key}
+    _cleaned = {}
+    _cleaned_lock = threading.Lock()
+
+    def __init__(self, kb_id: int, model_key: str):
+        """
+        Args:
+            kb_id (int): id of knowledge base
+            model_key (str): key of embedding model with its version and parameters
+        """
+        storage = FileStorage(
+            resource_group=RESOURCE_GROUP.KNOWLEDGE_BASE,
+            resource_id=kb_id,
+            sync=False
+        )
+        self.path = str(storage.folder_path / self._FILE_NAME)
+        self.model_key = model_key
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=60)
+        connection.execute('pragma journal_mode=wal')
+        connection.execute('pragma synchronous=normal')
+        connection.execute('''
+            create table if not exists embeddings (
+                model_key text,
+                hash text,
+                embedding blob,
+                primary key (model_key, hash)
+            ) without rowid
+        ''')
+        return connection
+
+    @staticmethod
+    def _batches(items: list) -> Iterable[list]:
+        for i in range(0, len(items), _QUERY_BATCH_SIZE):
+            yield items[i: i + _QUERY_BATCH_SIZE]
+
+    def get(self, hashes: List[str]) -> Dict[str, object]:
+        """Get stored embeddings
+
+        Args:
+            hashes (List[str]): hashes of contents
+
+        Returns:
+            Dict[str, object]: found embeddings by hash
+        """
+        hashes = list(set(hashes))
+        found = {}
+        if len(hashes) == 0:
+            return found
+        with closing(self._connect()) as connection:
+            for batch in self._batches(hashes):
+                placeholders = ','.join(['?'] * len(batch))
+                rows = connection.execute(
+                    f'select hash, embedding from embeddings where model_key = ? and hash in ({placeholders})',
+                    [self.model_key, *batch]
+                )
+                for key, embedding in rows:
+                    found[key] = pickle.loads(embedding)
+        return found
+
+    def set(self, embeddings: Dict[str, object]):
+        """Store embeddings
+
+        Args:
+            embeddings (Dict[str, object]): embeddings by hash of content
+        """
+        if len(embeddings) == 0:
+            return
+        rows = [
+            (self.model_key, key, pickle.dumps(embedding, protocol=5))
+            for key, embedding in embeddings.items()
+        ]
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.executemany('insert or replace into embeddings values (?, ?, ?)', rows)
+            self._remove_outdated(connection)
+
+    def _remove_outdated(self, connection: sqlite3.Connection):
+        # embeddings of previous versions of model can't be used anymore
+        with self._cleaned_lock:
+            if self._cleaned.get(self.path) == self.model_key:
+                return
+            self._cleaned[self.path] = self.model_key
+        with connection:
+            cursor = connection.execute('delete from embeddings where model_key != ?', [self.model_key])
+        if cursor.rowcount > 0:
+            logger.debug(f'Removed {cursor.rowcount} outdated embeddings from {self.path}')
+
+
+def drop_cache(kb_id: int):
+    """Remove embeddings cache of knowledge base"""
+    storage = FileStorage(
+        resource_group=RESOURCE_GROUP.KNOWLEDGE_BASE,
+        resource_id=kb_id,
+        sync=False
+    )
+    try:
+        storage.delete()
+    except Exception as e:
+        logger.warning(f"Can't remove embeddings cache of knowledge base {kb_id}: {e}")
+
+
+def embed_with_cache(df: pd.DataFrame, content_column: str, embed, cache: EmbeddingsCache = None) -> list:
+    """Get embeddings for contents of dataframe. Duplicated contents are embedded once,
+    embeddings found in the cache are not computed
+
+    Args:
+        df (pd.DataFrame): input data
+        content_column (str): column with content
+        embed (Callable): function to compute embeddings: takes list of contents, returns list of embeddings
+        cache (EmbeddingsCache): cache of embeddings, optional
+
+    Returns:
+        list: embeddings, in order of rows
+    """
+    hashes = [content_hash(content) for content in df[content_column]]
+
+    embeddings = {}
+    if cache is not None:
+        try:
+            embeddings = cache.get(hashes)
+        except sqlite3.Error as e:
+            logger.warning(f"Can't read embeddings cache: {e}")
+            cache = None
+
+    # first occurrence of every not cached content
+    to_embed = {}
+    for key, content in zip(hashes, df[content_column]):
+        if key not in embeddings and key not in to_embed:
+            to_embed[key] = content
+
+    logger.debug(
+        f'Embeddings: {len(hashes)} chunks, {len(set(hashes))} unique, {len(to_embed)} not cached'
+    )
+    if len(to_embed) > 0:
+        computed = dict(zip(to_embed.keys(), embed(list(to_embed.values()))))
+        embeddings.update(computed)
+        if cache is not None:
+            try:
+                cache.set(computed)
+            except sqlite3.Error as e:
+                logger.warning(f"Can't update embeddings cache: {e}")
+
+    return [embeddings[key] for key in hashes]
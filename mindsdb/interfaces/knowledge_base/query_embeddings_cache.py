@@ -0,0 +1,110 @@
+"""
+Cache of embeddings of search queries of knowledge bases.
+
+Search by `WHERE content = '...'` converts the text of the query to embeddings using the embedding model of the
+knowledge base, it is a round trip to ML process (or to the provider of the model). The same queries are often
+repeated (chatbots, agents retrying tools), so embeddings are kept in memory of the process and shared between
+sessions. Queries are identified by (key of embedding model, hash of normalized text), the least recently used
+queries are evicted.
+
+If the same query is requested concurrently, only the first request computes embeddings, others wait for its result.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from mindsdb.utilities import log
+from mindsdb.utilities.config import config
+
+logger = log.getLogger(__name__)
+
+
+class QueryEmbeddingsCache:
+    def __init__(self, max_count: int = 1000):
+        """
+        Args:
+            max_count (int): max count of stored embeddings, 0 - cache is disabled
+        """
+        self.max_count = max_count
+        self._items = OrderedDict()
+        # computations in progress: {key: Future}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pack(embeddings: Any) -> Any:
+        # store vectors compactly: list of python floats takes several times more memory
+        if isinstance(embeddings, (list, np.ndarray)):
+            return np.asarray(embeddings, dtype=np.float32)
+        return embeddings
+
+    @staticmethod
+    def _unpack(embeddings: Any) -> Any:
+        if isinstance(embeddings, np.ndarray):
+            return embeddings.tolist()
+        return embeddings
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get embeddings from the cache, compute them if they are not cached
+
+        Args:
+            key (Hashable): key of the query
+            compute (Callable): function to compute embeddings
+
+        Returns:
+            Any: embeddings
+        """
+        if self.max_count <= 0:
+            return compute()
+
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._unpack(self._items[key])
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_owner:
+            logger.debug(f'Waiting for embeddings of query {key} which are being computed')
+            return self._unpack(future.result())
+
+        embeddings = None
+        error = None
+        try:
+            embeddings = self._pack(compute())
+        except Exception as e:
+            error = e
+            raise
+        except BaseException as e:
+            # interruption of the thread (KeyboardInterrupt, SystemExit) is not passed to waiting threads
+            error = RuntimeError(f'Computation of embeddings was interrupted: {e!r}')
+            raise
+        finally:
+            # the key is always released, otherwise next requests of the query would wait forever
+            with self._lock:
+                del self._in_flight[key]
+                if error is None:
+                    self._items[key] = embeddings
+                    while len(self._items) > self.max_count:
+                        self._items.popitem(last=False)
+            if error is None:
+                future.set_result(embeddings)
+            else:
+                future.set_exception(error)
+        return self._unpack(embeddings)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+query_embeddings_cache = QueryEmbeddingsCache(
+    max_count=config['kb_query_embeddings_cache']['max_count']
+)
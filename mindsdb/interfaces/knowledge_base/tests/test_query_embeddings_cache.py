@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from mindsdb.interfaces.knowledge_base.query_embeddings_cache import QueryEmbeddingsCache
+
+
+def compute_in_thread(cache: QueryEmbeddingsCache, key, compute) -> dict:
+    """Start cache.get in a thread, returns dict which gets 'result' or 'error' of the call"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = cache.get(key, compute)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    outcome['thread'] = thread
+    return outcome
+
+
+def wait_for_in_flight(cache: QueryEmbeddingsCache, key):
+    for _ in range(1000):
+        with cache._lock:
+            if key in cache._in_flight:
+                return
+        time.sleep(0.005)
+    raise TimeoutError()
+
+
+class TestQueryEmbeddingsCache:
+    def test_cached(self):
+        cache = QueryEmbeddingsCache(max_count=2)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return [1.0, 2.0]
+
+        assert cache.get('a', compute) == [1.0, 2.0]
+        assert cache.get('a', compute) == [1.0, 2.0]
+        assert len(calls) == 1
+
+        cache.get('b', compute)
+        cache.get('c', compute)
+        # the least recently used is evicted
+        assert list(cache._items.keys()) == ['b', 'c']
+
+    def test_concurrent_requests_wait_for_owner(self):
+        cache = QueryEmbeddingsCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            return [1.0]
+
+        owner = compute_in_thread(cache, 'key', compute)
+        started.wait(5)
+        waiter = compute_in_thread(cache, 'key', lambda: pytest.fail('computed twice'))
+        release.set()
+        for outcome in (owner, waiter):
+            outcome['thread'].join(5)
+            assert outcome['result'] == [1.0]
+        assert cache._in_flight == {}
+
+    def test_error(self):
+        cache = QueryEmbeddingsCache()
+
+        def compute():
+            raise ValueError('model failed')
+
+        with pytest.raises(ValueError):
+            cache.get('key', compute)
+        assert cache._in_flight == {}
+        assert 'key' not in cache._items
+        # next request computes again
+        assert cache.get('key', lambda: [1.0]) == [1.0]
+
+    def test_interrupted_owner(self):
+        cache = QueryEmbeddingsCache()
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            raise KeyboardInterrupt()
+
+        owner = compute_in_thread(cache, 'key', compute)
+        wait_for_in_flight(cache, 'key')
+        waiter = compute_in_thread(cache, 'key', lambda: [2.0])
+        # let the waiter reach the future of the owner
+        time.sleep(0.2)
+        release.set()
+        owner['thread'].join(5)
+        waiter['thread'].join(5)
+
+        assert isinstance(owner['error'], KeyboardInterrupt)
+        # waiting thread is not interrupted, it gets an error
+        assert isinstance(waiter['error'], RuntimeError)
+        # the key is released
+        assert cache._in_flight == {}
+        assert cache.get('key', lambda: [3.0]) == [3.0]
@@ -1,4 +1,5 @@
 from typing import List, Optional, Iterable
+from collections import deque
 import pickle
 import datetime as dt
 
@@ -16,6 +17,7 @@ from mindsdb.utilities.cache import get_cache
 from mindsdb.interfaces.storage import db
 from mindsdb.utilities.context import context as ctx
 from mindsdb.utilities.config import config
+from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
 
 from .last_query import LastQuery
 
@@ -36,35 +38,111 @@ class RunningQuery:
         """
         Gets chunks of data from data handler for executing them in next steps of the planner
         Check if datanode supports fetch with stream
+        Progress of the query is stored after the chunk is processed by consumer
         :param dn: datanode to execute query
         :param step_call: instance of StepCall to get some parameters from it
         :param query: AST query to execute
         :return: generator with query results
         """
-        if dn.has_support_stream():
-            query2 = self.get_partition_query(step_call.current_step_num, query, stream=True)
+        for df, max_track_value in self.iterate_partitions(dn, step_call, query):
+            yield df
+            self.set_progress(df, max_track_value)
 
-            for df in dn.query_stream(query2, fetch_size=self.batch_size):
-                max_track_value = self.get_max_track_value(df)
-                yield df
-                self.set_progress(df, max_track_value)
+    def iterate_partitions(self, dn, step_call, query: Select, prefetch: int = 0) -> Iterable[tuple]:
+        """
+        Gets chunks of data from data handler together with max value of track column in them.
+        Progress of the query is not stored: `set_progress` has to be called by consumer for every chunk
+        after it is processed, in the same order as chunks are received
+        :param dn: datanode to execute query
+        :param step_call: instance of StepCall to get some parameters from it
+        :param query: AST query to execute
+        :param prefetch: count of chunks fetched ahead in background thread while consumer processes previous chunks
+        :return: generator of tuples (chunk, max_track_value)
+        """
+        stream = dn.has_support_stream()
+        # it has to be called in the current thread, the progress of the query can be reset here
+        query2 = self.get_partition_query(step_call.current_step_num, query, stream=stream)
+        # the record is not accessed by fetching thread: its session is used by the current thread
+        track_column = self.record.parameters.get('track_column')
+        track_value = self.record.context.get('track_value')
 
-        else:
-            while True:
-                query2 = self.get_partition_query(step_call.current_step_num, query, stream=False)
+        def fetch_partitions(fetch_dn):
+            return self._fetch_partitions(
+                fetch_dn, step_call, query, query2, stream, track_column=track_column, track_value=track_value
+            )
 
-                response = dn.query(
-                    query=query2,
-                    session=step_call.session
-                )
-                df = response.data_frame
+        if prefetch <= 0:
+            yield from fetch_partitions(dn)
+            return
 
-                if df is None or len(df) == 0:
+        executor = ContextThreadPoolExecutor(max_workers=1)
+        partitions = None
+
+        def fetch_next():
+            nonlocal partitions
+            if partitions is None:
+                # handler can be not thread safe, use handler of fetching thread
+                fetch_dn = step_call.session.datahub.get(dn.integration_name)
+                partitions = fetch_partitions(fetch_dn)
+            return next(partitions, None)
+
+        def close():
+            if partitions is not None:
+                partitions.close()
+            db.session.remove()
+
+        futures = deque()
+        try:
+            while True:
+                while len(futures) <= prefetch:
+                    futures.append(executor.submit(fetch_next))
+                item = futures.popleft().result()
+                if item is None:
                     break
+                yield item
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.submit(close)
+            executor.shutdown(wait=True)
+
+    def _fetch_partitions(
+        self, dn, step_call, query: Select, query2: Select, stream: bool,
+        track_column: Optional[str] = None, track_value=None
+    ) -> Iterable[tuple]:
+        """
+        Fetch chunks of data, starting with query generated by `get_partition_query`.
+        The next partition query uses max value of track column from the fetched chunks,
+        so the next chunk can be fetched before the previous one is processed.
+        It can be executed in other thread: query record is not accessed, its values are passed as arguments
+        """
+        def get_max_track_value(df: pd.DataFrame):
+            if track_column is None:
+                # stream mode
+                return None
+            return df[track_column].max()
 
-                max_track_value = self.get_max_track_value(df)
-                yield df
-                self.set_progress(df, max_track_value)
+        if stream:
+            for df in dn.query_stream(query2, fetch_size=self.batch_size):
+                yield df, get_max_track_value(df)
+            return
+
+        while True:
+            response = dn.query(
+                query=query2,
+                session=step_call.session
+            )
+            df = response.data_frame
+
+            if df is None or len(df) == 0:
+                break
+
+            max_track_value = get_max_track_value(df)
+            yield df, max_track_value
+
+            if max_track_value is not None and (track_value is None or max_track_value > track_value):
+                track_value = max_track_value
+            query2 = self._wrap_partition_query(query, track_column, track_value, stream=False)
 
     def get_partition_query(self, step_num: int, query: Select, stream=False) -> Select:
         """
@@ -95,15 +173,6 @@ class RunningQuery:
         if not stream and track_column is None:
             raise ValueError('Track column is not defined')
 
-        query = Select(
-            targets=[Star()],
-            from_table=query,
-            order_by=[OrderBy(Identifier(track_column))],
-
-        )
-        if not stream:
-            query.limit = Constant(self.batch_size)
-
         track_value = self.record.context.get('track_value')
         # is it different step?
         cur_step_num = self.record.context.get('step_num')
@@ -115,6 +184,18 @@ class RunningQuery:
             flag_modified(self.record, 'context')
             db.session.commit()
 
+        return self._wrap_partition_query(query, track_column, track_value, stream)
+
+    def _wrap_partition_query(self, query: Select, track_column: str, track_value, stream: bool) -> Select:
+        query = Select(
+            targets=[Star()],
+            from_table=query,
+            order_by=[OrderBy(Identifier(track_column))],
+
+        )
+        if not stream:
+            query.limit = Constant(self.batch_size)
+
         if track_value is not None:
             query.where = BinaryOperation(
                 op='>',
@@ -215,7 +296,7 @@ class RunningQuery:
         flag_modified(self.record, 'context')
 
         # save steps_data
-        cache = get_cache('steps_data')
+        cache = get_cache('steps_data', memory_tier=False)
         data = pickle.dumps(steps_data, protocol=5)
         cache.set(str(self.record.id), data)
 
@@ -241,7 +322,7 @@ class RunningQuery:
         """
             Returns stored state for resuming the query
         """
-        cache = get_cache('steps_data')
+        cache = get_cache('steps_data', memory_tier=False)
         key = self.record.id
         data = cache.get(key)
         cache.delete(key)
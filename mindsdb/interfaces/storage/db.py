@@ -1,5 +1,6 @@
 import json
 import datetime
+import itertools
 from typing import Dict, List
 
 import numpy as np
@@ -15,9 +16,14 @@ from sqlalchemy import (
     String,
     UniqueConstraint,
     create_engine,
+    event,
+    insert,
+    inspect,
     text,
-    types
+    types,
+    update
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import (
     Mapped,
@@ -31,6 +37,8 @@ from sqlalchemy.sql.schema import ForeignKey
 
 from mindsdb.utilities.json_encoder import CustomJSONEncoder
 from mindsdb.utilities.config import config
+from mindsdb.utilities.context import context as ctx
+import mindsdb.utilities.profiler as profiler
 
 
 class Base:
@@ -40,6 +48,8 @@ class Base:
 Base = declarative_base(cls=Base)
 
 session, engine = None, None
+# count of catalog changes committed by this process
+local_catalog_changes = 0
 
 
 def init(connection_str: str = None):
@@ -55,6 +65,12 @@ def init(connection_str: str = None):
     session = scoped_session(sessionmaker(bind=engine, autoflush=True))
     Base.query = session.query_property()
 
+    # round trips to the database are shown in the profiler
+    event.listen(engine, 'before_cursor_execute', _count_query)
+    event.listen(session, 'before_flush', _bump_catalog_version)
+    event.listen(session, 'after_commit', _on_commit)
+    event.listen(session, 'after_rollback', _on_rollback)
+
 
 def serializable_insert(record: Base, try_count: int = 100):
     """Do serializeble insert. If fail - repeat it {try_count} times.
@@ -99,6 +115,7 @@ class Array(types.TypeDecorator):
     """Float Type that replaces commas with  dots on input"""
 
     impl = types.String
+    cache_ok = True
 
     def process_bind_param(self, value, dialect):  # insert
         if isinstance(value, str):
@@ -116,6 +133,7 @@ class Json(types.TypeDecorator):
     """Float Type that replaces commas with  dots on input"""
 
     impl = types.String
+    cache_ok = True
 
     def process_bind_param(self, value, dialect):  # insert
         return json.dumps(value, cls=NumpyEncoder) if value is not None else None
@@ -621,3 +639,86 @@ class LLMData(Base):
     model_id: int = Column(Integer, nullable=False)
     created_at: datetime = Column(DateTime, default=datetime.datetime.now)
     updated_at: datetime = Column(DateTime, onupdate=datetime.datetime.now)
+
+
+class CatalogVersion(Base):
+    """Version of the catalog (projects, integrations, models, views, knowledge bases, agents) of the company.
+    It is increased on every change of the catalog and is used to invalidate in-process caches of it.
+    """
+    __tablename__ = "catalog_version"
+    company_id: int = Column(Integer, primary_key=True, autoincrement=False)
+    version: int = Column(Integer, nullable=False, default=0)
+    updated_at: datetime.datetime = Column(
+        DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now
+    )
+
+
+CATALOG_MODELS = (Project, Integration, Predictor, View, KnowledgeBase, Agents)
+
+# changes of these columns don't change the catalog
+_CATALOG_IGNORED_COLUMNS = {
+    Predictor: {
+        'updated_at', 'training_phase_current', 'training_phase_total', 'training_phase_name', 'training_metadata'
+    }
+}
+
+
+def _is_catalog_changed(session) -> bool:
+    for obj in itertools.chain(session.new, session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            return True
+    for obj in session.dirty:
+        if not isinstance(obj, CATALOG_MODELS):
+            continue
+        ignored = _CATALOG_IGNORED_COLUMNS.get(type(obj), {'updated_at'})
+        state = inspect(obj)
+        for attr in state.attrs:
+            if attr.key not in ignored and attr.history.has_changes():
+                return True
+    return False
+
+
+def _bump_catalog_version(session, flush_context, instances):
+    """Increase version of the catalog if flushed objects change it. It is done in the same transaction."""
+    if session.info.get('catalog_changed') or not _is_catalog_changed(session):
+        return
+    try:
+        company_id = ctx.company_id or 0
+    except AttributeError:
+        # context is not initialized
+        company_id = 0
+    now = datetime.datetime.now()
+    dialect_insert = {
+        'postgresql': postgresql.insert,
+        'sqlite': sqlite.insert
+    }.get(session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        # single statement: concurrent first changes of the company don't conflict on insert
+        query = dialect_insert(CatalogVersion).values(company_id=company_id, version=1, updated_at=now)
+        session.execute(query.on_conflict_do_update(
+            index_elements=[CatalogVersion.company_id],
+            set_={'version': CatalogVersion.version + 1, 'updated_at': now}
+        ))
+    else:
+        updated = session.execute(
+            update(CatalogVersion)
+            .where(CatalogVersion.company_id == company_id)
+            .values(version=CatalogVersion.version + 1, updated_at=now)
+        )
+        if updated.rowcount == 0:
+            session.execute(insert(CatalogVersion).values(company_id=company_id, version=1, updated_at=now))
+    session.info['catalog_changed'] = True
+
+
+def _on_commit(session):
+    global local_catalog_changes
+    if session.info.pop('catalog_changed', None):
+        local_catalog_changes += 1
+
+
+def _on_rollback(session):
+    session.info.pop('catalog_changed', None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    profiler.count_metadata_db_query()
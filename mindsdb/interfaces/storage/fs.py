@@ -38,6 +38,7 @@ class RESOURCE_GROUP:
     INTEGRATION = 'integration'
     TAB = 'tab'
     SYSTEM = 'system'
+    KNOWLEDGE_BASE = 'knowledge_base'
 
 
 RESOURCE_GROUP = RESOURCE_GROUP()
@@ -3,7 +3,7 @@ import functools
 import time
 import os
 
-from prometheus_client import Histogram, Summary
+from prometheus_client import Counter, Histogram, Summary
 
 
 INTEGRATION_HANDLER_QUERY_TIME = Summary(
@@ -18,6 +18,73 @@ INTEGRATION_HANDLER_RESPONSE_SIZE = Summary(
     ('integration', 'response_type')
 )
 
+INTEGRATION_HANDLER_STREAM_ROWS = Counter(
+    'mindsdb_integration_handler_stream_rows',
+    'How many rows are streamed from integration handlers',
+    ('integration',)
+)
+
+INTEGRATION_HANDLER_STREAM_BYTES = Counter(
+    'mindsdb_integration_handler_stream_bytes',
+    'Size in memory of dataframes streamed from integration handlers',
+    ('integration',)
+)
+
+INTEGRATION_HANDLER_STREAM_TIME = Counter(
+    'mindsdb_integration_handler_stream_seconds',
+    'How long integration handlers take to fetch streamed batches, excluding processing of batches by consumer',
+    ('integration',)
+)
+
+INTEGRATION_POOL_CHECKOUTS = Counter(
+    'mindsdb_integration_pool_checkouts',
+    'How many connections are taken from pools of integration handlers, grouped by result (reused or created)',
+    ('integration', 'result')
+)
+
+INTEGRATION_POOL_WAIT_TIME = Histogram(
+    'mindsdb_integration_pool_wait_seconds',
+    'How long it takes to get connection from pool of integration handler, including opening of new connection',
+    ('integration',)
+)
+
+CACHE_REQUESTS = Counter(
+    'mindsdb_cache_requests',
+    'How many values are requested from cache, grouped by cache category, tier and result (hit or miss)',
+    ('category', 'tier', 'result')
+)
+
+CACHE_EVICTIONS = Counter(
+    'mindsdb_cache_evictions',
+    'How many values are evicted from cache, grouped by cache category and tier',
+    ('category', 'tier')
+)
+
+SQL_PLANNING_TIME = Histogram(
+    'mindsdb_sql_planning_seconds',
+    'How long parsing and planning of SQL queries take, grouped by result of lookup in cache of plans (hit or miss)',
+    ('cache',)
+)
+
+KNOWLEDGE_BASE_INSERT_ROWS = Counter(
+    'mindsdb_knowledge_base_insert_rows',
+    'How many items pass through stages of knowledge base insert: '
+    'input rows (chunk), chunks (compare, embed, write)',
+    ('stage',)
+)
+
+KNOWLEDGE_BASE_INSERT_TIME = Counter(
+    'mindsdb_knowledge_base_insert_seconds',
+    'How long stages of knowledge base insert take, summary time of all threads',
+    ('stage',)
+)
+
+RERANKER_TIME = Histogram(
+    'mindsdb_reranker_seconds',
+    'How long reranking by LLM takes: one request to the model (request), scoring of all documents of query (rerank)',
+    ('stage',)
+)
+
 _REST_API_LATENCY = Histogram(
     'mindsdb_rest_api_latency_seconds',
     'How long REST API requests take to complete, grouped by method, endpoint, and status',
@@ -0,0 +1,31 @@
+"""catalog_version
+
+Revision ID: 48d66b2e9061
+Revises: 53502b6d63bf
+Create Date: 2026-10-18 12:10:42.531904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import mindsdb.interfaces.storage.db  # noqa
+
+
+# revision identifiers, used by Alembic.
+revision = '48d66b2e9061'
+down_revision = '53502b6d63bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'catalog_version',
+        sa.Column('company_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('company_id')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_version')
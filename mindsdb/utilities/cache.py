@@ -19,7 +19,11 @@ How to use it:
 Configuration:
 
 - max_size size of cache in count of records, default is 500
-- serializer, module for serialization, default is dill
+- max_bytes size of cache in bytes, not limited by default
+- quotas, size in bytes for specific categories: {"predict": 1073741824}
+- memory_max_bytes size of in-process cache in bytes, default is 256Mb. 0 - to disable it
+- serializer, module for serialization, default is dill. Dataframes are stored in parquet format if they can be
+  restored from it exactly
 
 It can be set via:
 - get_cache function:
@@ -34,7 +38,10 @@ It can be set via:
 
 Cache engines:
 
-Can be specified in mindsdb config json. Possible values:
+In-process LRU cache (MemoryCache) is used in front of the shared cache, values are taken from the shared cache only
+if they are not found in memory.
+
+Shared cache can be specified in mindsdb config json. Possible values:
 - local - for FileCache, default
 - redis - for RedisCache
 By default is used local redis server. You can specify
@@ -52,33 +59,116 @@ How to test:
 
 """
 
+import io
 import os
+import re
 import time
+import pickle
+import zlib
+import hashlib
+import threading
+import contextlib
 from abc import ABC
 from pathlib import Path
-import re
-import hashlib
 import typing as t
+from collections import OrderedDict, defaultdict
+
+if os.name == 'posix':
+    import fcntl
 
+import numpy as np
 import pandas as pd
 import walrus
 
+from mindsdb.metrics import metrics
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.json_encoder import CustomJSONEncoder
-from mindsdb.interfaces.storage.fs import FileLock
 from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.dataframe_transport import arrow_restores_dataframe
 
 _CACHE_MAX_SIZE = 500
-
-
-def dataframe_checksum(df: pd.DataFrame):
-    original_columns = df.columns
-    df.columns = list(range(len(df.columns)))
-    result = hashlib.sha256(
-        str(df.values).encode()
-    ).hexdigest()
-    df.columns = original_columns
-    return result
+_MEMORY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_PARQUET_MAGIC = b'PAR1'
+# count of locks of keys (lock files in the dir of file cache), keys are distributed between them by hash
+_LOCKS_COUNT = 256
+
+
+# version of dataframe_checksum algorithm, it is a prefix of checksum.
+# Checksums (and cache keys) made by previous versions of algorithm can't match new ones, so old cache entries are not
+# used and removed by regular eviction
+_DATAFRAME_CHECKSUM_VERSION = 'v3'
+
+# multiplier to combine 64-bit hashes
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_values(series: pd.Series) -> np.ndarray:
+    """Get 64-bit hashes of values of the series
+
+    Values of object columns are hashed by their string form, so 1 and '1' would have the same hash:
+    kind of value (as it is inferred by pandas: 'string', 'integer', etc) is mixed into hashes.
+    Hash of a value doesn't depend on other values of the column
+
+    Args:
+        series (pd.Series): values
+
+    Returns:
+        np.ndarray: array of uint64 hashes
+    """
+    # without factorization: it is slow for columns of unique strings
+    try:
+        hashes = pd.util.hash_pandas_object(series, index=False, categorize=False)
+    except (TypeError, ValueError):
+        # unhashable values, like dicts or lists
+        hashes = pd.util.hash_pandas_object(series.astype(str), index=False, categorize=False)
+    hashes = hashes.to_numpy()
+    if series.dtype == object:
+        values_kind = pd.api.types.infer_dtype(series, skipna=False)
+        if values_kind.startswith('mixed'):
+            # kind of every value, it is inferred once per python type
+            codes, _ = pd.factorize(series.map(type))
+            _, first_positions = np.unique(codes, return_index=True)
+            kinds = [
+                pd.api.types.infer_dtype(series.iloc[position: position + 1], skipna=False)
+                for position in first_positions
+            ]
+            types_hashes = pd.util.hash_array(np.array(kinds, dtype=object))[codes]
+        else:
+            types_hashes = pd.util.hash_array(np.array([values_kind], dtype=object))[0]
+        hashes = hashes * _HASH_MULTIPLIER ^ types_hashes
+    return hashes
+
+
+def _mix_hashes(hashes: np.ndarray, key: np.uint64) -> np.ndarray:
+    # keyed bijective mixing of 64-bit hashes (finalizer of splitmix64)
+    hashes = hashes ^ key
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def _column_hash(series: pd.Series) -> bytes:
+    return _hash_values(series).tobytes()
+
+
+def dataframe_checksum(df: pd.DataFrame) -> str:
+    """Get checksum of dataframe. Values are hashed column by column with vectorized pandas hashing,
+    names and types of columns are included in checksum
+
+    Args:
+        df (pd.DataFrame): dataframe
+
+    Returns:
+        str: checksum
+    """
+    checksum = hashlib.sha256()
+    checksum.update(CustomJSONEncoder().encode([
+        [str(name), str(dtype)] for name, dtype in zip(df.columns, df.dtypes)
+    ]).encode())
+    checksum.update(str(len(df)).encode())
+    for i in range(len(df.columns)):
+        checksum.update(_column_hash(df.iloc[:, i]))
+    return f'{_DATAFRAME_CHECKSUM_VERSION}_{checksum.hexdigest()}'
 
 
 def json_checksum(obj: t.Union[dict, list]):
@@ -91,12 +181,56 @@ def str_checksum(obj: str):
     return checksum
 
 
+def serialize_df(df: pd.DataFrame) -> bytes:
+    """Serialize dataframe to parquet. If dataframe can't be restored from parquet exactly (pyarrow is not installed,
+    nested values or mixed types in column, not string names of columns, etc) - pickle is used
+
+    Args:
+        df (pd.DataFrame): dataframe
+
+    Returns:
+        bytes: serialized dataframe
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df)
+        if arrow_restores_dataframe(df, table):
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer)
+            return buffer.getvalue()
+    except Exception:
+        pass
+    return pickle.dumps(df, protocol=5)
+
+
+def deserialize_df(value: bytes, fallback: t.Callable = pickle.loads) -> pd.DataFrame:
+    """Restore dataframe serialized by serialize_df
+
+    Args:
+        value (bytes): serialized dataframe
+        fallback (Callable): function to deserialize values which are not in parquet format
+
+    Returns:
+        pd.DataFrame: dataframe
+    """
+    if value[:4] == _PARQUET_MAGIC:
+        return pd.read_parquet(io.BytesIO(value), engine='pyarrow')
+    return fallback(value)
+
+
 class BaseCache(ABC):
-    def __init__(self, max_size=None, serializer=None):
+    def __init__(self, category, max_size=None, serializer=None, max_bytes=None):
         self.config = Config()
+        self.category = category
         if max_size is None:
             max_size = self.config["cache"].get("max_size", _CACHE_MAX_SIZE)
         self.max_size = max_size
+        if max_bytes is None:
+            # quota of the category or common limit
+            max_bytes = self.config["cache"].get("quotas", {}).get(category, self.config["cache"].get("max_bytes"))
+        self.max_bytes = max_bytes
         if serializer is None:
             serializer_module = self.config["cache"].get('serializer')
             if serializer_module == 'pickle':
@@ -107,11 +241,41 @@ class BaseCache(ABC):
 
     # default functions
 
+    def set(self, name, value):
+        self.set_raw(name, self.serialize(value))
+
+    def get(self, name):
+        value = self.get_raw(name)
+        if value is None:
+            return None
+        return self.deserialize(value)
+
     def set_df(self, name, df):
-        return self.set(name, df)
+        self.set_raw(name, serialize_df(df))
 
     def get_df(self, name):
-        return self.get(name)
+        value = self.get_raw(name)
+        if value is None:
+            return None
+        return deserialize_df(value, fallback=self.deserialize)
+
+    # in-process locks, keys are distributed between them by hash
+    _thread_locks = [threading.Lock() for _ in range(_LOCKS_COUNT)]
+
+    def _thread_lock(self, name) -> threading.Lock:
+        return self._thread_locks[zlib.crc32(f'{self.category}/{name}'.encode()) % len(self._thread_locks)]
+
+    def lock(self, name):
+        """Lock of the key, to change value by read-modify-write.
+        Base implementation works only inside the process, shared caches also lock the key for other processes
+
+        Args:
+            name (str): key
+
+        Returns:
+            context manager
+        """
+        return self._thread_lock(name)
 
     def serialize(self, value):
         return self.serializer.dumps(value)
@@ -119,10 +283,26 @@ class BaseCache(ABC):
     def deserialize(self, value):
         return self.serializer.loads(value)
 
+    def _count_request(self, value):
+        result = 'miss' if value is None else 'hit'
+        metrics.CACHE_REQUESTS.labels(self.category, self.tier, result).inc()
+
+    def _count_evictions(self, count):
+        if count > 0:
+            metrics.CACHE_EVICTIONS.labels(self.category, self.tier).inc(count)
+
 
 class FileCache(BaseCache):
+    tier = 'file'
+
+    # index of files of cache dirs: {path: _FileIndex}, shared by all instances in the process
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+    # the index is rebuilt from the content of dir with this period, to take into account changes of other processes
+    _INDEX_TTL = 60
+
     def __init__(self, category, path=None, **kwargs):
-        super().__init__(**kwargs)
+        super().__init__(category, **kwargs)
 
         if path is None:
             path = self.config['paths']['cache']
@@ -136,59 +316,77 @@ class FileCache(BaseCache):
 
         self.path = cache_path
 
-    def clear_old_cache(self):
-        with FileLock(self.path):
-            # buffer to delete, to not run delete on every adding
-            buffer_size = 5
-
-            if self.max_size is None:
-                return
+    def _get_index(self) -> '_FileIndex':
+        with self._indexes_lock:
+            index = self._indexes.get(self.path)
+            if index is None or time.time() - index.created_at > self._INDEX_TTL:
+                index = _FileIndex(self.path)
+                self._indexes[self.path] = index
+            return index
 
-            cur_count = len(os.listdir(self.path))
+    def clear_old_cache(self):
+        # buffer to delete, to not run delete on every adding
+        buffer_size = 5
 
-            if cur_count > self.max_size + buffer_size:
-                try:
-                    files = sorted(Path(self.path).iterdir(), key=os.path.getmtime)
-                    for file in files[:cur_count - self.max_size]:
-                        self.delete_file(file)
-                except FileNotFoundError:
-                    pass
+        index = self._get_index()
+        with index.lock:
+            to_delete = []
+            if self.max_size is not None and len(index.files) > self.max_size + buffer_size:
+                while len(index.files) > self.max_size:
+                    to_delete.append(index.pop_oldest())
+            if self.max_bytes is not None:
+                while index.total_bytes > self.max_bytes and len(index.files) > 0:
+                    to_delete.append(index.pop_oldest())
+
+        for name in to_delete:
+            try:
+                os.unlink(self.path / name)
+            except FileNotFoundError:
+                pass
+        self._count_evictions(len(to_delete))
 
     def file_path(self, name):
         # Sanitize the key to avoid table (file) names with backticks and slashes.
         sanitized_name = re.sub(r'[^\w\-.]', '_', name)
         return self.path / sanitized_name
 
-    def set_df(self, name, df):
-        path = self.file_path(name)
-        df.to_pickle(path)
-        self.clear_old_cache()
-
-    def set(self, name, value):
+    @contextlib.contextmanager
+    def lock(self, name):
+        with self._thread_lock(name):
+            if os.name != 'posix':
+                yield
+                return
+            # flock is bound to the open file, so it also excludes threads which opened the file separately
+            lock_number = zlib.crc32(name.encode()) % _LOCKS_COUNT
+            fd = os.open(self.path / f'.lock_{lock_number}', os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def set_raw(self, name, value: bytes):
         path = self.file_path(name)
-        value = self.serialize(value)
 
-        with open(path, 'wb') as fd:
+        # write to temp file and replace: readers don't need lock and never see partially written file
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as fd:
             fd.write(value)
-        self.clear_old_cache()
+        os.replace(tmp_path, path)
 
-    def get_df(self, name):
-        path = self.file_path(name)
-        with FileLock(self.path):
-            if not os.path.exists(path):
-                return None
-            value = pd.read_pickle(path)
-        return value
+        index = self._get_index()
+        with index.lock:
+            index.add(path.name, len(value))
+        self.clear_old_cache()
 
-    def get(self, name):
+    def get_raw(self, name):
         path = self.file_path(name)
-
-        with FileLock(self.path):
-            if not os.path.exists(path):
-                return None
+        try:
             with open(path, 'rb') as fd:
                 value = fd.read()
-        value = self.deserialize(value)
+        except FileNotFoundError:
+            value = None
+        self._count_request(value)
         return value
 
     def delete(self, name):
@@ -196,63 +394,121 @@ class FileCache(BaseCache):
         self.delete_file(path)
 
     def delete_file(self, path):
+        index = self._get_index()
+        with index.lock:
+            index.remove(Path(path).name)
         os.unlink(path)
 
 
+class _FileIndex:
+    """Files of cache dir in order of modification with their sizes.
+    Add, remove and pop of the oldest file are O(1)
+    """
+
+    def __init__(self, path: Path):
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.files = OrderedDict()
+        self.total_bytes = 0
+
+        entries = []
+        for entry in os.scandir(path):
+            if entry.name.startswith('.') or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self.add(name, size)
+
+    def add(self, name: str, size: int):
+        self.remove(name)
+        self.files[name] = size
+        self.total_bytes += size
+
+    def remove(self, name: str):
+        size = self.files.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def pop_oldest(self) -> str:
+        name, size = self.files.popitem(last=False)
+        self.total_bytes -= size
+        return name
+
+
 class RedisCache(BaseCache):
-    def __init__(self, category, connection_info=None, **kwargs):
-        super().__init__(**kwargs)
+    tier = 'redis'
 
-        self.category = category
+    def __init__(self, category, connection_info=None, **kwargs):
+        super().__init__(category, **kwargs)
 
         if connection_info is None:
             # if no params will be used local redis
             connection_info = self.config["cache"].get("connection", {})
         self.client = walrus.Database(**connection_info)
 
-    def clear_old_cache(self, key_added):
-
-        if self.max_size is None:
-            return
+        # sorted set: key -> time of modification
+        self.index_key = f'{self.category}__index'
+        # hash: key -> size of value
+        self.sizes_key = f'{self.category}__sizes'
+        # total size of values of category
+        self.bytes_key = f'{self.category}__bytes'
 
+    def clear_old_cache(self, key_added):
         # buffer to delete, to not run delete on every adding
         buffer_size = 5
 
-        cur_count = self.client.hlen(self.category)
-
-        # remove oldest
-        if cur_count > self.max_size + buffer_size:
-            # 5 is buffer to delete, to not run delete on every adding
+        evicted = 0
+        if self.max_size is not None:
+            cur_count = self.client.zcard(self.index_key)
+            # remove oldest
+            if cur_count > self.max_size + buffer_size:
+                for key, _ in self.client.zpopmin(self.index_key, cur_count - self.max_size):
+                    self.delete_key(key)
+                    evicted += 1
 
-            keys = self.client.hgetall(self.category)
-            # to list
-            keys = list(keys.items())
-            # sort by timestamp
-            keys.sort(key=lambda x: x[1])
+        if self.max_bytes is not None:
+            while int(self.client.get(self.bytes_key) or 0) > self.max_bytes:
+                oldest = self.client.zpopmin(self.index_key, buffer_size)
+                if len(oldest) == 0:
+                    break
+                for key, _ in oldest:
+                    self.delete_key(key)
+                    evicted += 1
 
-            for key, _ in keys[:cur_count - self.max_size]:
-                self.delete_key(key)
+        self._count_evictions(evicted)
 
     def redis_key(self, name):
         return f'{self.category}_{name}'
 
-    def set(self, name, value):
+    @contextlib.contextmanager
+    def lock(self, name):
+        with self._thread_lock(name):
+            with self.client.lock(f'{self.redis_key(name)}__lock', timeout=60, blocking_timeout=60):
+                yield
+
+    def set_raw(self, name, value: bytes):
         key = self.redis_key(name)
-        value = self.serialize(value)
 
-        self.client.set(key, value)
+        prev_size = self.client.hget(self.sizes_key, key)
+        pipeline = self.client.pipeline()
+        pipeline.set(key, value)
         # using key with category name to store all keys with modify time
-        self.client.hset(self.category, key, int(time.time() * 1000))
+        pipeline.zadd(self.index_key, {key: int(time.time() * 1000)})
+        pipeline.hset(self.sizes_key, key, len(value))
+        pipeline.incrby(self.bytes_key, len(value) - int(prev_size or 0))
+        pipeline.execute()
 
         self.clear_old_cache(key)
 
-    def get(self, name):
+    def get_raw(self, name):
         key = self.redis_key(name)
         value = self.client.get(key)
-        if value is None:
-            # no value in cache
-            return None
-        return self.deserialize(value)
+        self._count_request(value)
+        return value
 
     def delete(self, name):
         key = self.redis_key(name)
@@ -260,8 +516,139 @@ class RedisCache(BaseCache):
         self.delete_key(key)
 
     def delete_key(self, key):
-        self.client.delete(key)
-        self.client.hdel(self.category, key)
+        size = self.client.hget(self.sizes_key, key)
+        pipeline = self.client.pipeline()
+        pipeline.delete(key)
+        pipeline.zrem(self.index_key, key)
+        pipeline.hdel(self.sizes_key, key)
+        if size is not None:
+            pipeline.decrby(self.bytes_key, int(size))
+        pipeline.execute()
+
+
+class MemoryCache:
+    """In-process LRU storage of serialized values, shared by all caches of the process.
+    Size is limited by total size of values in bytes and by quotas of categories.
+    All operations are O(1)
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # (category, name) -> value, in order of usage
+        self.values = OrderedDict()
+        # category -> OrderedDict(name -> size), in order of usage
+        self.categories = defaultdict(OrderedDict)
+        self.category_bytes = defaultdict(int)
+        self.total_bytes = 0
+
+    def get(self, category: str, name: str) -> t.Optional[bytes]:
+        key = (category, name)
+        with self.lock:
+            value = self.values.get(key)
+            if value is not None:
+                self.values.move_to_end(key)
+                self.categories[category].move_to_end(name)
+        return value
+
+    def set(self, category: str, name: str, value: bytes, quota: t.Optional[int] = None) -> int:
+        """Store value
+
+        Returns:
+            int: count of evicted values
+        """
+        size = len(value)
+        limit = self.max_bytes if quota is None else min(quota, self.max_bytes)
+        with self.lock:
+            self._remove(category, name)
+            if size > limit:
+                return 0
+            self.values[(category, name)] = value
+            self.categories[category][name] = size
+            self.category_bytes[category] += size
+            self.total_bytes += size
+
+            evicted = 0
+            while self.category_bytes[category] > limit:
+                old_name = next(iter(self.categories[category]))
+                self._remove(category, old_name)
+                evicted += 1
+            while self.total_bytes > self.max_bytes:
+                old_category, old_name = next(iter(self.values))
+                self._remove(old_category, old_name)
+                evicted += 1
+        return evicted
+
+    def delete(self, category: str, name: str):
+        with self.lock:
+            self._remove(category, name)
+
+    def _remove(self, category: str, name: str):
+        value = self.values.pop((category, name), None)
+        if value is None:
+            return
+        size = self.categories[category].pop(name)
+        self.category_bytes[category] -= size
+        self.total_bytes -= size
+
+
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+
+def get_memory_cache() -> t.Optional[MemoryCache]:
+    """Get in-process cache, if it is enabled in config"""
+    global _memory_cache
+
+    max_bytes = Config()['cache'].get('memory_max_bytes', _MEMORY_CACHE_MAX_BYTES)
+    if not max_bytes:
+        return None
+    with _memory_cache_lock:
+        if _memory_cache is None:
+            _memory_cache = MemoryCache(max_bytes)
+    return _memory_cache
+
+
+class TieredCache(BaseCache):
+    """Two-tier cache: in-process LRU (MemoryCache) in front of shared cache (FileCache or RedisCache).
+    Values are stored in serialized form in both tiers
+    """
+    tier = 'memory'
+
+    def __init__(self, shared: BaseCache, memory: MemoryCache):
+        self.shared = shared
+        self.memory = memory
+        self.category = shared.category
+        self.max_bytes = shared.max_bytes
+        self.serializer = shared.serializer
+
+        # company isolation of file cache is done by path, do the same for memory tier
+        company_id = ctx.company_id
+        self.memory_category = self.category if company_id is None else f'{self.category}/{company_id}'
+
+    def set_raw(self, name, value: bytes):
+        self.shared.set_raw(name, value)
+        evicted = self.memory.set(self.memory_category, name, value, quota=self.max_bytes)
+        self._count_evictions(evicted)
+
+    def get_raw(self, name):
+        value = self.memory.get(self.memory_category, name)
+        self._count_request(value)
+        if value is not None:
+            return value
+
+        value = self.shared.get_raw(name)
+        if value is not None:
+            evicted = self.memory.set(self.memory_category, name, value, quota=self.max_bytes)
+            self._count_evictions(evicted)
+        return value
+
+    def delete(self, name):
+        self.memory.delete(self.memory_category, name)
+        self.shared.delete(name)
+
+    def lock(self, name):
+        return self.shared.lock(name)
 
 
 class NoCache:
@@ -277,12 +664,153 @@ class NoCache:
     def set(self, name, value):
         pass
 
+    def get_df(self, name):
+        return None
+
+    def set_df(self, name, df):
+        pass
+
+    def delete(self, name):
+        pass
+
+    def lock(self, name):
+        return contextlib.nullcontext()
+
 
-def get_cache(category, **kwargs):
+def get_cache(category, memory_tier=True, **kwargs):
+    """Get cache of category
+
+    Args:
+        category (str): category (namespace) of cache
+        memory_tier (bool): use in-process cache in front of shared cache. It should be disabled for categories
+            with values which are changed by key: in-process cache of other processes will not be updated
+        kwargs: arguments of cache class
+
+    Returns:
+        cache object
+    """
     config = Config()
-    if config.get('cache')['type'] == 'redis':
-        return RedisCache(category, **kwargs)
     if config.get('cache')['type'] == 'none':
         return NoCache(category, **kwargs)
+    if config.get('cache')['type'] == 'redis':
+        cache = RedisCache(category, **kwargs)
     else:
-        return FileCache(category, **kwargs)
+        cache = FileCache(category, **kwargs)
+
+    memory_cache = get_memory_cache() if memory_tier else None
+    if memory_cache is not None:
+        cache = TieredCache(cache, memory_cache)
+    return cache
+
+
+class RowCache:
+    """Cache of dataframe rows. Rows are identified by 128-bit hash of their values.
+    To not store every row as separate cache record, rows are grouped into buckets by first symbols of hash,
+    every bucket is stored as a dataframe indexed by row hash. Buckets are updated under lock of the bucket key.
+
+    How to use it:
+
+        row_cache = RowCache('predict_rows', f'{model_name}_{model_id}')
+        hashes = row_cache.hash_rows(input_df)
+        cached = row_cache.get_rows(hashes)  # dataframe indexed by hash, only found rows
+        ...
+        row_cache.set_rows(new_hashes, new_rows_df)
+    """
+
+    # count of buckets is 16 ** _BUCKET_PREFIX_LEN
+    _BUCKET_PREFIX_LEN = 3
+    # max count of rows in the bucket, oldest rows are removed
+    _BUCKET_MAX_ROWS = 2500
+    # max count of namespaces which buckets are kept in the cache
+    _MAX_NAMESPACES = 20
+
+    def __init__(self, category: str, namespace: str):
+        """
+        Args:
+            category (str): category of cache
+            namespace (str): prefix of keys, for example model name and id
+        """
+        # buckets are rewritten by key: in-process tier of other processes would keep outdated buckets
+        self.cache = get_cache(
+            category,
+            memory_tier=False,
+            max_size=16 ** self._BUCKET_PREFIX_LEN * self._MAX_NAMESPACES
+        )
+        self.namespace = namespace
+
+    @staticmethod
+    def hash_rows(df: pd.DataFrame) -> pd.Index:
+        """Get hashes of rows. Names and types of columns are included in hash
+
+        Args:
+            df (pd.DataFrame): input data
+
+        Returns:
+            pd.Index: hex hashes of rows, in order of rows
+
+        Raises:
+            TypeError: if the dataframe contains unhashable values
+        """
+        df = df.reset_index(drop=True)
+        columns_hash = str_checksum(CustomJSONEncoder().encode([
+            [str(name), str(dtype)] for name, dtype in zip(df.columns, df.dtypes)
+        ]))
+        # two halves of row hash are combined from hashes of values mixed with different keys
+        high_key = np.uint64(int(columns_hash[:16], 16))
+        low_key = np.uint64(int(columns_hash[16:32], 16))
+        high = np.zeros(len(df), dtype=np.uint64)
+        low = np.zeros(len(df), dtype=np.uint64)
+        for i in range(len(df.columns)):
+            hashes = _hash_values(df.iloc[:, i])
+            high = high * _HASH_MULTIPLIER ^ _mix_hashes(hashes, high_key)
+            low = low * _HASH_MULTIPLIER ^ _mix_hashes(hashes, low_key)
+        return pd.Index([f'{a:016x}{b:016x}' for a, b in zip(high, low)])
+
+    def _bucket_key(self, bucket: str) -> str:
+        return f'{self.namespace}_{bucket}'
+
+    def _group_by_bucket(self, hashes: pd.Index) -> dict:
+        buckets = pd.Series(hashes.str[:self._BUCKET_PREFIX_LEN])
+        return {
+            bucket: hashes[positions]
+            for bucket, positions in buckets.groupby(buckets).indices.items()
+        }
+
+    def get_rows(self, hashes: pd.Index) -> pd.DataFrame:
+        """Get cached rows
+
+        Args:
+            hashes (pd.Index): hashes of rows
+
+        Returns:
+            pd.DataFrame: found rows, indexed by hash
+        """
+        found = []
+        for bucket, bucket_hashes in self._group_by_bucket(hashes).items():
+            bucket_df = self.cache.get_df(self._bucket_key(bucket))
+            if bucket_df is None:
+                continue
+            found.append(bucket_df[bucket_df.index.isin(bucket_hashes)])
+        if len(found) == 0:
+            return pd.DataFrame()
+        return pd.concat(found)
+
+    def set_rows(self, hashes: pd.Index, df: pd.DataFrame):
+        """Store rows into the cache
+
+        Args:
+            hashes (pd.Index): hashes of rows
+            df (pd.DataFrame): rows to store, in order of hashes
+        """
+        df = df.set_axis(hashes, axis=0)
+        for bucket, bucket_hashes in self._group_by_bucket(hashes).items():
+            key = self._bucket_key(bucket)
+            new_rows = df.loc[bucket_hashes]
+            # read-modify-write of the bucket: concurrent writers must not drop rows of each other
+            with self.cache.lock(key):
+                bucket_df = self.cache.get_df(key)
+                if bucket_df is not None and list(bucket_df.columns) == list(new_rows.columns):
+                    bucket_df = bucket_df[~bucket_df.index.isin(bucket_hashes)]
+                    new_rows = pd.concat([bucket_df, new_rows])
+                new_rows = new_rows[~new_rows.index.duplicated(keep='last')]
+                self.cache.set_df(key, new_rows.tail(self._BUCKET_MAX_ROWS))
@@ -191,13 +191,25 @@ class Config:
                     "ssl": True,
                     "restart_on_failure": True,
                     "max_restart_count": 1,
-                    "max_restart_interval_seconds": 60
+                    "max_restart_interval_seconds": 60,
+                    "server": {
+                        "type": "threading",    # 'threading': thread per connection, 'asyncio': event loop + workers
+                        "workers": 32,
+                        "handshake_workers": 8,     # asyncio: workers for handshakes of new connections
+                        "timeout": 60               # asyncio: timeout of blocking read/write of socket, seconds
+                    }
                 },
 
                 "postgres": {
                     "host": api_host,
                     "port": "55432",
-                    "database": "mindsdb"
+                    "database": "mindsdb",
+                    "server": {
+                        "type": "threading",
+                        "workers": 32,
+                        "handshake_workers": 8,
+                        "timeout": 60
+                    }
                 },
                 "mcp": {
                     "host": api_host,
@@ -215,9 +227,53 @@ class Config:
             "cache": {
                 "type": "local"
             },
+            "duckdb": {
+                # memory budget of the in-memory queries (joins, unions, projections) of the process, for
+                # example '4GB'. It is divided among threads which execute queries. By default it is 50% of RAM
+                "memory_limit": None,
+                # spill intermediate data (hash tables of joins, sorts) to 'paths.tmp' if memory_limit is reached
+                "spill_to_disk": True,
+                # max size of result of join without condition (cartesian product)
+                "cross_join_max_rows": 10 ** 7
+            },
+            "sql_cache": {
+                # count of parsed statements and query plans kept in memory of the process
+                "statements_size": 1000,
+                "plans_size": 1000,
+                # longer queries (like insert with values) are not cached
+                "max_query_length": 10000
+            },
+            "connection_pool": {
+                # pools of connections of data handlers (postgres, pgvector)
+                "enabled": False,
+                "min_size": 0,
+                "max_size": 10,
+                "max_lifetime": 3600,   # seconds
+                "max_idle": 300,
+                "timeout": 30,          # how long to wait for free connection
+                "check_interval": 30    # idle connection is checked before use after that time
+            },
             'ml_task_queue': {
                 'type': 'local'
             },
+            "ml_models_cache": {
+                # loaded models kept in memory of each ML process
+                "max_count": 5,
+                # bytes, null - no limit. Only models which report their size count toward it
+                "max_memory": 4 * 1024 ** 3
+            },
+            "kb_embeddings_cache": {
+                # embeddings of knowledge base chunks are stored and reused for the same content
+                "enabled": True
+            },
+            "kb_query_embeddings_cache": {
+                # embeddings of search queries are kept in memory of the process, 0 - disabled
+                "max_count": 1000
+            },
+            "reranker_scores_cache": {
+                # relevance scores of (query, document) by reranking model, 0 - disabled
+                "max_count": 10000
+            },
             "file_upload_domains": [],
             "web_crawling_allowed_sites": [],
             "cloud": False,
@@ -1,8 +1,12 @@
-import time
-import types
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, Iterator, Optional
 import contextvars
 
+import pandas as pd
+
+from mindsdb.utilities.context import context as ctx
+
 
 class ContextThreadPoolExecutor(ThreadPoolExecutor):
     '''Handles copying context variables to threads created by ThreadPoolExecutor'''
@@ -16,44 +20,113 @@ class ContextThreadPoolExecutor(ThreadPoolExecutor):
             var.set(value)
 
 
-def execute_in_threads(func, tasks, thread_count=3, queue_size_k=1.5):
+def _load_context(storage: dict):
+    ctx.load(storage)
+
+
+class ContextProcessPoolExecutor(ProcessPoolExecutor):
+    '''Handles copying mindsdb context to processes created by ProcessPoolExecutor'''
+    def __init__(self, max_workers=None):
+        storage = ctx.dump()
+        # profiling tree of the parent process can't be continued in the child
+        storage['profiling'] = {'level': 0, 'enabled': False, 'pointer': None, 'tree': None}
+        super().__init__(max_workers=max_workers, initializer=_load_context, initargs=(storage,))
+
+
+def _get_size(task: Any) -> int:
+    if isinstance(task, pd.DataFrame):
+        return int(task.memory_usage(index=True, deep=True).sum())
+    if isinstance(task, (bytes, bytearray, memoryview)):
+        return len(task)
+    return 0
+
+
+def parallel_map(
+    func: Callable,
+    tasks: Iterable,
+    thread_count: int = 3,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+    max_in_flight_bytes: Optional[int] = None,
+    size_of: Optional[Callable[[Any], int]] = None,
+    use_processes: bool = False
+) -> Iterator:
     """
     Should be used as generator.
-    Can accept input tasks as generator and keep queue size the same to not overflow the RAM
+    Applies function to tasks in threads (or processes) and yields results as soon as they are ready.
+    Input tasks can be generator: they are taken from it only when there is room for them, to not overflow the RAM.
+    At the first error the rest of tasks are cancelled and the error is raised.
 
     :param func: callable, function to execute in threads
     :param tasks: generator or iterable, list of input for function
-    :param thread_count: number of threads
-    :param queue_size_k: how a queue for workers is bigger than count of threads
+    :param thread_count: number of threads (or processes)
+    :param ordered: yield results in order of tasks, otherwise in order of completion
+    :param max_in_flight: max count of submitted tasks which results are not yielded yet, default is 2 * thread_count
+    :param max_in_flight_bytes: max size of submitted tasks which results are not yielded yet.
+        At least one task is submitted even if it is bigger
+    :param size_of: function to get size of the task in bytes, by default size of dataframes and bytes is counted
+    :param use_processes: use pool of processes for CPU-bound functions, function and tasks have to be picklable
     :return: yield results
     """
-    executor = ContextThreadPoolExecutor(max_workers=thread_count)
+    if max_in_flight is None:
+        max_in_flight = thread_count * 2
+    max_in_flight = max(max_in_flight, 1)
+    if size_of is None:
+        size_of = _get_size
 
-    queue_size = int(thread_count * queue_size_k)
+    if use_processes:
+        executor = ContextProcessPoolExecutor(max_workers=thread_count)
+    else:
+        executor = ContextThreadPoolExecutor(max_workers=thread_count)
 
-    if not isinstance(tasks, types.GeneratorType):
-        tasks = iter(tasks)
+    tasks = iter(tasks)
+    # submitted tasks in order of submission
+    futures = deque()
+    sizes = {}
+    in_flight_bytes = 0
+    next_task, next_size = None, 0
+    has_next_task = False
+    exhausted = False
 
-    futures = None
-    while futures is None or len(futures) > 0:
-        if futures is None:
-            futures = []
+    try:
+        while True:
+            # fill the queue of workers
+            while not exhausted and len(futures) < max_in_flight:
+                if not has_next_task:
+                    try:
+                        next_task = next(tasks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    next_size = size_of(next_task) if max_in_flight_bytes is not None else 0
+                    has_next_task = True
+                if (
+                    max_in_flight_bytes is not None
+                    and len(futures) > 0
+                    and in_flight_bytes + next_size > max_in_flight_bytes
+                ):
+                    break
+                future = executor.submit(func, next_task)
+                futures.append(future)
+                sizes[future] = next_size
+                in_flight_bytes += next_size
+                next_task, has_next_task = None, False
 
-        # add new portion
-        for i in range(queue_size):
-            try:
-                args = next(tasks)
-                futures.append(executor.submit(func, args))
-            except StopIteration:
+            if len(futures) == 0:
                 break
 
-        # save results
-        for task in futures:
-            if task.done():
-                yield task.result()
-
-        # remove completed tasks
-        futures[:] = [t for t in futures if not t.done()]
+            if ordered:
+                future = futures.popleft()
+            else:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                # the earliest of completed tasks
+                future = next(f for f in futures if f in done)
+                futures.remove(future)
 
-        time.sleep(0.1)
-    executor.shutdown(wait=False)
+            result = future.result()
+            in_flight_bytes -= sizes.pop(future)
+            yield result
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
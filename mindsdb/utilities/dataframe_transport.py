@@ -0,0 +1,204 @@
+"""
+Transport of dataframes between API and ML processes using Arrow IPC format.
+
+Pickling of big dataframes (input of predictions and predictions themselves) takes more time than the model itself.
+Dataframe is converted to arrow table and written in IPC format:
+ - for local ML processes: into a memory-mapped file (in shared memory if it is available), only the path of file
+   is sent to another process, which maps the file and reads the table without copying (see SharedDataFrame)
+ - for redis queue: into IPC stream, which is stored in redis instead of pickle (see dataframe_to_bytes)
+
+Dataframes which can't be restored from arrow exactly (columns with not string names, nested values, mixed types,
+etc) and small dataframes are pickled as before.
+"""
+
+import os
+import pickle
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from mindsdb.utilities import log
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = log.getLogger(__name__)
+
+# dataframes which are smaller than that are pickled: it is faster than creation of file
+MIN_ARROW_SIZE = 1024 * 1024
+
+# first bytes of IPC stream: continuation marker
+_IPC_STREAM_MAGIC = b'\xff\xff\xff\xff'
+
+# rows in record batch of IPC stream
+_IPC_BATCH_SIZE = 64 * 1024
+
+
+def _get_shared_dir() -> Path:
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        base = shm
+    else:
+        base = Path(tempfile.gettempdir())
+    path = base.joinpath('mindsdb-dataframes')
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def arrow_restores_dataframe(df: pd.DataFrame, table: 'pa.Table') -> bool:
+    """Check that dataframe converted to arrow table is restored by table.to_pandas() with the same types and values.
+    It is not so for lists (restored as numpy arrays), object columns of numbers with nulls (restored as float),
+    float NaN in string columns (restored as None), etc
+
+    Args:
+        df (pd.DataFrame): dataframe
+        table (pyarrow.Table): result of pyarrow.Table.from_pandas(df)
+
+    Returns:
+        bool: True if dataframe is restored exactly
+    """
+    if not all(isinstance(column, str) for column in df.columns) or not df.columns.is_unique:
+        return False
+    # types of restored dataframe are defined by schema and pandas metadata, data is not needed to get them
+    restored = table.schema.empty_table().to_pandas()
+    if str(restored.index.dtype) != str(df.index.dtype):
+        return False
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            arrow_type = table.schema.types[i]
+            if not (pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)):
+                return False
+            column = df.iloc[:, i]
+            if any(value is not None for value in column[column.isna()]):
+                return False
+        elif str(restored.dtypes.iloc[i]) != str(dtype):
+            return False
+    return True
+
+
+def _to_arrow(df: pd.DataFrame, min_size: int = MIN_ARROW_SIZE) -> Optional['pa.Table']:
+    """Convert dataframe to arrow table if it can be restored back without changes
+
+    Returns:
+        Optional[pa.Table]: table or None if dataframe has to be pickled
+    """
+    if pa is None or not isinstance(df, pd.DataFrame):
+        return None
+    if not all(isinstance(column, str) for column in df.columns) or not df.columns.is_unique:
+        return None
+    if df.memory_usage(index=True, deep=False).sum() < min_size:
+        return None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowException, ValueError, TypeError):
+        return None
+    if not arrow_restores_dataframe(df, table):
+        return None
+    return table
+
+
+def _from_arrow(table: 'pa.Table') -> pd.DataFrame:
+    return table.to_pandas(split_blocks=True)
+
+
+class SharedDataFrame:
+    """Picklable reference to dataframe written into memory-mapped file in Arrow IPC format.
+    The file is removed by the process which reads the dataframe
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def create(cls, df: pd.DataFrame) -> Union['SharedDataFrame', pd.DataFrame]:
+        """Write dataframe into shared file
+
+        Returns:
+            Union[SharedDataFrame, pd.DataFrame]: reference to file or the dataframe itself, if it has to be pickled
+        """
+        table = _to_arrow(df)
+        if table is None:
+            return df
+        path = _get_shared_dir().joinpath(f'{os.getpid()}-{uuid.uuid4().hex}.arrow')
+        try:
+            with pa.OSFile(str(path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        except Exception as e:
+            logger.warning(f"Can't write dataframe to shared memory: {e}")
+            path.unlink(missing_ok=True)
+            return df
+        return cls(str(path))
+
+    def read(self, delete: bool = True) -> pd.DataFrame:
+        """Map the file and read dataframe from it
+
+        Args:
+            delete (bool): remove the file, data is available while it is mapped
+
+        Returns:
+            pd.DataFrame
+        """
+        try:
+            source = pa.memory_map(self.path, 'r')
+            table = pa.ipc.open_file(source).read_all()
+        finally:
+            if delete:
+                self.delete()
+        return _from_arrow(table)
+
+    def delete(self):
+        Path(self.path).unlink(missing_ok=True)
+
+
+def share_dataframe(df: Optional[pd.DataFrame]) -> Union[SharedDataFrame, pd.DataFrame, None]:
+    """Replace dataframe by reference to shared file, if it is possible"""
+    if df is None:
+        return None
+    return SharedDataFrame.create(df)
+
+
+def read_dataframe(value: Union[SharedDataFrame, pd.DataFrame, None], delete: bool = True) -> Optional[pd.DataFrame]:
+    """Get dataframe from result of share_dataframe"""
+    if isinstance(value, SharedDataFrame):
+        return value.read(delete=delete)
+    return value
+
+
+def dataframe_to_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize dataframe to Arrow IPC stream, or pickle it if it is not possible
+
+    Args:
+        df (pd.DataFrame): dataframe
+
+    Returns:
+        bytes: serialized dataframe
+    """
+    table = _to_arrow(df)
+    if table is None:
+        return pickle.dumps(df, protocol=5)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=_IPC_BATCH_SIZE):
+            writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def dataframe_from_bytes(value: bytes) -> pd.DataFrame:
+    """Restore dataframe serialized by dataframe_to_bytes
+
+    Args:
+        value (bytes): serialized dataframe
+
+    Returns:
+        pd.DataFrame: dataframe
+    """
+    if value[:4] == _IPC_STREAM_MAGIC:
+        table = pa.ipc.open_stream(pa.py_buffer(value)).read_all()
+        return _from_arrow(table)
+    return pickle.loads(value)
@@ -5,7 +5,8 @@ from pandas import DataFrame
 
 from mindsdb.utilities.context import context as ctx
 from mindsdb.utilities.config import Config
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, to_bytes
+from mindsdb.utilities.ml_task_queue.utils import RedisKey
+from mindsdb.utilities.dataframe_transport import dataframe_to_bytes
 from mindsdb.utilities.ml_task_queue.task import Task
 from mindsdb.utilities.ml_task_queue.base import BaseRedisQueue
 from mindsdb.utilities.ml_task_queue.const import (
@@ -71,7 +72,7 @@ class MLTaskProducer(BaseRedisQueue):
 
             self.wait_redis_ping()
             if dataframe is not None:
-                self.cache.set(redis_key.dataframe, to_bytes(dataframe), 180)
+                self.cache.set(redis_key.dataframe, dataframe_to_bytes(dataframe), 180)
             self.cache.set(redis_key.status, ML_TASK_STATUS.WAITING, 180)
 
             self.stream.add(message)
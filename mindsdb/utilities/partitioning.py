@@ -3,7 +3,7 @@ from typing import Iterable, Callable
 import pandas as pd
 
 from mindsdb.utilities.config import Config
-from mindsdb.utilities.context_executor import execute_in_threads
+from mindsdb.utilities.context_executor import parallel_map
 
 
 def get_max_thread_count() -> int:
@@ -35,13 +35,15 @@ def split_data_frame(df: pd.DataFrame, partition_size: int) -> Iterable[pd.DataF
         yield df1
 
 
-def process_dataframe_in_partitions(df: pd.DataFrame, callback: Callable, partition_size: int) -> Iterable:
+def process_dataframe_in_partitions(df: pd.DataFrame, callback: Callable, partition_size: int,
+                                    ordered: bool = True) -> Iterable:
     """
     Splits dataframe into partitions and apply callback on each partition
 
     :param df: input dataframe
     :param callback: function to apply on each partition
     :param partition_size: size of each partition
+    :param ordered: yield results in order of partitions, otherwise in order of completion
     :return: yield results
     """
 
@@ -63,5 +65,4 @@ def process_dataframe_in_partitions(df: pd.DataFrame, callback: Callable, partit
             yield callback(task)
 
     else:
-        for result in execute_in_threads(callback, tasks, thread_count=max_threads):
-            yield result
+        yield from parallel_map(callback, tasks, thread_count=max_threads, ordered=ordered)
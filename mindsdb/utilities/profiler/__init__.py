@@ -5,7 +5,8 @@ from mindsdb.utilities.profiler.profiler import (
     profile,
     enable,
     disable,
-    set_meta
+    set_meta,
+    count_metadata_db_query
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     'profile',
     'enable',
     'disable',
-    'set_meta'
+    'set_meta',
+    'count_metadata_db_query'
 ]
@@ -33,6 +33,7 @@ def start_node(tag: str):
         'start_at': time.perf_counter(),
         'start_at_thread': time.thread_time(),
         'start_at_process': time.process_time(),
+        'start_metadata_db_queries': profiling.get('metadata_db_queries', 0),
         'stop_at': None,
         'name': tag,
         'children': []
@@ -61,6 +62,9 @@ def stop_current_node():
     current_node['stop_at'] = time.perf_counter()
     current_node['stop_at_thread'] = time.thread_time()
     current_node['stop_at_process'] = time.process_time()
+    current_node['metadata_db_queries'] = (
+        profiling.get('metadata_db_queries', 0) - current_node.pop('start_metadata_db_queries')
+    )
     if len(profiling['pointer']) > 0:
         profiling['pointer'] = profiling['pointer'][:-1]
     else:
@@ -88,6 +92,17 @@ def _send_profiling_results():
     hooks.send_profiling_results(ctx.profiling)
 
 
+def count_metadata_db_query():
+    """ Increase count of queries to the metadata database, it is counted even if profiling is disabled
+    """
+    try:
+        profiling = ctx.profiling
+    except AttributeError:
+        # context is not initialized
+        return
+    profiling['metadata_db_queries'] = profiling.get('metadata_db_queries', 0) + 1
+
+
 def enable():
     ctx.profiling['enabled'] = True
 
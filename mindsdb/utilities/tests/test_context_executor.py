@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.context_executor import parallel_map
+
+
+class CountingTasks:
+    """Generator of tasks which counts taken tasks"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.taken = 0
+
+    def __iter__(self):
+        for i in range(self.count):
+            self.taken += 1
+            yield i
+
+
+class TestParallelMap:
+    def test_order(self):
+        # later tasks are finished earlier
+        def func(i):
+            time.sleep(0.01 * (10 - i))
+            return i * 2
+
+        assert list(parallel_map(func, range(10), thread_count=4)) == [i * 2 for i in range(10)]
+
+    def test_unordered(self):
+        def func(i):
+            time.sleep(0.2 if i == 0 else 0)
+            return i
+
+        results = list(parallel_map(func, range(5), thread_count=5, ordered=False))
+        assert sorted(results) == list(range(5))
+        # the slow task doesn't hold the others
+        assert results[-1] == 0
+
+    def test_empty(self):
+        assert list(parallel_map(lambda i: i, [])) == []
+
+    def test_tasks_are_taken_lazily(self):
+        tasks = CountingTasks(100)
+        results = parallel_map(lambda i: i, tasks, thread_count=2, max_in_flight=3)
+        assert next(results) == 0
+        # not more than max_in_flight tasks are submitted ahead
+        assert tasks.taken <= 4
+        assert list(results) == list(range(1, 100))
+
+    def test_max_in_flight_bytes(self):
+        running = [0]
+        max_running = []
+        lock = threading.Lock()
+
+        def func(df):
+            with lock:
+                running[0] += 1
+                max_running.append(running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return len(df)
+
+        size = int(pd.DataFrame({'a': range(1000)}).memory_usage(index=True, deep=True).sum())
+        tasks = (pd.DataFrame({'a': range(1000)}) for _ in range(10))
+        results = list(parallel_map(func, tasks, thread_count=4, max_in_flight_bytes=size * 2))
+        assert results == [1000] * 10
+        assert max(max_running) <= 2
+
+    def test_error(self):
+        gate = threading.Event()
+        executed = []
+
+        def func(i):
+            if i == 0:
+                time.sleep(0.05)
+                raise ValueError('task failed')
+            # other tasks wait until the error is raised
+            gate.wait(5)
+            executed.append(i)
+            return i
+
+        tasks = CountingTasks(100)
+        with pytest.raises(ValueError, match='task failed'):
+            for _ in parallel_map(func, tasks, thread_count=1, max_in_flight=4):
+                pass
+        gate.set()
+        time.sleep(0.1)
+
+        # tasks are not taken after the error
+        assert tasks.taken == 4
+        # pending tasks are cancelled, only the task which was already running can be finished
+        assert set(executed) <= {1}
+
+    def test_stop_consuming(self):
+        executed = []
+
+        def func(i):
+            time.sleep(0.01)
+            executed.append(i)
+            return i
+
+        tasks = CountingTasks(100)
+        results = parallel_map(func, tasks, thread_count=1, max_in_flight=4)
+        assert next(results) == 0
+        results.close()
+        time.sleep(0.1)
+        # closed generator cancels pending tasks
+        assert len(executed) <= 2
+        assert tasks.taken <= 5
+
+    def test_context(self):
+        ctx.set_default()
+        ctx.company_id = 123
+        ctx.user_id = 'user'
+
+        def func(i):
+            return threading.get_ident(), ctx.company_id, ctx.user_id
+
+        results = list(parallel_map(func, range(6), thread_count=3))
+        assert all(result[1:] == (123, 'user') for result in results)
+        # tasks are executed in worker threads
+        assert threading.get_ident() not in {result[0] for result in results}
+        ctx.set_default()
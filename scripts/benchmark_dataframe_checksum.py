@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark of checksum of dataframe, which is used as key of cache of predictions
+
+Run:
+    env PYTHONPATH=./ python scripts/benchmark_dataframe_checksum.py --rows 1000000
+
+Compared:
+  - before: sha256 of str(df.values), as it was done before vectorized hashing
+    (note: numpy truncates repr of big arrays, so different big dataframes got the same checksum)
+  - after: dataframe_checksum, vectorized hashing of columns
+"""
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.utilities.cache import dataframe_checksum
+
+
+def checksum_before(df: pd.DataFrame) -> str:
+    return hashlib.sha256(str(df.values).encode()).hexdigest()
+
+
+def make_dataframe(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.random(rows),
+        'category': rng.choice(['a', 'b', 'c', 'd'], rows),
+        'text': [f'text of row {i}' for i in range(rows)],
+        'mixed': [i if i % 2 else str(i) for i in range(rows)],
+    })
+
+
+def run_case(name: str, fn, df: pd.DataFrame, repeat: int):
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn(df)
+        durations.append(time.perf_counter() - started_at)
+    print(f'{name:<10} {len(df)} rows: {min(durations):8.3f} s (best of {repeat})')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_dataframe(args.rows)
+    run_case('before', checksum_before, df, args.repeat)
+    run_case('after', dataframe_checksum, df, args.repeat)
+
+    changed = df.copy()
+    changed.loc[len(df) // 2, 'text'] = 'changed'
+    print('change in the middle is detected:')
+    print(f'  before: {checksum_before(df) != checksum_before(changed)}')
+    print(f'  after:  {dataframe_checksum(df) != dataframe_checksum(changed)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark of in-memory join of dataframes with 'object' columns in duckdb, as it is done by JoinStep
+
+Run:
+    env PYTHONPATH=./ python scripts/benchmark_duckdb_join.py --rows 1000000
+
+Compared:
+  - before: dataframes are registered in duckdb as is, types of object columns are inferred by duckdb from
+    sample of the size of dataframe
+  - after: dataframes are converted to arrow tables with declared types (df_to_typed_arrow)
+"""
+
+import argparse
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from mindsdb.api.executor.utilities.sql import get_type_infer_sample_size, query_df_with_type_infer_fallback
+
+QUERY = 'SELECT * FROM table_a JOIN table_b ON table_a.id = table_b.id'
+
+
+def query_before(dataframes: dict):
+    con = duckdb.connect(database=':memory:')
+    for name, df in dataframes.items():
+        con.register(name, df)
+    con.execute(f'SET pandas_analyze_sample={get_type_infer_sample_size(dataframes)};')
+    return con.execute(QUERY).arrow()
+
+
+def query_after(dataframes: dict):
+    return query_df_with_type_infer_fallback(QUERY, dataframes, return_arrow=True)[0]
+
+
+def make_dataframes(rows: int) -> dict:
+    rng = np.random.default_rng(0)
+    table_a = pd.DataFrame({
+        'id': np.arange(rows),
+        'name': [f'name {i}' for i in range(rows)],
+        'amount': pd.Series(rng.integers(0, 1000, rows), dtype=object),
+    })
+    table_b = pd.DataFrame({
+        'id': rng.permutation(rows),
+        'category': rng.choice(['a', 'b', 'c', None], rows),
+        'price': pd.Series(rng.random(rows), dtype=object),
+    })
+    return {'table_a': table_a, 'table_b': table_b}
+
+
+def run_case(name: str, fn, dataframes: dict, repeat: int):
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = fn(dataframes)
+        durations.append(time.perf_counter() - started_at)
+    rows = len(dataframes['table_a'])
+    print(f'{name:<10} {rows} rows: {min(durations):8.3f} s (best of {repeat}), result rows: {result.num_rows}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dataframes = make_dataframes(args.rows)
+    run_case('before', query_before, dataframes, args.repeat)
+    run_case('after', query_after, dataframes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
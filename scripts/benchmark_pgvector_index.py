@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Recall and latency benchmark of vector indexes of pgvector handler
+
+Start postgres with pgvector:
+    docker run -d --name pgvector-bench -e POSTGRES_PASSWORD=postgres -p 5432:5432 pgvector/pgvector:pg16
+
+Run:
+    env PYTHONPATH=./ python scripts/benchmark_pgvector_index.py --rows 100000 --dim 384
+
+For every type of index (no index, hnsw with different ef_search, ivfflat with different probes) it measures
+latency of top-k search through PgVectorHandler.select and recall@k comparing to exact search.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.integrations.handlers.pgvector_handler.pgvector_handler import PgVectorHandler
+from mindsdb.integrations.libs.vectordatabase_handler import FilterCondition, FilterOperator
+
+
+def get_handler(args) -> PgVectorHandler:
+    return PgVectorHandler('pgvector_bench', connection_data={
+        'host': args.host,
+        'port': args.port,
+        'user': args.user,
+        'password': args.password,
+        'database': args.database,
+    })
+
+
+def fill_table(handler: PgVectorHandler, table: str, vectors: np.ndarray, batch_size: int = 5000):
+    handler.drop_table(table)
+    handler.create_table(table)
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start: start + batch_size]
+        df = pd.DataFrame({
+            'id': [str(i) for i in range(start, start + len(batch))],
+            'content': [f'document {i}' for i in range(start, start + len(batch))],
+            'embeddings': [str(vector.tolist()) for vector in batch],
+            'metadata': [{}] * len(batch),
+        })
+        handler.insert(table, df)
+
+
+def search(handler: PgVectorHandler, table: str, query: np.ndarray, k: int, params: dict) -> tuple:
+    conditions = [FilterCondition(column='embeddings', op=FilterOperator.EQUAL, value=query.tolist())]
+    for name, value in params.items():
+        conditions.append(FilterCondition(column=name, op=FilterOperator.EQUAL, value=value))
+    start = time.perf_counter()
+    df = handler.select(table, columns=['id'], conditions=conditions, limit=k)
+    return set(df['id']), time.perf_counter() - start
+
+
+def run_case(handler, table, queries, exact, k, name, params):
+    recalls, latencies = [], []
+    for query, expected in zip(queries, exact):
+        found, latency = search(handler, table, query, k, params)
+        recalls.append(len(found & expected) / k)
+        latencies.append(latency * 1000)
+    print(
+        f'{name:<32} recall@{k}: {np.mean(recalls):.3f}   '
+        f'latency p50: {np.percentile(latencies, 50):7.2f} ms   p95: {np.percentile(latencies, 95):7.2f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='postgres')
+    parser.add_argument('--database', default='postgres')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    table = 'benchmark_vectors'
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(args.rows, args.dim)).astype(np.float32)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    handler = get_handler(args)
+    print(f'Inserting {args.rows} vectors of dimension {args.dim}')
+    fill_table(handler, table, vectors)
+
+    # exact top-k by cosine distance
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = []
+    for query in queries:
+        similarity = normalized @ (query / np.linalg.norm(query))
+        exact.append({str(i) for i in np.argsort(-similarity)[:args.k]})
+
+    run_case(handler, table, queries, exact, args.k, 'no index', {})
+
+    start = time.perf_counter()
+    handler.create_index(table, {'type': 'hnsw', 'm': 16, 'ef_construction': 64, 'keyword_index': False})
+    print(f'hnsw index is built in {time.perf_counter() - start:.1f} s')
+    for ef_search in (10, 40, 100, 200):
+        run_case(handler, table, queries, exact, args.k, f'hnsw ef_search={ef_search}', {'ef_search': ef_search})
+
+    start = time.perf_counter()
+    handler.create_index(table, {'type': 'ivfflat', 'keyword_index': False})
+    print(f'ivfflat index is built in {time.perf_counter() - start:.1f} s')
+    for probes in (1, 10, 40):
+        run_case(handler, table, queries, exact, args.k, f'ivfflat probes={probes}', {'probes': probes})
+
+    handler.drop_table(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of writing to pgvector handler
+
+Start postgres with pgvector:
+    docker run -d --name pgvector-bench -e POSTGRES_PASSWORD=postgres -p 5432:5432 pgvector/pgvector:pg16
+
+Run:
+    env PYTHONPATH=./ python scripts/benchmark_pgvector_upsert.py --rows 1000000 --dim 384
+
+Rows are written by batches, as knowledge base does it. Measured cases:
+  - insert: binary COPY into the table
+  - upsert, new rows: native upsert (COPY into temp table + INSERT ... ON CONFLICT) into empty table
+  - upsert, existing rows: native upsert of the same ids with changed content, all rows are updated
+  - generic upsert, existing rows: select of existing ids + update, used for handlers without native upsert
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.integrations.handlers.pgvector_handler.pgvector_handler import PgVectorHandler
+from mindsdb.integrations.libs.vectordatabase_handler import VectorStoreHandler
+
+
+def get_handler(args) -> PgVectorHandler:
+    return PgVectorHandler('pgvector_bench', connection_data={
+        'host': args.host,
+        'port': args.port,
+        'user': args.user,
+        'password': args.password,
+        'database': args.database,
+    })
+
+
+def batches(args, version: int):
+    rng = np.random.default_rng(version)
+    for start in range(0, args.rows, args.batch_size):
+        size = min(args.batch_size, args.rows - start)
+        ids = range(start, start + size)
+        yield pd.DataFrame({
+            'id': [str(i) for i in ids],
+            'content': [f'document {i}, version {version}' for i in ids],
+            'embeddings': list(rng.normal(size=(size, args.dim)).astype(np.float32)),
+            'metadata': [{'source': 'benchmark', 'version': version}] * size,
+        })
+
+
+def run_case(name: str, args, write, version: int = 0):
+    started_at = time.perf_counter()
+    for df in batches(args, version):
+        write(df)
+    duration = time.perf_counter() - started_at
+    print(f'{name:<32} {args.rows} rows in {duration:8.1f} s   {args.rows / duration:10.0f} rows/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='postgres')
+    parser.add_argument('--database', default='postgres')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    table = 'benchmark_upsert'
+    handler = get_handler(args)
+
+    handler.drop_table(table)
+    handler.create_table(table)
+    run_case('insert', args, lambda df: handler.insert(table, df))
+
+    handler.drop_table(table)
+    handler.create_table(table)
+    run_case('upsert, new rows', args, lambda df: handler.do_upsert(table, df))
+    run_case('upsert, existing rows', args, lambda df: handler.do_upsert(table, df), version=1)
+
+    def generic_upsert(df):
+        VectorStoreHandler._upsert_batch(handler, table, df)
+
+    run_case('generic upsert, existing rows', args, generic_upsert, version=2)
+
+    handler.drop_table(table)
+
+
+if __name__ == '__main__':
+    main()